@@ -11,23 +11,8 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
-import json
-import numpy as np
-import base64
-
-from src.api.helius_api import get_wallet_transactions
-from src.api.coingecko_api import get_token_data_solana
-from src.api.etherscan_api import get_token_transfers
-from src.api.twitter_api import search_tweets
-from src.features.wallet_features import extract_wallet_features
-from src.features.token_features import extract_token_features
-from src.models.fraud_detector import FraudDetector
-from src.models.ml_detector import MLFraudDetector
+# pandas, plotly, sklearn and the API clients are imported inside the page
+# sections that use them, so the first paint does not wait on them
 
 # --- Inject global CSS for DeFiIntel.ai look ---
 st.markdown(
@@ -440,6 +425,12 @@ def show_wallet_analysis():
             with st.spinner("Fetching and analyzing wallet data..."):
                 show_loading_animation()
                 try:
+                    # Heavy libraries are imported only when an analysis actually runs
+                    import pandas as pd
+                    import plotly.express as px
+                    from src.api.helius_api import get_wallet_transactions
+                    from src.features.wallet_features import extract_wallet_features
+
                     # Get transactions
                     transactions = get_wallet_transactions(wallet_address, limit=transaction_limit)
                     
@@ -596,6 +587,11 @@ def show_token_analysis():
             with st.spinner("Fetching and analyzing token data..."):
                 show_loading_animation()
                 try:
+                    import numpy as np
+                    import pandas as pd
+                    import plotly.express as px
+                    from src.api.coingecko_api import get_token_data_solana
+
                     # Get token data
                     token_data = get_token_data_solana(token_address)
                     
@@ -712,6 +708,10 @@ def show_social_sentiment():
             with st.spinner("Fetching and analyzing social sentiment..."):
                 show_loading_animation()
                 try:
+                    import pandas as pd
+                    import plotly.express as px
+                    from src.api.twitter_api import search_tweets
+
                     # Get tweets
                     tweets = search_tweets(keyword, max_results=tweet_count)
                     
@@ -823,6 +823,13 @@ def show_ml_predictions():
             with st.spinner("Running machine learning analysis..."):
                 show_loading_animation()
                 try:
+                    import plotly.express as px
+                    from src.api.etherscan_api import get_token_transfers
+                    from src.api.helius_api import get_wallet_transactions
+                    from src.features.token_features import extract_token_features
+                    from src.features.wallet_features import extract_wallet_features
+                    from src.models.ml_detector import MLFraudDetector
+
                     # Initialize ML detector
                     ml_detector = MLFraudDetector()
                     
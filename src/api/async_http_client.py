@@ -0,0 +1,206 @@
+"""
+Async HTTP Transport
+One pooled aiohttp session per event loop, with the same retry/backoff policy as
+http_client and a bounded-concurrency gather helper for fan-out.
+"""
+
+import asyncio
+import weakref
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.api import circuit_breaker, http_client, rate_limiter, replay, response_cache
+from src.api.http_client import ApiResponse, RETRY_STATUSES, backoff_delay, default_timeout
+from src.utils.config import CONFIG
+
+if TYPE_CHECKING:
+    import aiohttp
+
+# aiohttp sessions are bound to the loop that created them
+_sessions = weakref.WeakKeyDictionary()
+
+
+def _clean_params(params: Optional[Dict]) -> Optional[Dict]:
+    """Drop None values and stringify the rest, matching requests' behaviour."""
+    if not params:
+        return None
+    return {key: str(value) for key, value in params.items() if value is not None}
+
+
+async def get_session() -> 'aiohttp.ClientSession':
+    """Return the pooled session for the running event loop, creating it on first use."""
+    # aiohttp is imported on first use: sync-only callers never pay for it
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connect_timeout, read_timeout = default_timeout()
+        connector = aiohttp.TCPConnector(
+            limit=CONFIG['HTTP_ASYNC_MAX_CONNECTIONS'],
+            limit_per_host=CONFIG['HTTP_POOL_MAXSIZE'],
+            ttl_dns_cache=300,
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+        )
+        _sessions[loop] = session
+    return session
+
+
+async def close():
+    """Close the session bound to the running event loop."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+async def get(url: str,
+              params: Optional[Dict] = None,
+              headers: Optional[Dict] = None,
+              timeout: Optional[Tuple[float, float]] = None,
+              provider: Optional[str] = None,
+              cache_ttl: Optional[float] = None,
+              cacheable: Optional[Callable] = None) -> ApiResponse:
+    """
+    Async counterpart of http_client.get, sharing its response cache and
+    coalescing identical requests from tasks on the same event loop.
+
+    Args:
+        url: Request URL
+        params: Query string parameters
+        headers: Extra request headers
+        timeout: (connect, read) timeout override
+        provider: Provider name used for caching and rate limiting (e.g. 'helius')
+        cache_ttl: Fresh TTL override in seconds for this request
+        cacheable: Predicate on a 200 response deciding whether to cache it
+
+    Returns:
+        The final response, fully read into an ApiResponse
+    """
+    cache = response_cache.get_cache() if provider else None
+    entry = None
+    if cache is not None:
+        key = response_cache.make_key(provider, url, params)
+        # SQLite calls run in a worker thread so they never block the event loop
+        entry = await asyncio.to_thread(cache.lookup, key)
+
+    if entry is not None:
+        if entry.is_stale:
+            http_client.refresh_in_background(key, provider, url, params, headers, timeout, cache_ttl, cacheable)
+        response = ApiResponse(entry.status_code, entry.text, url=entry.url)
+    else:
+        async def _fetch():
+            response = await _send(url, params, headers, timeout, provider)
+            if cache is not None:
+                await asyncio.to_thread(http_client.store_response, cache, key, provider, url, response,
+                                        cache_ttl, cacheable)
+            return response
+
+        response = await http_client.inflight.do_async(http_client.flight_key(provider, url, params, headers), _fetch)
+
+    replay.record_response(provider, url, params, response)
+    return response
+
+
+async def _send(url: str,
+                params: Optional[Dict],
+                headers: Optional[Dict],
+                timeout: Optional[Tuple[float, float]],
+                provider: Optional[str] = None) -> ApiResponse:
+    """Send a GET through the provider's circuit breaker, bypassing the cache."""
+    breaker = circuit_breaker.get_breaker(provider)
+    if breaker is None:
+        return await _send_with_retries(url, params, headers, timeout, provider)
+
+    import aiohttp
+
+    breaker.before_request()
+    try:
+        result = await _send_with_retries(url, params, headers, timeout, provider)
+    except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+        breaker.record_failure()
+        raise
+    except BaseException:
+        # Cancellation and local errors say nothing about the provider
+        breaker.release()
+        raise
+    breaker.record_status(result.status_code)
+    return result
+
+
+async def _send_with_retries(url: str,
+                             params: Optional[Dict],
+                             headers: Optional[Dict],
+                             timeout: Optional[Tuple[float, float]],
+                             provider: Optional[str] = None) -> ApiResponse:
+    """Send a GET with rate limiting and retry/backoff."""
+    import aiohttp
+
+    session = await get_session()
+    request_timeout = None
+    if timeout is not None:
+        request_timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+    max_retries = CONFIG['HTTP_MAX_RETRIES']
+    params = _clean_params(params)
+    limiter = rate_limiter.get_limiter(provider)
+
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            await limiter.acquire_async()
+        try:
+            async with session.get(url, params=params, headers=headers, timeout=request_timeout) as response:
+                text = await response.text()
+                result = ApiResponse(response.status, text, dict(response.headers), str(response.url))
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt >= max_retries:
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+            continue
+
+        if limiter is not None:
+            http_client.record_rate_limit(limiter, result.status_code, result.headers.get('Retry-After'))
+
+        if result.status_code not in RETRY_STATUSES or attempt >= max_retries:
+            return result
+
+        await asyncio.sleep(backoff_delay(attempt, result.headers.get('Retry-After')))
+
+
+async def gather_bounded(aws: Iterable[Awaitable],
+                         limit: Optional[int] = None,
+                         return_exceptions: bool = False) -> List[Any]:
+    """
+    Await many coroutines with at most ``limit`` running at once.
+
+    Args:
+        aws: Coroutines or awaitables to run
+        limit: Maximum concurrency (defaults to HTTP_ASYNC_CONCURRENCY)
+        return_exceptions: Return exceptions in place of results instead of raising
+
+    Returns:
+        Results in the same order as ``aws``
+    """
+    semaphore = asyncio.Semaphore(limit or CONFIG['HTTP_ASYNC_CONCURRENCY'])
+
+    async def _bounded(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(_bounded(aw) for aw in aws), return_exceptions=return_exceptions)
+
+
+def run(main: Awaitable) -> Any:
+    """
+    Run a coroutine on a fresh event loop and close its session afterwards.
+
+    Example:
+        results = run(gather_bounded(get_wallet_transactions_async(w) for w in wallets))
+    """
+    async def _runner():
+        try:
+            return await main
+        finally:
+            await close()
+
+    return asyncio.run(_runner())
@@ -0,0 +1,153 @@
+"""
+Provider Circuit Breakers
+Remember which providers are failing so callers fail fast instead of waiting
+out timeouts, and probe them again once they may have recovered.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from src.utils.config import CONFIG
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Reopened circuits wait longer each time, up to this many seconds
+MAX_RESET_SECONDS = 300.0
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a provider whose circuit is open."""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} circuit open: provider unavailable, retry in {retry_in:.0f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Thread-safe closed / open / half-open circuit for one provider.
+
+    ``failure_threshold`` consecutive failures (connection errors, timeouts
+    or 5xx responses left after retries) open the circuit, and requests are
+    rejected without touching the network. After ``reset_timeout`` seconds
+    one probe request is let through: success closes the circuit, failure
+    reopens it with the timeout doubled.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._retry_in() <= 0:
+                return HALF_OPEN
+            return self._state
+
+    def before_request(self):
+        """
+        Claim permission to send a request.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe already in flight
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN and self._retry_in() <= 0:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            raise CircuitOpenError(self.provider, max(self._retry_in(), 0.0))
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+            self.reset_timeout = self.base_reset_timeout
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self.reset_timeout = min(self.reset_timeout * 2, MAX_RESET_SECONDS)
+                self._open()
+                return
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._open()
+
+    def release(self):
+        """Give back a claimed request that ended without a verdict on the provider (e.g. cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def record_status(self, status_code: int):
+        """Classify a final response: 5xx counts as a failure, anything else shows the provider is up."""
+        if status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+    def _retry_in(self) -> float:
+        return self._opened_at + self.reset_timeout - time.monotonic()
+
+
+def get_breaker(provider: Optional[str]) -> Optional[CircuitBreaker]:
+    """
+    Return the process-wide circuit breaker for a provider.
+
+    Returns:
+        The provider's breaker, or None when no provider is given or
+        CIRCUIT_BREAKER_ENABLED is off
+    """
+    if not provider or not CONFIG['CIRCUIT_BREAKER_ENABLED']:
+        return None
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(provider)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    provider, CONFIG['CIRCUIT_FAILURE_THRESHOLD'], CONFIG['CIRCUIT_RESET_SECONDS']
+                )
+                _breakers[provider] = breaker
+    return breaker
+
+
+def is_available(provider: str) -> bool:
+    """True unless the provider's circuit is open, so pipelines can skip it up front."""
+    breaker = get_breaker(provider)
+    return breaker is None or breaker.state != OPEN
+
+
+def states() -> Dict[str, str]:
+    """Current state of every provider seen so far, e.g. for a health check."""
+    return {provider: breaker.state for provider, breaker in list(_breakers.items())}
+
+
+def reset_breakers():
+    """Forget every breaker so all providers start closed again."""
+    with _breakers_lock:
+        _breakers.clear()
@@ -1,8 +1,116 @@
-import requests
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from src.api import async_http_client, http_client, response_cache
+from src.utils.config import CONFIG
+
+MULTI_TOKEN_LIMIT = 30  # addresses accepted by one /tokens/multi request
+NOT_FOUND_ERROR = "Token not found on GeckoTerminal"
 
 def get_token_data_solana(token_address):
-    url = f"https://api.geckoterminal.com/api/v2/networks/solana/tokens/{token_address}"
-    response = requests.get(url)
+    response = http_client.get(_token_url(token_address), provider="geckoterminal")
+    return _parse_token_response(response)
+
+async def get_token_data_solana_async(token_address):
+    response = await async_http_client.get(_token_url(token_address), provider="geckoterminal")
+    return _parse_token_response(response)
+
+def get_tokens_data_solana(token_addresses, batch_size=MULTI_TOKEN_LIMIT, max_workers=4):
+    """
+    Look up market data for many Solana tokens in as few calls as possible.
+
+    Tokens already in the response cache (including recent "not found"
+    answers) are served from it. The rest are grouped into /tokens/multi
+    requests of up to ``batch_size`` addresses, fetched concurrently, and
+    each token found is cached under its single-token key so
+    get_token_data_solana hits it too. A failed batch, including one
+    rejected by an open circuit breaker, only fails its own tokens.
+
+    Args:
+        token_addresses: Token mint addresses (duplicates allowed)
+        batch_size: Addresses per request (GeckoTerminal accepts up to 30)
+        max_workers: Concurrent batch requests
+
+    Returns:
+        One entry per input address, in input order: {"data": {...}} like
+        get_token_data_solana, or {"error": "..."} for that token alone
+    """
+    results, missing = _cached_tokens(token_addresses)
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch, response in zip(batches, pool.map(_fetch_batch, batches)):
+            results.update(_parse_batch_response(batch, response))
+    return [results[address] for address in token_addresses]
+
+async def get_tokens_data_solana_async(token_addresses, batch_size=MULTI_TOKEN_LIMIT, limit=4):
+    # Cache reads and writes are SQLite calls, so they run off the event loop
+    results, missing = await asyncio.to_thread(_cached_tokens, token_addresses)
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+    responses = await async_http_client.gather_bounded(
+        (async_http_client.get(_multi_url(batch), provider="geckoterminal") for batch in batches),
+        limit=limit, return_exceptions=True,
+    )
+    for batch, response in zip(batches, responses):
+        results.update(await asyncio.to_thread(_parse_batch_response, batch, response))
+    return [results[address] for address in token_addresses]
+
+def _parse_token_response(response):
     if response.status_code != 200:
         raise Exception(f"GeckoTerminal error: {response.status_code} - {response.text}")
-    return response.json()
\ No newline at end of file
+    return response.json()
+
+def _token_url(token_address):
+    return f"{CONFIG['GECKOTERMINAL_BASE_URL']}/networks/solana/tokens/{token_address}"
+
+def _multi_url(token_addresses):
+    return f"{CONFIG['GECKOTERMINAL_BASE_URL']}/networks/solana/tokens/multi/{','.join(token_addresses)}"
+
+def _fetch_batch(batch):
+    # Errors are returned rather than raised so they only fail this batch's tokens
+    try:
+        return http_client.get(_multi_url(batch), provider="geckoterminal")
+    except Exception as e:
+        return e
+
+def _cached_tokens(token_addresses):
+    # Split unique addresses into cache hits and addresses still to fetch
+    cache = response_cache.get_cache()
+    results, missing = {}, []
+    for address in dict.fromkeys(token_addresses):
+        entry = cache.lookup(response_cache.make_key("geckoterminal", _token_url(address))) if cache else None
+        if entry is not None and entry.status_code in response_cache.NOT_FOUND_STATUSES:
+            results[address] = {"error": NOT_FOUND_ERROR}
+        elif entry is not None and not entry.is_stale:
+            results[address] = json.loads(entry.text)
+        else:
+            missing.append(address)
+    return results, missing
+
+def _parse_batch_response(batch, response):
+    if isinstance(response, Exception):
+        return {address: {"error": str(response)} for address in batch}
+    if response.status_code != 200:
+        error = f"GeckoTerminal error: {response.status_code} - {response.text}"
+        return {address: {"error": error} for address in batch}
+
+    found = {}
+    for token in response.json().get("data", []):
+        address = token.get("attributes", {}).get("address") or token.get("id", "").split("_", 1)[-1]
+        found[address] = {"data": token}
+
+    cache = response_cache.get_cache()
+    ttl, stale_ttl = response_cache.ttl_for("geckoterminal")
+    results = {}
+    for address in batch:
+        url = _token_url(address)
+        key = response_cache.make_key("geckoterminal", url)
+        if address in found:
+            results[address] = found[address]
+            if cache is not None:
+                cache.store(key, "geckoterminal", url, 200, json.dumps(found[address]), ttl, stale_ttl)
+        else:
+            results[address] = {"error": NOT_FOUND_ERROR}
+            if cache is not None:
+                cache.store(key, "geckoterminal", url, 404, json.dumps(results[address]), response_cache.NEGATIVE_TTL)
+    return results
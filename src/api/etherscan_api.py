@@ -1,13 +1,150 @@
-import requests
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src.api import async_http_client, http_client
 from src.utils.config import CONFIG
 
-API_KEY = CONFIG['ETHERSCAN_API_KEY']
-BASE_URL = "https://api.etherscan.io/api"
+MAX_RESULTS = 10000  # Etherscan truncates a single tokentx query at 10k rows
+LATEST_BLOCK = 99999999
+# Columns kept by get_token_transfer_frame, and which of them are numeric
+TRANSFER_FIELDS = ("blockNumber", "timeStamp", "hash", "from", "to", "value", "tokenDecimal")
+# ``value`` stays a string: uint256 amounts do not fit a float64 exactly
+NUMERIC_TRANSFER_FIELDS = ("blockNumber", "timeStamp", "tokenDecimal")
 
-def get_token_transfers(token_address, address=None, startblock=0, endblock=99999999, sort="asc"):
+def get_token_transfers(token_address, address=None, startblock=0, endblock=LATEST_BLOCK, sort="asc"):
     # Fetch ERC20 token transfer events for a contract (token_address)
-    url = f"{BASE_URL}?module=account&action=tokentx&contractaddress={token_address}&startblock={startblock}&endblock={endblock}&sort={sort}&apikey={API_KEY}"
-    if address:
-        url += f"&address={address}"
-    response = requests.get(url)
+    params = _token_transfer_params(token_address, address, startblock, endblock, sort)
+    response = http_client.get(CONFIG["ETHERSCAN_BASE_URL"], params=params, provider="etherscan", cacheable=_is_cacheable)
+    return response.json()
+
+async def get_token_transfers_async(token_address, address=None, startblock=0, endblock=LATEST_BLOCK, sort="asc"):
+    params = _token_transfer_params(token_address, address, startblock, endblock, sort)
+    response = await async_http_client.get(CONFIG["ETHERSCAN_BASE_URL"], params=params, provider="etherscan", cacheable=_is_cacheable)
     return response.json()
+
+def get_token_transfer_frame(token_address, address=None, startblock=0, endblock=LATEST_BLOCK, sort="asc",
+                             fields=TRANSFER_FIELDS, chunk_size=None):
+    """
+    Fetch token transfers straight into a columnar DataFrame.
+
+    The response body is streamed and decoded incrementally, keeping only
+    ``fields``, so no per-transfer dict tree is ever built. Numeric fields
+    are float64 and ``value`` keeps Etherscan's raw uint256 string, which the
+    feature extractors decode exactly; the frame can be passed to
+    extract_token_features as is.
+
+    Returns:
+        DataFrame with one column per field and one row per transfer
+    """
+    # pandas and the streaming decoder are only needed on this path
+    import pandas as pd
+
+    from src.api import json_columns
+
+    params = _token_transfer_params(token_address, address, startblock, endblock, sort)
+    numeric_fields = [field for field in fields if field in NUMERIC_TRANSFER_FIELDS]
+    with http_client.stream(CONFIG["ETHERSCAN_BASE_URL"], params=params, provider="etherscan") as response:
+        if response.status_code != 200:
+            raise Exception(f"Etherscan error: {response.status_code} - {response.text}")
+        columns, envelope = json_columns.decode_result_columns(
+            response.raw, fields, numeric_fields=numeric_fields,
+            chunk_size=chunk_size or json_columns.DEFAULT_CHUNK_SIZE,
+        )
+    if envelope.get("status") != "1" and not envelope.get("message", "").startswith("No transactions found"):
+        raise Exception(f"Etherscan error: {envelope.get('message')} - {envelope.get('result')}")
+    return pd.DataFrame(columns)
+
+def _is_cacheable(response):
+    # Etherscan reports errors such as rate limiting inside HTTP 200 bodies
+    data = response.json()
+    return data.get("status") == "1" or data.get("message", "").startswith("No transactions found")
+
+def _token_transfer_params(token_address, address, startblock, endblock, sort):
+    params = {
+        "module": "account",
+        "action": "tokentx",
+        "contractaddress": token_address,
+        "startblock": startblock,
+        "endblock": endblock,
+        "sort": sort,
+        "apikey": CONFIG["ETHERSCAN_API_KEY"],
+    }
+    if address:
+        params["address"] = address
+    return params
+
+def get_all_token_transfers(token_address, address=None, startblock=0, endblock=LATEST_BLOCK, max_workers=4):
+    """
+    Fetch a complete transfer history by sharding the block range.
+
+    A single tokentx query is capped at MAX_RESULTS rows. When a shard comes
+    back full, the rows below its last block are kept (they are complete) and
+    the remainder of the range is bisected into two new shards. Shards run
+    concurrently on a pool of ``max_workers`` threads, paced by the shared
+    Etherscan rate limiter.
+
+    Args:
+        token_address: ERC20 contract address
+        address: Optional holder address filter
+        startblock: First block to include
+        endblock: Last block to include
+        max_workers: Number of shards fetched concurrently
+
+    Returns:
+        Transfer dictionaries in (block, transaction, log) order with duplicates removed
+    """
+    transfers = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = {pool.submit(_fetch_shard, token_address, address, startblock, endblock): (startblock, endblock)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                low, high = pending.pop(future)
+                rows = future.result()
+                if len(rows) < MAX_RESULTS:
+                    transfers.extend(rows)
+                    continue
+
+                last_block = int(rows[-1]["blockNumber"])
+                if last_block <= low:
+                    warnings.warn(f"Block {low} alone has more than {MAX_RESULTS} transfers; history is truncated")
+                    transfers.extend(rows)
+                    continue
+
+                # Rows before the last block are complete; refetch the rest in two halves
+                transfers.extend(row for row in rows if int(row["blockNumber"]) < last_block)
+                mid = (last_block + high) // 2
+                for shard in ((last_block, mid), (mid + 1, high)):
+                    if shard[0] <= shard[1]:
+                        pending[pool.submit(_fetch_shard, token_address, address, *shard)] = shard
+
+    return _dedupe_transfers(transfers)
+
+def _fetch_shard(token_address, address, startblock, endblock):
+    data = get_token_transfers(token_address, address=address, startblock=startblock, endblock=endblock)
+    if data.get("status") == "1":
+        return data.get("result", [])
+    if data.get("message", "").startswith("No transactions found"):
+        return []
+    raise Exception(f"Etherscan error: {data.get('message')} - {data.get('result')}")
+
+def _transfer_order(transfer):
+    return (
+        int(transfer.get("blockNumber", 0)),
+        int(transfer.get("transactionIndex", 0) or 0),
+        int(transfer.get("logIndex", 0) or 0),
+    )
+
+def transfer_key(transfer):
+    # Identifies one transfer event across overlapping fetches
+    return f"{transfer.get('hash')}:{transfer.get('logIndex')}:{transfer.get('from')}:{transfer.get('to')}:{transfer.get('value')}"
+
+def _dedupe_transfers(transfers):
+    seen = set()
+    unique = []
+    for transfer in sorted(transfers, key=_transfer_order):
+        key = transfer_key(transfer)
+        if key not in seen:
+            seen.add(key)
+            unique.append(transfer)
+    return unique
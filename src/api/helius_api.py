@@ -1,12 +1,118 @@
-import requests
+from src.api import async_http_client, http_client, response_cache
+from src.api.helius_constants import LAMPORTS_PER_SOL, NESTED_FIELDS  # re-exported for callers of the client
 from src.utils.config import CONFIG
 
-API_KEY = CONFIG['HELIUS_API_KEY']
-BASE_URL = "https://api.helius.xyz/v0"
+PAGE_SIZE = 100  # Helius returns at most 100 transactions per request
 
 def get_wallet_transactions(wallet_address, limit=10):
-    url = f"{BASE_URL}/addresses/{wallet_address}/transactions?api-key={API_KEY}&limit={limit}"
-    response = requests.get(url)
+    # Limits above one page are fetched by following the signature cursor
+    if limit > PAGE_SIZE:
+        return list(iter_wallet_transactions(wallet_address, max_count=limit))
+    url = _transactions_url(wallet_address)
+    response = http_client.get(url, params={"api-key": CONFIG["HELIUS_API_KEY"], "limit": limit}, provider="helius")
+    return _parse_transactions_response(response)
+
+async def get_wallet_transactions_async(wallet_address, limit=10):
+    # Same pages as get_wallet_transactions: limits above one page follow the signature cursor
+    url = _transactions_url(wallet_address)
+    transactions = []
+    cursor = None
+    while len(transactions) < limit:
+        params = {"api-key": CONFIG["HELIUS_API_KEY"], "limit": min(limit - len(transactions), PAGE_SIZE)}
+        if cursor:
+            params["before"] = cursor
+        cache_ttl = response_cache.FINALIZED_TTL if cursor else None
+        response = await async_http_client.get(url, params=params, provider="helius", cache_ttl=cache_ttl)
+        page = _parse_transactions_response(response)
+        transactions.extend(page)
+        if limit <= PAGE_SIZE or not page:
+            break
+        cursor = page[-1].get("signature")
+        if not cursor:
+            break
+    return transactions
+
+def iter_wallet_transactions(wallet_address, max_count=None, before=None, until=None,
+                             since_timestamp=None, page_size=PAGE_SIZE):
+    """
+    Stream a wallet's transactions newest-first, one page at a time.
+
+    Follows Helius's ``before`` signature cursor so only one page is held in
+    memory. Iteration stops at the first of:
+      - ``max_count`` transactions yielded
+      - a transaction older than ``since_timestamp`` (unix seconds)
+      - the ``until`` signature (exclusive), e.g. the last one already seen
+      - the end of the wallet's history
+
+    Args:
+        wallet_address: Solana wallet address
+        max_count: Maximum number of transactions to yield
+        before: Signature to start paging from (exclusive)
+        until: Signature to stop at (exclusive)
+        since_timestamp: Oldest timestamp to include
+        page_size: Transactions per request (at most 100)
+
+    Yields:
+        Transaction dictionaries as returned by get_wallet_transactions
+    """
+    url = _transactions_url(wallet_address)
+    page_size = min(page_size, PAGE_SIZE)
+    cursor = before
+    yielded = 0
+
+    while max_count is None or yielded < max_count:
+        params = {"api-key": CONFIG["HELIUS_API_KEY"], "limit": page_size}
+        if max_count is not None:
+            params["limit"] = min(page_size, max_count - yielded)
+        if cursor:
+            params["before"] = cursor
+        if until:
+            params["until"] = until
+
+        # Pages behind a cursor are finalized history and can be cached for long
+        cache_ttl = response_cache.FINALIZED_TTL if cursor else None
+        response = http_client.get(url, params=params, provider="helius", cache_ttl=cache_ttl)
+        page = _parse_transactions_response(response)
+        if not page:
+            return
+
+        for txn in page:
+            if until and txn.get("signature") == until:
+                return
+            if since_timestamp is not None and txn.get("timestamp", 0) < since_timestamp:
+                return
+            yield txn
+            yielded += 1
+            if max_count is not None and yielded >= max_count:
+                return
+
+        cursor = page[-1].get("signature")
+        if not cursor:
+            return
+
+def get_wallet_transaction_tables(wallet_address, max_count=None, before=None, until=None, since_timestamp=None):
+    """
+    Fetch a wallet's transactions as flat tables.
+
+    Pages are streamed with iter_wallet_transactions and flattened in one
+    pass by helius_columns.flatten_transactions.
+
+    Returns:
+        Dictionary of DataFrames: transactions, native_transfers,
+        token_transfers, balance_changes and token_balance_changes
+    """
+    # pyarrow and pandas are only needed on this path
+    from src.api import helius_columns
+
+    transactions = iter_wallet_transactions(wallet_address, max_count=max_count, before=before,
+                                            until=until, since_timestamp=since_timestamp)
+    return helius_columns.flatten_transactions(transactions)
+
+def _transactions_url(wallet_address):
+    # Settings are read per call so importing this module never loads configuration
+    return f"{CONFIG['HELIUS_BASE_URL']}/addresses/{wallet_address}/transactions"
+
+def _parse_transactions_response(response):
     if response.status_code != 200:
         raise Exception(f"Helius API error: {response.status_code} - {response.text}")
-    return response.json()
\ No newline at end of file
+    return response.json()
@@ -0,0 +1,135 @@
+"""
+Helius Transaction Flattener
+Explodes the nested ``nativeTransfers``, ``tokenTransfers`` and
+``accountData`` arrays of Helius enhanced transactions into typed child
+tables with Arrow list kernels, without walking the nested dicts in Python.
+"""
+
+import io
+from typing import Dict, Iterable, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
+
+from src.api.helius_constants import LAMPORTS_PER_SOL, NESTED_FIELDS
+
+NATIVE_TRANSFER = pa.struct([
+    ('fromUserAccount', pa.string()),
+    ('toUserAccount', pa.string()),
+    ('amount', pa.int64()),  # lamports
+])
+TOKEN_TRANSFER = pa.struct([
+    ('fromUserAccount', pa.string()),
+    ('toUserAccount', pa.string()),
+    ('fromTokenAccount', pa.string()),
+    ('toTokenAccount', pa.string()),
+    ('tokenAmount', pa.float64()),  # whole tokens, already scaled by decimals
+    ('mint', pa.string()),
+    ('tokenStandard', pa.string()),
+])
+TOKEN_BALANCE_CHANGE = pa.struct([
+    ('userAccount', pa.string()),
+    ('tokenAccount', pa.string()),
+    ('mint', pa.string()),
+    # Raw amounts are decimal strings: u64 token amounts can exceed a float64
+    ('rawTokenAmount', pa.struct([('tokenAmount', pa.string()), ('decimals', pa.int64())])),
+])
+ACCOUNT_DATA = pa.struct([
+    ('account', pa.string()),
+    ('nativeBalanceChange', pa.int64()),  # lamports
+    ('tokenBalanceChanges', pa.list_(TOKEN_BALANCE_CHANGE)),
+])
+# Fields of an enhanced transaction that are flattened; anything else is ignored
+TRANSACTION_SCHEMA = pa.schema([
+    ('signature', pa.string()),
+    ('timestamp', pa.int64()),
+    ('slot', pa.int64()),
+    ('fee', pa.int64()),
+    ('feePayer', pa.string()),
+    ('type', pa.string()),
+    ('source', pa.string()),
+    ('nativeTransfers', pa.list_(NATIVE_TRANSFER)),
+    ('tokenTransfers', pa.list_(TOKEN_TRANSFER)),
+    ('accountData', pa.list_(ACCOUNT_DATA)),
+])
+TRANSACTION_COLUMNS = tuple(field.name for field in TRANSACTION_SCHEMA if field.name not in NESTED_FIELDS)
+# Transaction columns repeated on every child row
+PARENT_COLUMNS = ('signature', 'timestamp')
+
+
+def flatten_transactions(transactions: Union[Iterable[Dict], pd.DataFrame, pa.Table]) -> Dict[str, pd.DataFrame]:
+    """
+    Split Helius enhanced transactions into flat tables.
+
+    Records are converted to Arrow in one typed pass; the nested lists are
+    then exploded with list_flatten / list_parent_indices, so the cost per
+    transfer is a few array kernels rather than Python dict lookups. Each
+    child row carries its parent's row position (``transaction``) and
+    PARENT_COLUMNS.
+
+    Args:
+        transactions: Transaction dictionaries as returned by helius_api,
+            a DataFrame with the store's JSON ``payload`` column (e.g.
+            ColumnarStore.read('solana', ..., columns=['payload'])), or an
+            Arrow table in TRANSACTION_SCHEMA
+
+    Returns:
+        Dictionary of DataFrames:
+          - transactions: one row per transaction (TRANSACTION_COLUMNS)
+          - native_transfers: SOL transfers, amount in lamports
+          - token_transfers: SPL token transfers, tokenAmount in whole tokens
+          - balance_changes: per-account nativeBalanceChange in lamports
+          - token_balance_changes: per-account token balance changes, with
+            rawTokenAmount kept as a decimal string next to its decimals
+    """
+    table = _transaction_table(transactions)
+    account_data = _explode(table, 'accountData')
+    token_balance_changes = _explode(account_data, 'tokenBalanceChanges')
+    raw_amounts = token_balance_changes.column('rawTokenAmount').combine_chunks()
+    token_balance_changes = token_balance_changes.drop_columns(['rawTokenAmount']).append_column(
+        'rawTokenAmount', pc.struct_field(raw_amounts, 'tokenAmount')
+    ).append_column('decimals', pc.struct_field(raw_amounts, 'decimals'))
+    return {
+        'transactions': table.select(list(TRANSACTION_COLUMNS)).to_pandas(),
+        'native_transfers': _explode(table, 'nativeTransfers').to_pandas(),
+        'token_transfers': _explode(table, 'tokenTransfers').to_pandas(),
+        'balance_changes': account_data.drop_columns(['tokenBalanceChanges']).to_pandas(),
+        'token_balance_changes': token_balance_changes.to_pandas(),
+    }
+
+
+def _transaction_table(transactions) -> pa.Table:
+    if isinstance(transactions, pa.Table):
+        return transactions
+    if isinstance(transactions, pd.DataFrame):
+        if 'payload' not in transactions.columns:
+            raise Exception("Helius flatten error: DataFrame input needs the store's 'payload' column")
+        payloads = transactions['payload'].dropna()
+        if len(payloads) < len(transactions):
+            raise Exception("Helius flatten error: missing payload for some transactions")
+        if len(payloads) == 0:
+            return TRANSACTION_SCHEMA.empty_table()
+        # Payloads are compact one-line JSON, so together they are newline-delimited JSON
+        body = '\n'.join(payloads).encode('utf-8')
+        options = pa_json.ParseOptions(explicit_schema=TRANSACTION_SCHEMA, unexpected_field_behavior='ignore')
+        return pa_json.read_json(io.BytesIO(body), parse_options=options)
+    if not isinstance(transactions, (list, tuple)):
+        transactions = list(transactions)
+    return pa.Table.from_struct_array(pa.array(transactions, type=pa.struct(list(TRANSACTION_SCHEMA))))
+
+
+def _explode(table: pa.Table, column: str) -> pa.Table:
+    """One row per element of a list column, with the parent's row position and PARENT_COLUMNS."""
+    lists = table.column(column).combine_chunks()
+    parents = pc.list_parent_indices(lists)
+    items = pc.list_flatten(lists)
+    # Child rows of a child table point at the top-level transaction, not at their direct parent
+    positions = table.column('transaction').take(parents) if 'transaction' in table.column_names else parents
+    columns = {'transaction': positions}
+    for name in PARENT_COLUMNS:
+        columns[name] = table.column(name).take(parents)
+    for field, values in zip(items.type, items.flatten()):
+        columns[field.name] = values
+    return pa.table(columns)
@@ -0,0 +1,9 @@
+"""
+Helius Constants
+Shared by the Helius client, the transaction flattener and the wallet
+features; no imports, so any layer can use them without loading the others.
+"""
+
+LAMPORTS_PER_SOL = 1_000_000_000
+# Nested arrays of an enhanced transaction, exploded by helius_columns
+NESTED_FIELDS = ('nativeTransfers', 'tokenTransfers', 'accountData')
@@ -0,0 +1,336 @@
+"""
+Shared HTTP Transport
+Pooled keep-alive sessions, timeouts and retry with backoff used by every src/api client.
+"""
+
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.api import circuit_breaker, rate_limiter, replay, response_cache, single_flight
+from src.utils.config import CONFIG
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_BACKOFF_SECONDS = 60.0
+
+_session = None
+_session_lock = threading.Lock()
+
+# Identical requests in flight at the same time share one upstream call
+inflight = single_flight.SingleFlight()
+
+# Cache keys currently being revalidated in the background
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+class ApiResponse:
+    """
+    Fully buffered HTTP response.
+
+    Exposes the subset of the requests.Response interface the API clients
+    rely on (status_code, text, headers, json()), so code paths that do not
+    hold a live requests.Response can be handled by the same client code.
+    """
+
+    def __init__(self, status_code: int, text: str, headers: Optional[Dict] = None, url: str = ''):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.url = url
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide pooled session, creating it on first use.
+
+    A single HTTPAdapter keeps one keep-alive pool per host (up to
+    HTTP_POOL_CONNECTIONS hosts, HTTP_POOL_MAXSIZE sockets each), so
+    repeated calls to the same provider reuse TCP+TLS connections.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _build_session() -> requests.Session:
+    """Build a session with pooled adapters mounted for http and https."""
+    session = requests.Session()
+    # Retries are handled in _send_with_retries() so that backoff honours Retry-After
+    adapter = HTTPAdapter(
+        pool_connections=CONFIG['HTTP_POOL_CONNECTIONS'],
+        pool_maxsize=CONFIG['HTTP_POOL_MAXSIZE'],
+        max_retries=0,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def close_session():
+    """Close the shared session and drop its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def default_timeout() -> Tuple[float, float]:
+    """Return the configured (connect, read) timeout pair."""
+    return (CONFIG['HTTP_CONNECT_TIMEOUT'], CONFIG['HTTP_READ_TIMEOUT'])
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into seconds.
+
+    Args:
+        value: Header value, either delta-seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Compute how long to sleep before retry number ``attempt`` (0-based).
+
+    Uses Retry-After when the server sent one, otherwise exponential
+    backoff with full jitter.
+    """
+    server_delay = parse_retry_after(retry_after)
+    if server_delay is not None:
+        return min(server_delay, MAX_BACKOFF_SECONDS)
+    base = CONFIG['HTTP_BACKOFF_FACTOR'] * (2 ** attempt)
+    return min(base + random.uniform(0, base), MAX_BACKOFF_SECONDS)
+
+
+def get(url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[Tuple[float, float]] = None,
+        provider: Optional[str] = None,
+        cache_ttl: Optional[float] = None,
+        cacheable: Optional[Callable] = None):
+    """
+    Issue a GET through the shared connection pool.
+
+    Retries connection errors, timeouts and 429/5xx responses with backoff.
+    Non-retryable error statuses are returned as-is so each client keeps
+    its own error handling. When ``provider`` is given, successful responses
+    are served from and stored in the persistent response cache (stale
+    entries are returned immediately and refreshed in the background, "not
+    found" answers are kept for a short negative TTL), every network attempt
+    first takes a token from the provider's limiter, and requests to a
+    provider whose circuit breaker is open fail fast with CircuitOpenError.
+    Identical requests issued concurrently are coalesced into one upstream
+    call. Responses are also written to the fixture archive when
+    API_RECORD_PATH is set.
+
+    Args:
+        url: Request URL
+        params: Query string parameters
+        headers: Extra request headers
+        timeout: (connect, read) timeout override
+        provider: Provider name used for caching and rate limiting (e.g. 'helius')
+        cache_ttl: Fresh TTL override in seconds for this request
+        cacheable: Predicate on a 200 response deciding whether to cache it,
+            for providers that report errors inside successful responses
+
+    Returns:
+        The final requests.Response, or an ApiResponse for cache hits
+
+    Raises:
+        CircuitOpenError: If the provider is currently considered down
+    """
+    cache = response_cache.get_cache() if provider else None
+    entry = None
+    if cache is not None:
+        key = response_cache.make_key(provider, url, params)
+        entry = cache.lookup(key)
+
+    if entry is not None:
+        if entry.is_stale:
+            refresh_in_background(key, provider, url, params, headers, timeout, cache_ttl, cacheable)
+        response = ApiResponse(entry.status_code, entry.text, url=entry.url)
+    else:
+        def _fetch():
+            response = _send(url, params, headers, timeout, provider)
+            # Read the body now so callers on other threads can share the response
+            response.content
+            if cache is not None:
+                store_response(cache, key, provider, url, response, cache_ttl, cacheable)
+            return response
+
+        response = inflight.do(flight_key(provider, url, params, headers), _fetch)
+
+    replay.record_response(provider, url, params, response)
+    return response
+
+
+def flight_key(provider: Optional[str], url: str, params: Optional[Dict], headers: Optional[Dict]) -> Tuple:
+    """Key identifying identical requests for coalescing (credentials included, unlike cache keys)."""
+    query = tuple(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None))
+    return provider, url, query, tuple(sorted((headers or {}).items()))
+
+
+@contextmanager
+def stream(url: str,
+           params: Optional[Dict] = None,
+           headers: Optional[Dict] = None,
+           timeout: Optional[Tuple[float, float]] = None,
+           provider: Optional[str] = None):
+    """
+    GET with the body left unread, for incremental decoding of large responses.
+
+    Rate limited and retried like get(), but never cached, coalesced or
+    recorded since the body is consumed by the caller. The connection is
+    released when the block exits.
+
+    Example:
+        with http_client.stream(url, params=params, provider='etherscan') as response:
+            columns = decode(response.raw)
+    """
+    response = _send(url, params, headers, timeout, provider, stream=True)
+    # Let urllib3 undo gzip/deflate so readers of response.raw see JSON
+    response.raw.decode_content = True
+    try:
+        yield response
+    finally:
+        response.close()
+
+
+def _send(url: str,
+          params: Optional[Dict],
+          headers: Optional[Dict],
+          timeout: Optional[Tuple[float, float]],
+          provider: Optional[str] = None,
+          stream: bool = False) -> requests.Response:
+    """Send a GET through the provider's circuit breaker, bypassing the cache."""
+    breaker = circuit_breaker.get_breaker(provider)
+    if breaker is None:
+        return _send_with_retries(url, params, headers, timeout, provider, stream)
+
+    breaker.before_request()
+    try:
+        response = _send_with_retries(url, params, headers, timeout, provider, stream)
+    except (requests.ConnectionError, requests.Timeout):
+        breaker.record_failure()
+        raise
+    except BaseException:
+        # Interrupts and local errors say nothing about the provider
+        breaker.release()
+        raise
+    breaker.record_status(response.status_code)
+    return response
+
+
+def _send_with_retries(url: str,
+                       params: Optional[Dict],
+                       headers: Optional[Dict],
+                       timeout: Optional[Tuple[float, float]],
+                       provider: Optional[str] = None,
+                       stream: bool = False) -> requests.Response:
+    """Send a GET with rate limiting and retry/backoff."""
+    timeout = timeout or default_timeout()
+    max_retries = CONFIG['HTTP_MAX_RETRIES']
+    session = get_session()
+    limiter = rate_limiter.get_limiter(provider)
+
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout, stream=stream)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= max_retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        retry_after = response.headers.get('Retry-After')
+        if limiter is not None:
+            record_rate_limit(limiter, response.status_code, retry_after)
+
+        if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+            return response
+
+        # Release the connection back to the pool before sleeping
+        response.close()
+        time.sleep(backoff_delay(attempt, retry_after))
+
+
+def record_rate_limit(limiter, status_code: int, retry_after: Optional[str]):
+    """Feed a response status back into the provider's adaptive limiter."""
+    if status_code == 429:
+        limiter.on_throttled(parse_retry_after(retry_after))
+    elif status_code < 500:
+        limiter.on_success()
+
+
+def store_response(cache, key: str, provider: str, url: str, response,
+                   cache_ttl: Optional[float], cacheable: Optional[Callable] = None):
+    """Cache a successful or "not found" response under ``key`` (the URL is stored without its query string)."""
+    if response.status_code in response_cache.NOT_FOUND_STATUSES:
+        cache.store(key, provider, url, response.status_code, response.text, response_cache.NEGATIVE_TTL)
+        return
+    if response.status_code != 200 or (cacheable is not None and not cacheable(response)):
+        return
+    ttl, stale_ttl = response_cache.ttl_for(provider, cache_ttl)
+    if ttl > 0:
+        cache.store(key, provider, url, response.status_code, response.text, ttl, stale_ttl)
+
+
+def refresh_in_background(key, provider, url, params, headers, timeout, cache_ttl, cacheable=None):
+    """Revalidate a stale cache entry on a daemon thread, once per key at a time."""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def _refresh():
+        try:
+            response = _send(url, params, headers, timeout, provider)
+            store_response(response_cache.get_cache(), key, provider, url, response, cache_ttl, cacheable)
+        except Exception:
+            # Keep serving the stale entry; the next caller will retry
+            pass
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    threading.Thread(target=_refresh, daemon=True).start()
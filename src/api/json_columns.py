@@ -0,0 +1,96 @@
+"""
+Streaming Column Decoder
+Parses a provider's JSON ``result`` array incrementally into per-field column
+buffers instead of one Python dict per record.
+"""
+
+from typing import BinaryIO, Dict, Iterable, Tuple
+
+import ijson
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 10000
+# Low-cardinality string fields whose repeated values share one object;
+# one-off values such as transaction hashes are not worth a lookup
+INTERN_FIELDS = ("from", "to", "contractAddress", "tokenName", "tokenSymbol", "feePayer")
+
+
+def decode_result_columns(stream: BinaryIO,
+                          fields: Iterable[str],
+                          numeric_fields: Iterable[str] = (),
+                          chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          intern_fields: Iterable[str] = INTERN_FIELDS) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Decode ``{"status": ..., "message": ..., "result": [{...}, ...]}`` into columns.
+
+    Only the requested fields of each record are kept. Values are staged in
+    lists of at most ``chunk_size`` rows, then compacted: numeric fields
+    become float64 arrays (missing or malformed values become NaN) and
+    string fields become object arrays. Within a chunk, repeated values of
+    ``intern_fields`` (addresses, symbols) share one string object; the
+    lookup table is dropped with each chunk so it stays bounded too.
+
+    Args:
+        stream: Binary file-like object positioned at the start of the JSON body
+        fields: Record fields to keep
+        numeric_fields: Subset of ``fields`` to decode as float64
+        chunk_size: Rows staged before compaction; bounds the decoder's working set
+        intern_fields: String fields whose repeated values are deduplicated
+
+    Returns:
+        (columns, envelope) where columns maps field -> array and envelope
+        holds the top-level status/message and ``result`` when it is not an array
+    """
+    fields = tuple(fields)
+    numeric_fields = set(numeric_fields)
+    intern_fields = set(intern_fields) - numeric_fields
+    wanted = {f"result.item.{field}": field for field in fields}
+
+    staged = {field: [] for field in fields}
+    chunks = {field: [] for field in fields}
+    strings = {}
+    row = {}
+    envelope = {}
+
+    def _flush():
+        for field in fields:
+            values = staged[field]
+            if not values:
+                continue
+            if field in numeric_fields:
+                array = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+            else:
+                array = np.array(values, dtype=object)
+            chunks[field].append(array)
+            staged[field] = []
+        strings.clear()
+
+    rows_staged = 0
+    for prefix, event, value in ijson.parse(stream):
+        field = wanted.get(prefix)
+        if field is not None:
+            if event == 'number':
+                value = float(value)
+            elif event == 'string' and field in intern_fields:
+                value = strings.setdefault(value, value)
+            row[field] = value
+        elif prefix == 'result.item' and event == 'end_map':
+            for name in fields:
+                staged[name].append(row.get(name))
+            row.clear()
+            rows_staged += 1
+            if rows_staged >= chunk_size:
+                _flush()
+                rows_staged = 0
+        elif prefix in ('status', 'message') or (prefix == 'result' and event == 'string'):
+            envelope[prefix] = value
+    _flush()
+
+    columns = {}
+    for field in fields:
+        if chunks[field]:
+            columns[field] = np.concatenate(chunks[field])
+        else:
+            columns[field] = np.empty(0, dtype=float if field in numeric_fields else object)
+    return columns, envelope
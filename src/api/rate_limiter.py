@@ -0,0 +1,215 @@
+"""
+Provider Rate Limiting
+Adaptive token buckets shared by every thread and asyncio task, with optional
+cross-process coordination through a SQLite file.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from src.utils.config import CONFIG
+
+# provider -> (requests per second, burst size)
+PROVIDER_RATES = {
+    'helius': (10.0, 10),
+    'etherscan': (5.0, 5),
+    'geckoterminal': (0.5, 5),   # 30 calls/minute on the public API
+    'twitter': (0.5, 5),         # 450 recent-search calls per 15 minutes
+    'rugdoc': (1.0, 2),
+}
+
+# Throttled buckets halve their rate, but never drop below this fraction of the quota
+MIN_RATE_FRACTION = 0.1
+# Successful requests recover the rate additively by this fraction of the quota
+RECOVERY_FRACTION = 0.05
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with AIMD rate adaptation.
+
+    Callers reserve a token and sleep for however long the reservation
+    requires, so threads and asyncio tasks share one budget. A 429 halves
+    the refill rate and pauses the bucket for the server's Retry-After;
+    each success nudges the rate back towards the configured quota.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.max_rate = rate
+        self.min_rate = rate * MIN_RATE_FRACTION
+        self.capacity = float(burst or max(rate, 1.0))
+        self._lock = threading.Lock()
+        self._state = {'tokens': self.capacity, 'rate': rate, 'updated_at': time.time(), 'blocked_until': 0.0}
+
+    @property
+    def rate(self) -> float:
+        """Current (possibly reduced) refill rate in requests per second."""
+        return self._state['rate']
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Suspend the calling task until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        """Record a 429: back off multiplicatively and pause for ``retry_after`` seconds."""
+        with self._lock:
+            self._update(lambda state: _throttle(state, self.min_rate, retry_after))
+
+    def on_success(self):
+        """Record an accepted request: recover the rate additively."""
+        with self._lock:
+            self._update(lambda state: _recover(state, self.max_rate))
+
+    def _reserve(self) -> float:
+        with self._lock:
+            return self._update(lambda state: _take(state, self.capacity))
+
+    def _update(self, change):
+        """Apply ``change`` to the bucket state; subclasses may persist it elsewhere."""
+        return change(self._state)
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a SQLite file, shared by every process
+    that points at the same path. Each update runs in an immediate
+    transaction, which serialises writers through SQLite's file lock.
+    """
+
+    def __init__(self, provider: str, path: str, rate: float, burst: Optional[int] = None):
+        super().__init__(rate, burst)
+        self.provider = provider
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                provider TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                rate REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                blocked_until REAL NOT NULL
+            )
+        """)
+        connection.execute(
+            'INSERT OR IGNORE INTO buckets VALUES (?, ?, ?, ?, ?)',
+            (provider, self.capacity, rate, time.time(), 0.0),
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.connection = connection
+        return connection
+
+    @property
+    def rate(self) -> float:
+        row = self._connection().execute('SELECT rate FROM buckets WHERE provider = ?', (self.provider,)).fetchone()
+        return row[0]
+
+    def _update(self, change):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            tokens, rate, updated_at, blocked_until = connection.execute(
+                'SELECT tokens, rate, updated_at, blocked_until FROM buckets WHERE provider = ?',
+                (self.provider,),
+            ).fetchone()
+            state = {'tokens': tokens, 'rate': rate, 'updated_at': updated_at, 'blocked_until': blocked_until}
+            result = change(state)
+            connection.execute(
+                'UPDATE buckets SET tokens = ?, rate = ?, updated_at = ?, blocked_until = ? WHERE provider = ?',
+                (state['tokens'], state['rate'], state['updated_at'], state['blocked_until'], self.provider),
+            )
+            connection.execute('COMMIT')
+            return result
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+
+def _refill(state: Dict, capacity: float, now: float):
+    # updated_at sits in the future while a Retry-After pause is in effect
+    if now > state['updated_at']:
+        elapsed = now - state['updated_at']
+        state['tokens'] = min(capacity, state['tokens'] + elapsed * state['rate'])
+        state['updated_at'] = now
+
+
+def _take(state: Dict, capacity: float) -> float:
+    """Reserve one token, returning how long the caller must wait for it."""
+    now = time.time()
+    _refill(state, capacity, now)
+    state['tokens'] -= 1.0
+    # A negative balance is a queue of reservations; each waits its turn
+    delay = -state['tokens'] / state['rate'] if state['tokens'] < 0 else 0.0
+    return max(state['blocked_until'] - now, 0.0) + delay
+
+
+def _throttle(state: Dict, min_rate: float, retry_after: Optional[float]):
+    now = time.time()
+    state['rate'] = max(state['rate'] / 2.0, min_rate)
+    state['tokens'] = min(state['tokens'], 0.0)
+    if retry_after:
+        state['blocked_until'] = max(state['blocked_until'], now + retry_after)
+    # Nothing refills until the pause is over
+    state['updated_at'] = max(now, state['blocked_until'])
+
+
+def _recover(state: Dict, max_rate: float):
+    state['rate'] = min(state['rate'] + max_rate * RECOVERY_FRACTION, max_rate)
+
+
+def get_limiter(provider: Optional[str]) -> Optional[TokenBucket]:
+    """
+    Return the shared limiter for a provider.
+
+    Buckets are process-wide; when RATE_LIMIT_SHARED_PATH is set they are
+    also shared with other processes through that SQLite file.
+
+    Returns:
+        The provider's bucket, or None for unknown providers or when
+        RATE_LIMIT_ENABLED is off
+    """
+    if not provider or provider not in PROVIDER_RATES or not CONFIG['RATE_LIMIT_ENABLED']:
+        return None
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                rate, burst = PROVIDER_RATES[provider]
+                # API_RATE_LIMITS overrides the default quota, e.g. for paid plans
+                rate = CONFIG['API_RATE_LIMITS'].get(provider, rate)
+                shared_path = CONFIG['RATE_LIMIT_SHARED_PATH']
+                if shared_path:
+                    limiter = SharedTokenBucket(provider, shared_path, rate, burst)
+                else:
+                    limiter = TokenBucket(rate, burst)
+                _limiters[provider] = limiter
+    return limiter
+
+
+def reset_limiters():
+    """Forget every bucket so the next request rebuilds them from PROVIDER_RATES."""
+    with _limiters_lock:
+        _limiters.clear()
@@ -0,0 +1,263 @@
+"""
+Record/Replay Stand-in for External APIs
+Captures real provider responses into a gzip JSONL fixture archive and serves
+them back from a local HTTP server with configurable latency, jitter and errors.
+
+Record:
+    API_RECORD_PATH=fixtures/api.jsonl.gz python test_fraud_detection.py
+
+Replay:
+    python -m src.api.replay serve --archive fixtures/api.jsonl.gz --latency-ms 80 --jitter-ms 20
+    # then export the printed *_BASE_URL variables before running the pipeline
+"""
+
+import argparse
+import atexit
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from src.utils.config import CONFIG, DEFAULT_BASE_URLS
+
+# Query parameters that carry credentials are never written to fixtures
+SECRET_PARAMS = {'api-key', 'apikey', 'api_key'}
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def _normalize_query(items) -> str:
+    return urlencode(sorted(
+        (key, str(value)) for key, value in items
+        if value is not None and key not in SECRET_PARAMS
+    ))
+
+
+def fixture_key(provider: str, path: str, query: str) -> Tuple[str, str, str]:
+    """Key a fixture by provider, upstream path and normalized query string."""
+    return provider, path.rstrip('/'), query
+
+
+class Recorder:
+    """Appends responses to a gzip JSONL archive, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        atexit.register(self.close)
+
+    def record(self, provider: str, url: str, params: Optional[Dict], status: int, text: str):
+        parts = urlsplit(url)
+        query = _normalize_query(list(parse_qsl(parts.query)) + list((params or {}).items()))
+        entry = {'provider': provider, 'path': parts.path, 'query': query, 'status': status, 'body': text}
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line)
+            # Sync-flush so the archive stays readable if the process dies
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def record_response(provider: Optional[str], url: str, params: Optional[Dict], response):
+    """Record a response when API_RECORD_PATH is set (called by the transports)."""
+    global _recorder
+    path = CONFIG['API_RECORD_PATH']
+    if not path or not provider:
+        return
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = Recorder(path)
+    _recorder.record(provider, url, params, response.status_code, response.text)
+
+
+def load_archive(path: str) -> Dict[Tuple[str, str, str], Dict]:
+    """
+    Load a fixture archive. Later recordings of the same request win.
+
+    Returns:
+        Mapping of fixture_key -> {'status', 'body'}
+    """
+    fixtures = {}
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        try:
+            for line in archive:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = fixture_key(entry['provider'], entry['path'], entry['query'])
+                fixtures[key] = {'status': entry['status'], 'body': entry['body']}
+        except EOFError:
+            # Archive from a recorder that was not closed cleanly; keep what was flushed
+            pass
+    return fixtures
+
+
+class ReplayServer:
+    """
+    Local HTTP stand-in that serves recorded responses for every provider.
+
+    Requests are routed by their first path segment, e.g.
+    ``/helius/v0/addresses/<wallet>/transactions`` replays the Helius
+    response recorded for ``/v0/addresses/<wallet>/transactions``.
+
+    Args:
+        archive_path: Fixture archive written by the recorder
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        latency_ms: Base delay added to every response
+        jitter_ms: Uniform +/- jitter around the base delay
+        tail_rate: Fraction of requests delayed by ``tail_latency_ms`` instead
+        tail_latency_ms: Delay for tail requests
+        error_rate: Fraction of requests answered with ``error_status``
+        error_status: Status code used for injected errors (e.g. 429 or 503)
+        seed: Random seed for repeatable runs
+    """
+
+    def __init__(self, archive_path: str, host: str = '127.0.0.1', port: int = 0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 tail_rate: float = 0.0, tail_latency_ms: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503,
+                 seed: Optional[int] = None):
+        self.fixtures = load_archive(archive_path)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tail_rate = tail_rate
+        self.tail_latency_ms = tail_latency_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stats = {'served': 0, 'missing': 0, 'injected_errors': 0}
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_urls(self) -> Dict[str, str]:
+        """Return *_BASE_URL settings that point every client at this server."""
+        urls = {}
+        for key, upstream in DEFAULT_BASE_URLS.items():
+            provider = key[:-len('_BASE_URL')].lower()
+            urls[key] = f"{self.url}/{provider}{urlsplit(upstream).path}"
+        return urls
+
+    def start(self) -> 'ReplayServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _next_behaviour(self) -> Tuple[float, bool]:
+        """Draw (delay seconds, inject error?) for the next request."""
+        with self._random_lock:
+            if self.tail_rate and self._random.random() < self.tail_rate:
+                delay = self.tail_latency_ms
+            else:
+                delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            inject_error = bool(self.error_rate) and self._random.random() < self.error_rate
+        return max(delay, 0.0) / 1000.0, inject_error
+
+    def _handler_class(self):
+        replay = self
+
+        class _ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                delay, inject_error = replay._next_behaviour()
+                if delay:
+                    time.sleep(delay)
+
+                parts = urlsplit(self.path)
+                provider, _, path = parts.path.lstrip('/').partition('/')
+                fixture = replay.fixtures.get(
+                    fixture_key(provider, '/' + path, _normalize_query(parse_qsl(parts.query)))
+                )
+                headers = {}
+                if inject_error:
+                    outcome = 'injected_errors'
+                    status, body = replay.error_status, json.dumps({'error': 'injected failure'})
+                    headers['Retry-After'] = '0'
+                elif fixture is None:
+                    outcome = 'missing'
+                    status, body = 404, json.dumps({'error': 'no recorded response', 'path': self.path})
+                else:
+                    outcome = 'served'
+                    status, body = fixture['status'], fixture['body']
+                with replay._random_lock:
+                    replay.stats[outcome] += 1
+
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return _ReplayHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded API responses from a local server.')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    serve = subcommands.add_parser('serve', help='serve a fixture archive')
+    serve.add_argument('--archive', required=True)
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--latency-ms', type=float, default=0.0)
+    serve.add_argument('--jitter-ms', type=float, default=0.0)
+    serve.add_argument('--tail-rate', type=float, default=0.0)
+    serve.add_argument('--tail-latency-ms', type=float, default=0.0)
+    serve.add_argument('--error-rate', type=float, default=0.0)
+    serve.add_argument('--error-status', type=int, default=503)
+    serve.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = ReplayServer(
+        args.archive, host=args.host, port=args.port,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        tail_rate=args.tail_rate, tail_latency_ms=args.tail_latency_ms,
+        error_rate=args.error_rate, error_status=args.error_status, seed=args.seed,
+    )
+    print(f"Replaying {len(server.fixtures)} recorded responses on {server.url}")
+    for key, url in server.base_urls().items():
+        print(f"export {key}={url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Persistent API Response Cache
+SQLite-backed cache of successful provider responses with per-provider TTLs,
+size-bounded LRU eviction and stale-while-revalidate.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from src.utils.config import CONFIG
+
+# provider -> (fresh seconds, extra seconds a stale entry may still be served)
+PROVIDER_TTLS = {
+    'helius': (300, 300),
+    'etherscan': (300, 300),
+    'geckoterminal': (60, 60),
+    'rugdoc': (3600, 3600),
+    'twitter': (120, 120),
+}
+
+# Finalized on-chain history never changes, e.g. Helius pages behind a `before` cursor
+FINALIZED_TTL = 30 * 24 * 3600
+
+# "Not found" answers are cached briefly so repeated lookups of unknown tokens skip the network
+NEGATIVE_TTL = 300
+NOT_FOUND_STATUSES = {404, 410}
+
+# Query parameters that carry credentials and must not end up in cache keys
+SECRET_PARAMS = {'api-key', 'apikey', 'api_key'}
+
+# Writes between re-reads of the stored byte total, which other processes sharing the file may change
+RESYNC_WRITES = 1000
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class CachedEntry:
+    """A cache hit: the response body plus whether it is past its fresh TTL."""
+
+    def __init__(self, status_code: int, text: str, url: str, is_stale: bool):
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+        self.is_stale = is_stale
+
+
+class ResponseCache:
+    """
+    Size-bounded SQLite response cache shared by every thread in the process.
+
+    Entries are keyed by provider and normalized request parameters. Reads
+    refresh an entry's LRU timestamp; writes evict least recently used
+    entries once the stored bodies exceed ``max_bytes``. The byte total is
+    kept as a running count, so a write does not scan the table.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                stale_until REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access);
+        """)
+        self._size_lock = threading.Lock()
+        self._writes = 0
+        self._bytes = self._stored_bytes()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def lookup(self, key: str) -> Optional[CachedEntry]:
+        """
+        Look up a cached response.
+
+        Returns:
+            The entry (flagged stale if past its fresh TTL), or None on a miss
+            or once the stale window has also passed
+        """
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT status, body, url, expires_at, stale_until, size FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        status, body, url, expires_at, stale_until, size = row
+        if now >= stale_until:
+            if connection.execute('DELETE FROM responses WHERE key = ?', (key,)).rowcount:
+                self._add_bytes(-size)
+            return None
+        connection.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+        return CachedEntry(status, zlib.decompress(body).decode('utf-8'), url, is_stale=now >= expires_at)
+
+    def store(self, key: str, provider: str, url: str, status: int, text: str, ttl: float, stale_ttl: float = 0):
+        """Store a response for ``ttl`` seconds, servable stale for ``stale_ttl`` more."""
+        now = time.time()
+        body = zlib.compress(text.encode('utf-8'), 1)
+        connection = self._connection()
+        previous = connection.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+        connection.execute(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (key, provider, url, status, body, len(body), now + ttl, now + ttl + stale_ttl, now),
+        )
+        with self._size_lock:
+            self._writes += 1
+            resync = self._writes % RESYNC_WRITES == 0
+        if resync:
+            total = self._stored_bytes()
+            with self._size_lock:
+                self._bytes = total
+        else:
+            self._add_bytes(len(body) - (previous[0] if previous else 0))
+        if self._bytes > self.max_bytes:
+            self._evict(connection)
+
+    def _stored_bytes(self) -> int:
+        return self._connection().execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def _add_bytes(self, size: int):
+        with self._size_lock:
+            self._bytes += size
+
+    def _evict(self, connection: sqlite3.Connection):
+        """Drop least recently used entries until the cache is under 90% of max_bytes."""
+        # Exact total before deciding what to drop; only runs once the running count overflows
+        total = self._stored_bytes()
+        if total > self.max_bytes:
+            target = self.max_bytes * 0.9
+            evicted = []
+            for key, size in connection.execute('SELECT key, size FROM responses ORDER BY last_access'):
+                if total <= target:
+                    break
+                evicted.append((key,))
+                total -= size
+            connection.executemany('DELETE FROM responses WHERE key = ?', evicted)
+        with self._size_lock:
+            self._bytes = total
+
+    def invalidate(self, provider: Optional[str] = None):
+        """Remove every entry, or only those of one provider."""
+        if provider is None:
+            self._connection().execute('DELETE FROM responses')
+        else:
+            self._connection().execute('DELETE FROM responses WHERE provider = ?', (provider,))
+        total = self._stored_bytes()
+        with self._size_lock:
+            self._bytes = total
+
+    def stats(self) -> Dict[str, int]:
+        """Return entry count and stored bytes."""
+        count, size = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+        ).fetchone()
+        return {'entries': count, 'bytes': size}
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Return the process-wide cache, or None when API_CACHE_ENABLED is off."""
+    global _cache
+    if not CONFIG['API_CACHE_ENABLED']:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(CONFIG['API_CACHE_PATH'], CONFIG['API_CACHE_MAX_BYTES'])
+    return _cache
+
+
+def set_cache(cache: Optional[ResponseCache]):
+    """Replace the process-wide cache (e.g. to point tests at a temporary file)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def make_key(provider: str, url: str, params: Optional[Dict] = None) -> str:
+    """Build a cache key from the provider, URL and sorted non-secret parameters."""
+    items = sorted(
+        (key, str(value)) for key, value in (params or {}).items()
+        if value is not None and key not in SECRET_PARAMS
+    )
+    return f"{provider} {url}?{urlencode(items)}"
+
+
+def ttl_for(provider: str, ttl: Optional[float] = None) -> Tuple[float, float]:
+    """Resolve (fresh, stale) seconds for a provider, honouring a per-call override."""
+    fresh, stale = PROVIDER_TTLS.get(provider, (0, 0))
+    if ttl is not None:
+        return ttl, stale
+    return fresh, stale
@@ -1,9 +1,21 @@
-import requests
+from src.api import async_http_client, http_client
+from src.utils.config import CONFIG
 
 def check_token_rugdoc(token_address):
     # Simulated endpoint or scraper
-    url = f"https://rugdoc.io/api/projects/{token_address}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    return {"status": "unknown"}
\ No newline at end of file
+    url = f"{CONFIG['RUGDOC_BASE_URL']}/projects/{token_address}"
+    response = http_client.get(url, provider="rugdoc")
+    return _parse_rugdoc_response(response)
+
+async def check_token_rugdoc_async(token_address):
+    url = f"{CONFIG['RUGDOC_BASE_URL']}/projects/{token_address}"
+    response = await async_http_client.get(url, provider="rugdoc")
+    return _parse_rugdoc_response(response)
+
+def _parse_rugdoc_response(response):
+    # Projects RugDoc has not reviewed are "unknown"; anything else is a provider failure
+    if response.status_code == 404:
+        return {"status": "unknown"}
+    if response.status_code != 200:
+        raise Exception(f"RugDoc error: {response.status_code} - {response.text}")
+    return response.json()
@@ -0,0 +1,94 @@
+"""
+Request Coalescing
+Single-flight groups: while a call for a key is in flight, duplicate callers
+wait for it and share its result instead of issuing their own request.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Call:
+    """An in-flight call shared by its leader and any waiting duplicates."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls.
+
+    Thread callers use ``do``; asyncio callers use ``do_async``, which
+    coalesces tasks on the same event loop. Only the leader runs the call;
+    its result or exception is handed to every duplicate that arrived while
+    it was running. Nothing is remembered once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        # event loop -> {key: Future}
+        self._async_calls = weakref.WeakKeyDictionary()
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` unless a call for ``key`` is already running, then share its outcome."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, factory: Callable[[], Awaitable]) -> Any:
+        """Await ``factory()`` unless the same key is already being awaited on this loop."""
+        loop = asyncio.get_running_loop()
+        calls = self._async_calls.setdefault(loop, {})
+        future = calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # Shield so a cancelled duplicate does not cancel the leader's request
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        calls[key] = future
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved: with no duplicates waiting nobody else will read it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            calls.pop(key, None)
@@ -0,0 +1,140 @@
+"""
+Incremental Sync
+Fetches only what is new since an address's last sync, appends it to the
+history store and returns the merged history for feature extraction.
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from src.api import etherscan_api, helius_api, twitter_api
+from src.storage.history_store import HistoryStore, get_history_store
+
+if TYPE_CHECKING:
+    from src.storage.columnar_store import ColumnarStore
+
+SOLANA = 'solana'
+ETHEREUM = 'ethereum'
+TWITTER = 'twitter'
+
+
+def sync_wallet_transactions(wallet_address: str,
+                             store: Optional[HistoryStore] = None,
+                             initial_limit: Optional[int] = None,
+                             columnar_store: Optional['ColumnarStore'] = None) -> List[Dict]:
+    """
+    Bring a wallet's stored Helius history up to date.
+
+    The watermark is the newest signature seen; later syncs page back from
+    the head only until they reach it.
+
+    Args:
+        wallet_address: Solana wallet address
+        store: History store (defaults to the process-wide one)
+        initial_limit: Cap on transactions fetched by the very first sync
+        columnar_store: Also append the new transactions to this columnar store
+
+    Returns:
+        The merged history, newest first like get_wallet_transactions
+    """
+    store = store or get_history_store()
+    watermark = store.get_watermark(SOLANA, wallet_address)
+
+    if watermark is None:
+        new = list(helius_api.iter_wallet_transactions(wallet_address, max_count=initial_limit))
+    else:
+        new = list(helius_api.iter_wallet_transactions(wallet_address, until=watermark['cursor']))
+
+    if new or watermark is None:
+        cursor = new[0]['signature'] if new else None
+        store.append(SOLANA, wallet_address, reversed(new), key=lambda txn: txn['signature'], cursor=cursor)
+    if new and columnar_store is not None:
+        columnar_store.append(SOLANA, wallet_address, new)
+
+    return store.load(SOLANA, wallet_address, newest_first=True)
+
+
+def sync_token_transfers(token_address: str,
+                         address: Optional[str] = None,
+                         store: Optional[HistoryStore] = None,
+                         max_workers: int = 4,
+                         columnar_store: Optional['ColumnarStore'] = None) -> List[Dict]:
+    """
+    Bring a token's stored Etherscan transfer history up to date.
+
+    The watermark is the (block, log index) of the newest stored transfer.
+    Later syncs refetch from that block inclusive, so transfers that landed
+    in the same block after the last sync are not missed; rows already
+    stored are dropped by key.
+
+    Args:
+        token_address: ERC20 contract address
+        address: Optional holder address filter
+        store: History store (defaults to the process-wide one)
+        max_workers: Concurrent shards for the block-range fetch
+        columnar_store: Also append the fetched transfers to this columnar
+            store (the overlap with the last sync is dropped on read and compaction)
+
+    Returns:
+        The merged history in block order, like the tokentx ``result`` array
+    """
+    store = store or get_history_store()
+    scope = token_scope(token_address, address)
+    watermark = store.get_watermark(ETHEREUM, scope)
+    startblock = watermark['block'] if watermark and watermark['block'] is not None else 0
+
+    new = etherscan_api.get_all_token_transfers(
+        token_address, address=address, startblock=startblock, max_workers=max_workers
+    )
+
+    if new:
+        last = new[-1]
+        store.append(
+            ETHEREUM, scope, new, key=etherscan_api.transfer_key,
+            block=int(last['blockNumber']), log_index=int(last.get('logIndex') or 0),
+        )
+        if columnar_store is not None:
+            columnar_store.append(ETHEREUM, scope, new)
+    elif watermark is None:
+        store.append(ETHEREUM, scope, [], key=etherscan_api.transfer_key, block=startblock)
+
+    return store.load(ETHEREUM, scope)
+
+
+def sync_keyword_tweets(keyword: str,
+                        store: Optional[HistoryStore] = None,
+                        initial_limit: Optional[int] = 100) -> List[Dict]:
+    """
+    Bring a search keyword's stored tweets up to date.
+
+    The watermark is the newest tweet id seen; later syncs pass it as
+    ``since_id`` so only tweets posted since the last check are fetched.
+
+    Args:
+        keyword: Search query, used as the store key
+        store: History store (defaults to the process-wide one)
+        initial_limit: Cap on tweets fetched by the very first sync
+
+    Returns:
+        The merged tweets, newest first like the search ``data`` array
+    """
+    store = store or get_history_store()
+    watermark = store.get_watermark(TWITTER, keyword)
+
+    if watermark is None or watermark['cursor'] is None:
+        new = list(twitter_api.iter_tweets(keyword, max_count=initial_limit))
+    else:
+        new = list(twitter_api.iter_tweets(keyword, since_id=watermark['cursor']))
+
+    if new or watermark is None:
+        cursor = max((tweet['id'] for tweet in new), key=int) if new else None
+        store.append(TWITTER, keyword, reversed(new), key=lambda tweet: tweet['id'], cursor=cursor)
+
+    return store.load(TWITTER, keyword, newest_first=True)
+
+
+def token_scope(token_address: str, address: Optional[str] = None) -> str:
+    """Store key for a token's transfers, optionally narrowed to one holder."""
+    scope = token_address.lower()
+    if address:
+        scope += f":{address.lower()}"
+    return scope
@@ -1,10 +1,67 @@
-import requests
+from src.api import async_http_client, http_client
 from src.utils.config import CONFIG
 
-BEARER_TOKEN = CONFIG["TWITTER_BEARER_TOKEN"]
+PAGE_SIZE = 100  # recent search accepts max_results between 10 and 100
+MIN_PAGE_SIZE = 10
 
 def search_tweets(keyword, max_results=10):
-    headers = {"Authorization": f"Bearer {BEARER_TOKEN}"}
-    query = f"https://api.twitter.com/2/tweets/search/recent?query={keyword}&max_results={max_results}"
-    response = requests.get(query, headers=headers)
-    return response.json()
\ No newline at end of file
+    headers = {"Authorization": f"Bearer {CONFIG['TWITTER_BEARER_TOKEN']}"}
+    params = {"query": keyword, "max_results": max_results}
+    response = http_client.get(_search_url(), params=params, headers=headers, provider="twitter")
+    return response.json()
+
+async def search_tweets_async(keyword, max_results=10):
+    headers = {"Authorization": f"Bearer {CONFIG['TWITTER_BEARER_TOKEN']}"}
+    params = {"query": keyword, "max_results": max_results}
+    response = await async_http_client.get(_search_url(), params=params, headers=headers, provider="twitter")
+    return response.json()
+
+def iter_tweets(keyword, max_count=None, since_id=None, page_size=PAGE_SIZE):
+    """
+    Stream recent tweets matching a query newest-first, one page at a time.
+
+    Follows the ``next_token`` in each response's ``meta`` until the results
+    run out or ``max_count`` tweets have been yielded. With ``since_id`` only
+    tweets newer than that id are returned, so a poller can pass the newest
+    id it has already seen.
+
+    Args:
+        keyword: Search query
+        max_count: Maximum number of tweets to yield
+        since_id: Only return tweets with a greater id (exclusive)
+        page_size: Tweets per request (10 to 100)
+
+    Yields:
+        Tweet objects from the response's ``data`` array
+    """
+    headers = {"Authorization": f"Bearer {CONFIG['TWITTER_BEARER_TOKEN']}"}
+    page_size = max(MIN_PAGE_SIZE, min(page_size, PAGE_SIZE))
+    next_token = None
+    yielded = 0
+
+    while max_count is None or yielded < max_count:
+        params = {"query": keyword, "max_results": page_size}
+        if max_count is not None:
+            params["max_results"] = max(MIN_PAGE_SIZE, min(page_size, max_count - yielded))
+        if since_id:
+            params["since_id"] = since_id
+        if next_token:
+            params["next_token"] = next_token
+
+        response = http_client.get(_search_url(), params=params, headers=headers, provider="twitter")
+        if response.status_code != 200:
+            raise Exception(f"Twitter API error: {response.status_code} - {response.text}")
+        page = response.json()
+
+        for tweet in page.get("data", []):
+            yield tweet
+            yielded += 1
+            if max_count is not None and yielded >= max_count:
+                return
+
+        next_token = page.get("meta", {}).get("next_token")
+        if not next_token:
+            return
+
+def _search_url():
+    return f"{CONFIG['TWITTER_BASE_URL']}/tweets/search/recent"
@@ -0,0 +1,158 @@
+"""
+Token Amount Decoding
+Vectorized, exact decoding of ERC-20 uint256 ``value`` strings into token
+units scaled by each transfer's ``tokenDecimal``.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# A uint256 has at most 78 decimal digits; they are decoded as 5 limbs of
+# 18 digits each (10^18 - 1 fits an int64)
+MAX_DIGITS = 78
+LIMB_DIGITS = 18
+LIMB_COUNT = 5
+# Rows decoded per step, bounding the digit matrices to a few tens of MB
+CHUNK_ROWS = 65536
+
+_WIDTH = LIMB_DIGITS * LIMB_COUNT
+_HALF_DIGITS = LIMB_DIGITS // 2
+# Weights of a 9-digit half-limb: its dot product stays below 2^53, so float64 BLAS is exact
+_HALF_WEIGHTS = 10.0 ** np.arange(_HALF_DIGITS - 1, -1, -1)
+_LIMB_BASE = np.longdouble(10) ** LIMB_DIGITS
+
+
+def decode_uint256(values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split decimal integer strings into exact base-10^18 int64 limbs.
+
+    Values are cast to fixed-width bytes and read as a digit matrix, so no
+    value goes through a Python int or a float: left-aligned 18-digit
+    blocks come from one matrix product, then each row is shifted right by
+    its missing digits.
+
+    Args:
+        values: Array-like of decimal strings (Python ints are accepted too;
+            anything else is reported invalid)
+
+    Returns:
+        (limbs, valid): int64 array of shape (n, LIMB_COUNT), most significant
+        limb first, and a boolean mask of the rows holding 1 to MAX_DIGITS digits
+    """
+    values = np.asarray(values, dtype=object)
+    limbs = np.zeros((len(values), LIMB_COUNT), dtype=np.int64)
+    valid = np.zeros(len(values), dtype=bool)
+    for start in range(0, len(values), CHUNK_ROWS):
+        rows = slice(start, start + CHUNK_ROWS)
+        limbs[rows], valid[rows] = _decode_chunk(values[rows])
+    return limbs, valid
+
+
+def _decode_chunk(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    try:
+        raw = values.astype(f'S{_WIDTH}')
+    except UnicodeEncodeError:
+        ascii_only = np.fromiter((not isinstance(v, str) or v.isascii() for v in values), dtype=bool, count=len(values))
+        raw = np.where(ascii_only, values, '').astype(f'S{_WIDTH}')
+    # Left-aligned bytes, NUL-padded on the right (fixed-width bytes only pad at the end)
+    matrix = raw.view(np.uint8).reshape(len(values), _WIDTH)
+    length = np.count_nonzero(matrix, axis=1)
+    # Only decode as many limbs as the longest value in the chunk needs
+    limb_count = max(-(-int(length.max(initial=0)) // LIMB_DIGITS), 1)
+    width = min(limb_count, LIMB_COUNT) * LIMB_DIGITS
+    matrix = matrix[:, :width]
+    digits = matrix - np.uint8(ord('0'))
+    digits[matrix == 0] = 0
+    # Every byte must be a digit: no sign, dot, exponent or whitespace
+    valid = (digits.max(axis=1) <= 9) & (length > 0) & (length <= MAX_DIGITS)
+
+    halves = (digits.reshape(len(values), -1, _HALF_DIGITS) @ _HALF_WEIGHTS).astype(np.int64)
+    left = halves[:, 0::2] * 10 ** _HALF_DIGITS + halves[:, 1::2]
+
+    # value = left / 10^(width - length): drop whole limbs, then shift digits across limbs
+    shift = np.where(valid, width - length, 0)
+    whole, digits_shift = np.divmod(shift, LIMB_DIGITS)
+    source = np.arange(left.shape[1]) - whole[:, None]
+    shifted = np.where(source >= 0, np.take_along_axis(left, np.maximum(source, 0), axis=1), 0)
+    divisor = (10 ** digits_shift.astype(np.int64))[:, None]
+    carried = np.zeros_like(shifted)
+    carried[:, 1:] = (shifted[:, :-1] % divisor) * (10 ** LIMB_DIGITS // divisor)
+    limbs = np.zeros((len(values), LIMB_COUNT), dtype=np.int64)
+    limbs[:, LIMB_COUNT - left.shape[1]:] = shifted // divisor + carried
+    limbs[~valid] = 0
+    return limbs, valid
+
+
+def limbs_to_float(limbs: np.ndarray, decimals: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Convert limbs to float64, divided by 10 ** decimals.
+
+    Limbs are combined and scaled in extended precision, so the only
+    rounding that matters is the final cast: results are within an ulp or
+    so of the exact quotient instead of overflowing or truncating.
+    """
+    used = np.flatnonzero(limbs.any(axis=0))
+    total = np.zeros(len(limbs), dtype=np.longdouble)
+    # Leading limbs that are zero in every row are skipped
+    for position in range(used[0] if len(used) else LIMB_COUNT, LIMB_COUNT):
+        total = total * _LIMB_BASE + limbs[:, position].astype(np.longdouble)
+    if decimals is not None:
+        total /= _powers_of_ten(decimals)
+    return total.astype(float)
+
+
+def decode_token_amounts(values, decimals=None) -> pd.Series:
+    """
+    Token transfer amounts in whole-token units.
+
+    Digit strings (Etherscan's raw uint256 ``value``) are decoded exactly
+    with decode_uint256; numbers and other strings (e.g. "1e21") fall back
+    to pd.to_numeric. Missing or malformed values are NaN.
+
+    Args:
+        values: Series or array of raw amounts
+        decimals: Matching ``tokenDecimal`` values; missing or malformed
+            decimals, or None for the whole column, leave amounts in raw units
+
+    Returns:
+        float64 Series aligned with ``values``
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    values = np.asarray(values)
+    if decimals is not None:
+        decimals = pd.to_numeric(pd.Series(np.asarray(decimals), dtype=object), errors='coerce')
+        decimals = decimals.fillna(0).to_numpy(dtype=np.int64)
+
+    if values.dtype.kind in 'iu':
+        amounts = limbs_to_float(_integer_limbs(values), decimals)
+    elif values.dtype.kind == 'f':
+        amounts = values.astype(float)
+        if decimals is not None:
+            amounts = (amounts / _powers_of_ten(decimals)).astype(float)
+    else:
+        limbs, valid = decode_uint256(values)
+        amounts = limbs_to_float(limbs, decimals)
+        if not valid.all():
+            fallback = pd.to_numeric(pd.Series(values[~valid], dtype=object), errors='coerce').to_numpy(dtype=float)
+            if decimals is not None:
+                fallback = (fallback / _powers_of_ten(decimals[~valid])).astype(float)
+            amounts[~valid] = fallback
+    return pd.Series(amounts, index=index)
+
+
+def _integer_limbs(values: np.ndarray) -> np.ndarray:
+    # Integer columns fit in the two least significant limbs
+    limbs = np.zeros((len(values), LIMB_COUNT), dtype=np.int64)
+    values = values.astype(np.uint64) if values.dtype.kind == 'u' else values
+    base = 10 ** LIMB_DIGITS
+    limbs[:, -2] = values // base
+    limbs[:, -1] = values % base
+    return limbs
+
+
+def _powers_of_ten(decimals: np.ndarray) -> np.ndarray:
+    # A token has one tokenDecimal, so only a handful of distinct powers are computed
+    unique, inverse = np.unique(decimals, return_inverse=True)
+    return (np.longdouble(10) ** unique.astype(np.longdouble))[inverse]
@@ -0,0 +1,92 @@
+"""
+Grouped Array Helpers
+Building blocks for the batch feature extractors: per-entity counts, gaps,
+daily volumes and statistics over flat arrays labelled with entity codes.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+SECONDS_PER_DAY = 86400
+
+# Hours counted by the night and peak-hour ratios
+NIGHT_HOURS = (22, 23, 0, 1, 2, 3, 4, 5, 6)
+PEAK_HOURS = tuple(range(9, 18))
+
+
+def count_where(codes: np.ndarray, mask: np.ndarray, count: int) -> np.ndarray:
+    """Number of rows per entity where ``mask`` is true."""
+    return np.bincount(codes, weights=mask, minlength=count)
+
+
+def group_stats(values: pd.Series, codes: np.ndarray, count: int, stats: Sequence[str]) -> pd.DataFrame:
+    """
+    Aggregate ``values`` per entity code, skipping NaN like the pandas reductions do.
+
+    Returns:
+        One row per code in ``range(count)``; NaN for entities without values
+    """
+    return pd.Series(values.to_numpy(), copy=False).groupby(codes).agg(list(stats)).reindex(range(count))
+
+
+def consecutive_gaps(codes: np.ndarray, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Seconds between each event and the previous one of the same entity.
+
+    Events are ordered by entity then time with missing timestamps last,
+    as sort_values does; the first event of each entity, and any gap
+    touching a missing timestamp, is NaN.
+
+    Returns:
+        (codes in that order, gaps)
+    """
+    order = np.lexsort((np.where(np.isnan(ts), np.inf, ts), codes))
+    sorted_codes, sorted_ts = codes[order], ts[order]
+    gaps = np.full(len(sorted_ts), np.nan)
+    same_entity = sorted_codes[1:] == sorted_codes[:-1]
+    gaps[1:][same_entity] = np.diff(sorted_ts)[same_entity]
+    return sorted_codes, gaps
+
+
+def hour_of_day(ts: np.ndarray) -> np.ndarray:
+    """UTC hour of unix timestamps (NaN stays NaN)."""
+    return np.floor(np.mod(ts, SECONDS_PER_DAY) / 3600)
+
+
+def daily_counts(codes: np.ndarray, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Events per (entity, UTC day), sorted by entity then day; missing timestamps are skipped.
+
+    Returns:
+        (entity code of each day, events that day)
+    """
+    valid = ~np.isnan(ts)
+    days = np.floor(ts[valid] / SECONDS_PER_DAY).astype(np.int64)
+    if len(days) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    span = days.max() - days.min() + 1
+    keys, counts = np.unique(codes[valid] * span + (days - days.min()), return_counts=True)
+    return keys // span, counts
+
+
+def risk_category(risk_score: np.ndarray) -> np.ndarray:
+    """Vectorized HIGH / MEDIUM / LOW banding used by both extractors."""
+    return np.select([risk_score >= 70, risk_score >= 40], ['HIGH', 'MEDIUM'], 'LOW')
+
+
+def with_empty_entities(features: pd.DataFrame, entities: List[str], empty: Dict,
+                        integer_columns: Sequence[str] = ()) -> pd.DataFrame:
+    """
+    Reindex to ``entities``, giving those without events the extractor's empty feature set.
+
+    ``integer_columns`` (always filled for every entity) are cast back to
+    int64 after reindexing has made them float.
+    """
+    missing = ~pd.Index(entities).isin(features.index)
+    features = features.reindex(index=pd.Index(entities, name=features.index.name),
+                                columns=list(dict.fromkeys([*features.columns, *empty])))
+    for column, value in empty.items():
+        features.loc[missing, column] = value
+    return features.astype({column: np.int64 for column in integer_columns})
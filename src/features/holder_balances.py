@@ -0,0 +1,316 @@
+"""
+Holder Balance Reconstruction
+Replays a token's transfers into per-holder running balances and answers
+point-in-time supply concentration queries (holder count, HHI, top-N share
+at block B), the core signal for rug pulls and dumps.
+"""
+
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.features.amounts import decode_token_amounts
+from src.utils.interner import MISSING_ID, address_ids, get_address_interner
+
+# Mint source and burn sinks: balances of these addresses are not holdings
+NON_HOLDER_ADDRESSES = (
+    '0x0000000000000000000000000000000000000000',
+    '0x000000000000000000000000000000000000dead',
+)
+# A balance within this fraction of the transfer that produced it is float
+# residue of a full balance being sent out, and is snapped to zero
+RESIDUE = 1e-9
+
+TRANSFER_FIELDS = ('blockNumber', 'logIndex', 'hash', 'from', 'to', 'value', 'tokenDecimal')
+
+
+class HolderBalances:
+    """
+    Per-holder balances of one token, replayed in block order.
+
+    Every transfer becomes two balance changes (sender, receiver). They are
+    applied with per-holder cumulative sums, which also yield the holder
+    count, circulating supply and sum of squared balances after every change,
+    so holder count, supply and HHI at any block are one binary search away.
+    The non-zero balances are snapshotted every ``checkpoint_interval``
+    changes, or every as many changes as there are balances if that is more,
+    so all snapshots but the latest together hold no more entries than the
+    change log. A top-N query at block B starts from the nearest snapshot
+    and replays the changes since, never the history.
+
+    Transfers can be added incrementally as blocks arrive. A batch may
+    repeat the last block added (e.g. fetched again from startblock =
+    last_block); transfers already applied are recognised by their
+    (hash, logIndex) and skipped. If the history does not start at the
+    token's mint, balances of earlier holders go negative; only positive
+    balances count as holdings.
+    """
+
+    def __init__(self, checkpoint_interval: int = 10_000):
+        self.checkpoint_interval = checkpoint_interval
+        self.balances = np.zeros(0)
+        self.last_block: Optional[int] = None
+        self._non_holders = get_address_interner().intern(list(NON_HOLDER_ADDRESSES))
+        # Exact totals of the current balances, recomputed after every segment
+        self._supply = 0.0
+        self._sum_squares = 0.0
+        self._holders = 0
+        # Change log in replay order, one array per segment
+        self._log: Dict[str, List[np.ndarray]] = {name: [] for name in
+                                                  ('blocks', 'holders', 'after', 'supply', 'sum_squares', 'holder_count')}
+        self._log_cache: Optional[Dict[str, np.ndarray]] = None
+        self.change_count = 0
+        self._next_checkpoint = checkpoint_interval
+        # Keys of the transfers applied from last_block, to skip them if it arrives again
+        self._last_block_keys: set = set()
+        self._checkpoint_changes: List[int] = []
+        self._checkpoints: List[tuple] = []
+
+    def add_transfers(self, transfers: Union[List[Dict], pd.DataFrame]) -> int:
+        """
+        Replay transfers into the balances.
+
+        Args:
+            transfers: Etherscan transfer dictionaries or a DataFrame with
+                'blockNumber', 'from', 'to', 'value' and optionally
+                'logIndex', 'hash' and 'tokenDecimal'. Blocks may not
+                precede ones already added; transfers of the last block
+                added are skipped if already applied, which needs 'logIndex'.
+
+        Returns:
+            Number of balance changes applied
+        """
+        if isinstance(transfers, pd.DataFrame):
+            df = transfers
+        else:
+            df = pd.DataFrame([{k: t[k] for k in TRANSFER_FIELDS if k in t} for t in transfers])
+        if len(df) == 0:
+            return 0
+        missing = {'blockNumber', 'from', 'to', 'value'} - set(df.columns)
+        if missing:
+            raise Exception(f"Holder balance error: transfers are missing {sorted(missing)}")
+
+        blocks = pd.to_numeric(df['blockNumber'], errors='coerce').fillna(-1).to_numpy(dtype=np.int64)
+        log_index = (pd.to_numeric(df['logIndex'], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+                     if 'logIndex' in df.columns else np.zeros(len(df), dtype=np.int64))
+        order = np.lexsort((log_index, blocks))
+        first = blocks[order[0]]
+        if first < 0 or (self.last_block is not None and first < self.last_block):
+            raise Exception(f"Holder balance error: block {first} arrived after block {self.last_block}")
+        if 'logIndex' in df.columns:
+            keys = _transfer_keys(df, blocks, log_index)[order]
+            repeated = pd.Series(keys).duplicated().to_numpy()
+            if first == self.last_block:
+                repeated |= np.fromiter((key in self._last_block_keys for key in keys), bool, len(keys))
+            order, keys = order[~repeated], keys[~repeated]
+            if len(order) == 0:
+                return 0
+        elif first == self.last_block:
+            raise Exception(f"Holder balance error: block {first} was already added and transfers "
+                            f"without 'logIndex' cannot be matched against it")
+        else:
+            keys = None
+        blocks = blocks[order]
+        last_block = int(blocks[-1])
+        if keys is not None:
+            # Keys of a block that continues are added to the ones already seen
+            last_keys = set(keys[blocks == last_block])
+            self._last_block_keys = self._last_block_keys | last_keys if last_block == self.last_block else last_keys
+
+        amounts = decode_token_amounts(df['value'], df.get('tokenDecimal')).fillna(0).to_numpy()[order]
+        senders = address_ids(df['from'])[order]
+        receivers = address_ids(df['to'])[order]
+
+        # Sender then receiver change of each transfer, in transfer order
+        holders = np.column_stack([senders, receivers]).ravel()
+        deltas = np.column_stack([-amounts, amounts]).ravel()
+        blocks = np.repeat(blocks, 2)
+        keep = (holders != MISSING_ID) & ~np.isin(holders, self._non_holders) & (deltas != 0)
+        holders, deltas, blocks = holders[keep], deltas[keep], blocks[keep]
+        if len(holders) and holders.max() >= len(self.balances):
+            grown = np.zeros(max(int(holders.max()) + 1, 2 * len(self.balances)))
+            grown[:len(self.balances)] = self.balances
+            self.balances = grown
+
+        # Segments end where a checkpoint is due
+        start = 0
+        while start < len(holders):
+            end = start + self._next_checkpoint - self.change_count
+            self._apply(holders[start:end], deltas[start:end], blocks[start:end])
+            start = end
+        self.last_block = last_block
+        return len(holders)
+
+    def _apply(self, holders: np.ndarray, deltas: np.ndarray, blocks: np.ndarray):
+        # Group changes by holder (stable, so each group stays in replay order)
+        order = np.argsort(holders, kind='stable')
+        h, d = holders[order], deltas[order]
+        starts = np.r_[True, h[1:] != h[:-1]]
+        running = np.cumsum(d)
+        group_offset = (running - d)[starts][np.cumsum(starts) - 1]
+        after = self.balances[h] + running - group_offset
+        after[np.abs(after) <= RESIDUE * np.abs(d)] = 0
+        before = np.r_[0.0, after[:-1]]
+        before[starts] = self.balances[h[starts]]
+
+        held_after, held_before = np.maximum(after, 0), np.maximum(before, 0)
+        changes = {
+            'supply': held_after - held_before,
+            'sum_squares': held_after ** 2 - held_before ** 2,
+            'holder_count': (after > 0).astype(np.int64) - (before > 0),
+        }
+        replay_after = np.empty_like(after)
+        replay_after[order] = after
+        log = {'blocks': blocks, 'holders': holders, 'after': replay_after}
+        totals = {'supply': self._supply, 'sum_squares': self._sum_squares, 'holder_count': self._holders}
+        for name, change in changes.items():
+            replayed = np.empty_like(change)
+            replayed[order] = change
+            log[name] = totals[name] + np.cumsum(replayed)
+        for name, values in log.items():
+            self._log[name].append(values)
+        self._log_cache = None
+
+        ends = np.r_[starts[1:], True]
+        self.balances[h[ends]] = after[ends]
+        # Recompute totals exactly so rounding never accumulates across segments
+        held = np.maximum(self.balances, 0)
+        self._supply = float(held.sum())
+        self._sum_squares = float(np.dot(held, held))
+        self._holders = int(np.count_nonzero(held))
+
+        self.change_count += len(holders)
+        if self.change_count == self._next_checkpoint:
+            ids = np.flatnonzero(self.balances).astype(np.int32)
+            self._checkpoint_changes.append(self.change_count)
+            self._checkpoints.append((ids, self.balances[ids]))
+            # A snapshot costs one entry per balance, so it is spaced at least that many changes from the next
+            self._next_checkpoint = self.change_count + max(self.checkpoint_interval, len(ids))
+
+    def _replay_log(self) -> Dict[str, np.ndarray]:
+        if self._log_cache is None:
+            self._log_cache = {name: np.concatenate(parts) if parts else np.empty(0)
+                               for name, parts in self._log.items()}
+        return self._log_cache
+
+    def _changes_through(self, block: int) -> int:
+        return int(np.searchsorted(self._replay_log()['blocks'], block, side='right'))
+
+    def balances_at(self, block: int) -> pd.Series:
+        """
+        Positive balances of every holder after ``block``, largest first.
+
+        Starts from the last checkpoint at or before the block and replays
+        the balance changes after it.
+        """
+        ids, balances = self._state_at(self._changes_through(block))
+        held = balances > 0
+        addresses = get_address_interner().addresses(ids[held])
+        return pd.Series(balances[held], index=addresses).sort_values(ascending=False)
+
+    def _state_at(self, changes: int):
+        position = int(np.searchsorted(self._checkpoint_changes, changes, side='right')) - 1
+        if position >= 0:
+            ids, balances = self._checkpoints[position]
+            replay_from = self._checkpoint_changes[position]
+        else:
+            ids, balances, replay_from = np.empty(0, dtype=np.int32), np.empty(0), 0
+        log = self._replay_log()
+        # Latest value per holder wins: snapshot first, then replayed changes
+        ids = np.concatenate([ids, log['holders'][replay_from:changes]])
+        balances = np.concatenate([balances, log['after'][replay_from:changes]])
+        unique, last = np.unique(ids[::-1], return_index=True)
+        return unique, balances[::-1][last]
+
+    def concentration_at(self, block: int, top_n: int = 10) -> Dict[str, float]:
+        """
+        Supply concentration after ``block``.
+
+        Returns:
+            Dictionary with block, holder_count, supply, hhi (sum of squared
+            supply shares, 1 for a single holder) and top_holder_share (share
+            of the ``top_n`` largest holders)
+        """
+        changes = self._changes_through(block)
+        result = {'block': block, 'holder_count': 0, 'supply': 0.0, 'hhi': 0.0, 'top_holder_share': 0.0}
+        if changes == 0:
+            return result
+        log = self._replay_log()
+        supply = float(log['supply'][changes - 1])
+        result['holder_count'] = int(log['holder_count'][changes - 1])
+        result['supply'] = supply
+        if supply > 0:
+            result['hhi'] = float(log['sum_squares'][changes - 1]) / supply ** 2
+            _, balances = self._state_at(changes)
+            held = balances[balances > 0]
+            top = np.partition(held, len(held) - top_n)[-top_n:] if len(held) > top_n else held
+            result['top_holder_share'] = float(top.sum()) / supply
+        return result
+
+    def concentration_series(self, points: int = 100, top_n: int = 10) -> pd.DataFrame:
+        """
+        Concentration at up to ``points`` blocks spread evenly over the replayed changes.
+
+        Returns:
+            DataFrame with one row per block and the concentration_at() fields
+        """
+        blocks = self._replay_log()['blocks']
+        if len(blocks) == 0:
+            return pd.DataFrame(columns=['block', 'holder_count', 'supply', 'hhi', 'top_holder_share'])
+        sampled = np.unique(blocks[np.linspace(0, len(blocks) - 1, points).astype(np.int64)])
+        return pd.DataFrame([self.concentration_at(int(block), top_n) for block in sampled])
+
+
+def _transfer_keys(df: pd.DataFrame, blocks: np.ndarray, log_index: np.ndarray) -> np.ndarray:
+    # logIndex is unique within a block; the hash also covers sources that number logs per transaction
+    keys = pd.Series(blocks).astype(str) + ':' + pd.Series(log_index).astype(str)
+    if 'hash' in df.columns:
+        keys = keys + ':' + df['hash'].astype(str).to_numpy()
+    return keys.to_numpy()
+
+
+def concentration_features(series: Union[pd.DataFrame, List[Dict]]) -> Dict[str, float]:
+    """
+    Summarize a concentration series for fraud scoring.
+
+    Args:
+        series: HolderBalances.concentration_series() output, or its rows as dictionaries
+
+    Returns:
+        Dictionary with the latest holder_count, hhi and top_holder_share, the
+        series' max_top_holder_share, holder_drawdown (fraction of the peak
+        holder count lost since) and hhi_increase (latest HHI over its minimum)
+    """
+    series = pd.DataFrame(series)
+    if len(series) == 0:
+        return {'holder_count': 0, 'hhi': 0, 'top_holder_share': 0, 'max_top_holder_share': 0,
+                'holder_drawdown': 0, 'hhi_increase': 0}
+    latest = series.iloc[-1]
+    peak_holders = series['holder_count'].max()
+    return {
+        'holder_count': int(latest['holder_count']),
+        'hhi': float(latest['hhi']),
+        'top_holder_share': float(latest['top_holder_share']),
+        'max_top_holder_share': float(series['top_holder_share'].max()),
+        'holder_drawdown': 1 - latest['holder_count'] / peak_holders if peak_holders > 0 else 0,
+        'hhi_increase': float(latest['hhi'] - series['hhi'].min()),
+    }
+
+
+def extract_concentration_series(transfers: Union[List[Dict], pd.DataFrame], points: int = 100,
+                                 top_n: int = 10) -> pd.DataFrame:
+    """
+    Convenience function to replay a token's transfers and sample its concentration series.
+
+    Args:
+        transfers: List of token transfer dictionaries or a transfers DataFrame
+        points: Maximum number of sampled blocks
+        top_n: Number of largest holders in top_holder_share
+
+    Returns:
+        DataFrame of block, holder_count, supply, hhi and top_holder_share
+    """
+    balances = HolderBalances()
+    balances.add_transfers(transfers)
+    return balances.concentration_series(points, top_n)
@@ -0,0 +1,442 @@
+"""
+Incremental Feature State
+Per-wallet and per-token summaries that absorb new events in O(new events)
+and rebuild the extractors' feature dictionaries on demand.
+"""
+
+import abc
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.features import grouped
+from src.features.amounts import decode_token_amounts
+from src.features.sketches import CardinalitySketch, QuantileSketch, RunningMoments, TopCounts
+from src.features.token_features import TokenFeatureExtractor
+from src.features.wallet_features import WalletFeatureExtractor
+from src.utils.interner import MISSING_ID, address_ids, get_address_interner
+
+
+class _FeatureState(abc.ABC):
+    """
+    Shared bookkeeping: event count, which source fields have been seen,
+    and the timestamp summaries behind the day, gap and hour features.
+
+    Gap features (minimum gap, rapid ratio) assume each update brings
+    events newer than those already absorbed, as a watermark sync does.
+    Within a batch order does not matter, and the average gap is exact
+    regardless, since it only depends on the first and last timestamp.
+    """
+
+    extractor_class = None
+    time_field = None
+    # Gaps shorter than this many seconds count as rapid
+    rapid_seconds = None
+    # (avg gap, min gap, rapid ratio, night ratio, peak ratio) feature names
+    temporal_features = ()
+
+    def __init__(self):
+        self.count = 0
+        self.fields = set()
+        self.timestamps = RunningMoments()
+        self.min_gap = math.inf
+        self.rapid_count = 0
+        self.hour_counts = np.zeros(24, dtype=np.int64)
+        self.day_counts: Dict[int, int] = {}
+
+    def update(self, events: Union[Iterable[Dict], pd.DataFrame]) -> int:
+        """
+        Absorb new events.
+
+        Args:
+            events: Event dictionaries as returned by the API clients, or a DataFrame
+
+        Returns:
+            Number of events absorbed
+        """
+        if isinstance(events, pd.DataFrame):
+            df = events
+        else:
+            source_fields = self.extractor_class.SOURCE_FIELDS
+            df = pd.DataFrame([{k: e[k] for k in source_fields if k in e} for e in events])
+        if len(df) == 0:
+            return 0
+
+        self.count += len(df)
+        self.fields.update(df.columns)
+        if self.time_field in df.columns:
+            self._update_times(pd.to_numeric(df[self.time_field], errors='coerce').to_numpy(dtype=float))
+        self._update(df)
+        return len(df)
+
+    def _update_times(self, ts: np.ndarray):
+        ts = np.sort(ts[~np.isnan(ts)])
+        if len(ts) == 0:
+            return
+        if self.timestamps.count:
+            ts_with_previous = np.concatenate([[self.timestamps.maximum], ts])
+            gaps = np.diff(ts_with_previous)
+            # An older event than the newest seen has no known neighbour
+            gaps = gaps[gaps >= 0] if gaps[0] < 0 else gaps
+        else:
+            gaps = np.diff(ts)
+        if len(gaps):
+            self.min_gap = min(self.min_gap, float(gaps.min()))
+            self.rapid_count += int(np.count_nonzero(gaps < self.rapid_seconds))
+
+        self.timestamps.add_many(ts)
+        self.hour_counts += np.bincount(grouped.hour_of_day(ts).astype(np.int64), minlength=24)
+        days, counts = np.unique(np.floor(ts / grouped.SECONDS_PER_DAY).astype(np.int64), return_counts=True)
+        for day, count in zip(days.tolist(), counts.tolist()):
+            self.day_counts[day] = self.day_counts.get(day, 0) + count
+
+    @abc.abstractmethod
+    def _update(self, df: pd.DataFrame):
+        """Absorb the subclass-specific summaries of new events."""
+
+    def merge(self, other: '_FeatureState'):
+        """
+        Fold in the state of another, disjoint set of events; returns self.
+
+        Counts, moments, day and hour summaries merge exactly, so those
+        features come out the same in any grouping. The sketched features
+        (see features()) stay within their sketches' error bounds but may
+        differ slightly between groupings. The gap at each shard boundary is
+        recovered when the shards cover non-overlapping time ranges (e.g.
+        block ranges); for overlapping ranges it is unknown and skipped.
+        """
+        if type(other) is not type(self):
+            raise TypeError(f"Cannot merge {type(other).__name__} into {type(self).__name__}")
+        mine, theirs = self.timestamps, other.timestamps
+        if mine.count and theirs.count:
+            boundary_gap = None
+            if mine.maximum <= theirs.minimum:
+                boundary_gap = theirs.minimum - mine.maximum
+            elif theirs.maximum <= mine.minimum:
+                boundary_gap = mine.minimum - theirs.maximum
+            if boundary_gap is not None:
+                self.min_gap = min(self.min_gap, boundary_gap)
+                self.rapid_count += int(boundary_gap < self.rapid_seconds)
+
+        self.count += other.count
+        self.fields |= other.fields
+        self.timestamps.merge(other.timestamps)
+        self.min_gap = min(self.min_gap, other.min_gap)
+        self.rapid_count += other.rapid_count
+        self.hour_counts = self.hour_counts + other.hour_counts
+        for day, count in other.day_counts.items():
+            self.day_counts[day] = self.day_counts.get(day, 0) + count
+        self._merge(other)
+        return self
+
+    @abc.abstractmethod
+    def _merge(self, other: '_FeatureState'):
+        """Fold in the subclass-specific summaries of another state."""
+
+    def features(self) -> Dict[str, float]:
+        """
+        The extractor's feature dictionary for every event absorbed so far.
+
+        Counts, ratios, day and hour features, means and standard deviations
+        are exact. Percentile-based ratios and the Gini come from a
+        QuantileSketch and are approximate; ties at a percentile can move
+        large/dust ratios by a few points. Address features are exact up to
+        TopCounts' capacity of distinct addresses. Beyond it they are
+        approximate: distinct counts are HyperLogLog estimates (about 1.6%
+        error), top concentration may overstate by up to max_error() / count,
+        and sender/receiver diversity only sees the tracked addresses, so
+        it understates.
+
+        Returns:
+            Dictionary of feature names and values
+        """
+        extractor = self.extractor_class()
+        if self.count == 0:
+            return extractor._get_empty_features()
+        extractor.features = self._features()
+        extractor._extract_risk_features()
+        return extractor.features
+
+    @abc.abstractmethod
+    def _features(self) -> Dict[str, float]:
+        """Feature dictionary before risk scoring."""
+
+    def _unique_days(self) -> int:
+        return max(len(self.day_counts), 1) if self.time_field in self.fields else 1
+
+    def _temporal_features(self) -> Dict[str, float]:
+        avg_gap, min_gap, rapid, night, peak = self.temporal_features
+        timestamps = self.timestamps
+        return {
+            avg_gap: (timestamps.maximum - timestamps.minimum) / (timestamps.count - 1)
+            if timestamps.count > 1 else math.nan,
+            min_gap: self.min_gap if self.min_gap != math.inf else math.nan,
+            rapid: self.rapid_count / self.count,
+            night: int(self.hour_counts[list(grouped.NIGHT_HOURS)].sum()) / self.count,
+            peak: int(self.hour_counts[list(grouped.PEAK_HOURS)].sum()) / self.count,
+        }
+
+    def _daily_volume(self) -> np.ndarray:
+        return np.array([self.day_counts[day] for day in sorted(self.day_counts)], dtype=np.int64)
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable snapshot; restore it with from_dict()."""
+        return {
+            'count': self.count,
+            'fields': sorted(self.fields),
+            'timestamps': self.timestamps.to_dict(),
+            'min_gap': None if self.min_gap == math.inf else self.min_gap,
+            'rapid_count': self.rapid_count,
+            'hour_counts': self.hour_counts.tolist(),
+            'day_counts': {str(day): count for day, count in self.day_counts.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        state = cls()
+        state.count = data['count']
+        state.fields = set(data['fields'])
+        state.timestamps = RunningMoments.from_dict(data['timestamps'])
+        state.min_gap = math.inf if data['min_gap'] is None else data['min_gap']
+        state.rapid_count = data['rapid_count']
+        state.hour_counts = np.array(data['hour_counts'], dtype=np.int64)
+        state.day_counts = {int(day): count for day, count in data['day_counts'].items()}
+        return state
+
+
+class WalletFeatureState(_FeatureState):
+    """
+    Incremental WalletFeatureExtractor: transaction type counts, timestamp
+    summaries and Welford fee moments, with a QuantileSketch for the 95th
+    percentile behind high_fee_ratio.
+    """
+
+    extractor_class = WalletFeatureExtractor
+    time_field = 'timestamp'
+    rapid_seconds = 60
+    temporal_features = ('avg_time_between_txns', 'min_time_between_txns', 'rapid_transactions_ratio',
+                         'night_transactions_ratio', 'peak_hour_ratio')
+
+    def __init__(self):
+        super().__init__()
+        self.transfer_count = 0
+        self.swap_count = 0
+        self.fees = RunningMoments()
+        self.fee_sketch = QuantileSketch()
+
+    def _update(self, df: pd.DataFrame):
+        if 'type' in df.columns:
+            self.transfer_count += int((df['type'] == 'TRANSFER').sum())
+            self.swap_count += int((df['type'] == 'SWAP').sum())
+        if 'fee' in df.columns:
+            fees = pd.to_numeric(df['fee'], errors='coerce').dropna().to_numpy(dtype=float)
+            self.fees.add_many(fees)
+            self.fee_sketch.add_many(fees)
+
+    def _merge(self, other: 'WalletFeatureState'):
+        self.transfer_count += other.transfer_count
+        self.swap_count += other.swap_count
+        self.fees.merge(other.fees)
+        self.fee_sketch.merge(other.fee_sketch)
+
+    def _features(self) -> Dict[str, float]:
+        n = self.count
+        features = {'total_transactions': n, 'unique_days': self._unique_days()}
+        features['avg_transactions_per_day'] = n / features['unique_days']
+        if 'type' in self.fields:
+            features['transfer_ratio'] = self.transfer_count / n
+            features['swap_ratio'] = self.swap_count / n
+        if self.time_field in self.fields:
+            features.update(self._temporal_features())
+
+        if self.fees.count:
+            fees = self.fees
+            features['avg_fee'] = fees.mean
+            features['fee_std'] = fees.std
+            features['min_fee'] = fees.minimum
+            features['max_fee'] = fees.maximum
+            features['fee_volatility'] = fees.std / fees.mean if fees.mean > 0 else 0
+            features['high_fee_ratio'] = self.fee_sketch.count_above(self.fee_sketch.quantile(0.95)) / fees.count
+
+        if self.time_field in self.fields and 'fee' in self.fields:
+            daily_volume = self._daily_volume()
+            features['daily_volume_std'] = daily_volume.std(ddof=1) if len(daily_volume) > 1 else math.nan
+            features['max_daily_transactions'] = daily_volume.max() if len(daily_volume) else math.nan
+            if len(daily_volume) > 1:
+                features['volume_volatility'] = np.abs(np.diff(daily_volume)).mean()
+        return features
+
+    def to_dict(self) -> Dict:
+        return {
+            **super().to_dict(),
+            'transfer_count': self.transfer_count,
+            'swap_count': self.swap_count,
+            'fees': self.fees.to_dict(),
+            'fee_sketch': self.fee_sketch.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'WalletFeatureState':
+        state = super().from_dict(data)
+        state.transfer_count = data['transfer_count']
+        state.swap_count = data['swap_count']
+        state.fees = RunningMoments.from_dict(data['fees'])
+        state.fee_sketch = QuantileSketch.from_dict(data['fee_sketch'])
+        return state
+
+
+class TokenFeatureState(_FeatureState):
+    """
+    Incremental TokenFeatureExtractor: Welford value moments, a
+    QuantileSketch for the 5th/95th percentile ratios and the Gini, and per
+    direction a HyperLogLog plus Space-Saving counts for the address features.
+    """
+
+    extractor_class = TokenFeatureExtractor
+    time_field = 'timeStamp'
+    rapid_seconds = 300
+    temporal_features = ('avg_time_between_transfers', 'min_time_between_transfers', 'rapid_transfers_ratio',
+                         'night_transfers_ratio', 'peak_hour_ratio')
+
+    def __init__(self):
+        super().__init__()
+        self.values = RunningMoments()
+        self.value_sketch = QuantileSketch()
+        self.senders = CardinalitySketch()
+        self.receivers = CardinalitySketch()
+        self.top_senders = TopCounts()
+        self.top_receivers = TopCounts()
+        self.self_transfer_count = 0
+
+    def _update(self, df: pd.DataFrame):
+        if 'value' in df.columns:
+            values = decode_token_amounts(df['value'], df.get('tokenDecimal')).dropna().to_numpy(dtype=float)
+            self.values.add_many(values)
+            self.value_sketch.add_many(values)
+        if 'from' in df.columns and 'to' in df.columns:
+            from_ids, to_ids = address_ids(df['from']), address_ids(df['to'])
+            for ids, sketch, top in ((from_ids, self.senders, self.top_senders),
+                                     (to_ids, self.receivers, self.top_receivers)):
+                # Counted on interned IDs; sketches keep the (normalized) addresses
+                unique, counts = np.unique(ids[ids != MISSING_ID], return_counts=True)
+                addresses = get_address_interner().addresses(unique).tolist()
+                sketch.add_many(addresses)
+                top.add_counts(dict(zip(addresses, counts.tolist())))
+            self.self_transfer_count += int(np.count_nonzero((from_ids == to_ids) & (from_ids != MISSING_ID)))
+
+    def _merge(self, other: 'TokenFeatureState'):
+        self.values.merge(other.values)
+        self.value_sketch.merge(other.value_sketch)
+        self.senders.merge(other.senders)
+        self.receivers.merge(other.receivers)
+        self.top_senders.merge(other.top_senders)
+        self.top_receivers.merge(other.top_receivers)
+        self.self_transfer_count += other.self_transfer_count
+
+    def _features(self) -> Dict[str, float]:
+        n = self.count
+        features = {'total_transfers': n, 'unique_days': self._unique_days()}
+        features['avg_transfers_per_day'] = n / features['unique_days']
+        has_addresses = 'from' in self.fields and 'to' in self.fields
+        if has_addresses:
+            features['unique_senders'] = _distinct(self.top_senders, self.senders)
+            features['unique_receivers'] = _distinct(self.top_receivers, self.receivers)
+            features['address_diversity'] = (features['unique_senders'] + features['unique_receivers']) / (2 * n)
+
+        if self.values.count:
+            values, sketch = self.values, self.value_sketch
+            features['avg_transfer_value'] = values.mean
+            features['value_std'] = values.std
+            features['min_transfer_value'] = values.minimum
+            features['max_transfer_value'] = values.maximum
+            features['value_volatility'] = values.std / values.mean if values.mean > 0 else 0
+            features['large_transfer_ratio'] = sketch.count_above(sketch.quantile(0.95)) / values.count
+            features['dust_transfer_ratio'] = sketch.count_below(sketch.quantile(0.05)) / values.count
+            if values.total > 0:
+                features['value_concentration'] = sketch.gini()
+
+        if self.time_field in self.fields:
+            features.update(self._temporal_features())
+
+        if has_addresses:
+            features['top_sender_concentration'] = (self.top_senders.top() or 0) / n
+            features['top_receiver_concentration'] = (self.top_receivers.top() or 0) / n
+            features['sender_diversity'] = self.top_senders.distinct_counts() / n
+            features['receiver_diversity'] = self.top_receivers.distinct_counts() / n
+            features['self_transfer_ratio'] = self.self_transfer_count / n
+        return features
+
+    def to_dict(self) -> Dict:
+        return {
+            **super().to_dict(),
+            'values': self.values.to_dict(),
+            'value_sketch': self.value_sketch.to_dict(),
+            'senders': self.senders.to_dict(),
+            'receivers': self.receivers.to_dict(),
+            'top_senders': self.top_senders.to_dict(),
+            'top_receivers': self.top_receivers.to_dict(),
+            'self_transfer_count': self.self_transfer_count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TokenFeatureState':
+        state = super().from_dict(data)
+        state.values = RunningMoments.from_dict(data['values'])
+        state.value_sketch = QuantileSketch.from_dict(data['value_sketch'])
+        state.senders = CardinalitySketch.from_dict(data['senders'])
+        state.receivers = CardinalitySketch.from_dict(data['receivers'])
+        state.top_senders = TopCounts.from_dict(data['top_senders'])
+        state.top_receivers = TopCounts.from_dict(data['top_receivers'])
+        state.self_transfer_count = data['self_transfer_count']
+        return state
+
+
+def _distinct(top: TopCounts, sketch: CardinalitySketch) -> int:
+    # Exact while every address still has its own counter
+    return len(top.counts) if top.exact else int(round(sketch.estimate()))
+
+
+def merge_states(states: Iterable[_FeatureState]) -> _FeatureState:
+    """Reduce states of disjoint event sets into one (the first state is updated in place)."""
+    return reduce(lambda merged, state: merged.merge(state), states)
+
+
+def split_by_range(events: pd.DataFrame, column: str, shard_count: int) -> List[pd.DataFrame]:
+    """
+    Split events into ``shard_count`` contiguous ranges of ``column`` (e.g.
+    'blockNumber' or 'timeStamp'), so shard time ranges do not overlap.
+    """
+    order = pd.to_numeric(events[column], errors='coerce').to_numpy(dtype=float).argsort(kind='stable')
+    return [events.iloc[part] for part in np.array_split(order, shard_count) if len(part)]
+
+
+def build_state_sharded(state_class, shards: Iterable[Union[pd.DataFrame, List[Dict]]],
+                        max_workers: Optional[int] = None) -> _FeatureState:
+    """
+    Build a state per shard in a process pool and merge them.
+
+    Each worker returns a bounded-size state regardless of how many events
+    its shard held, so memory in the parent stays flat as shards grow.
+
+    Args:
+        state_class: WalletFeatureState or TokenFeatureState
+        shards: DataFrames or event lists, e.g. from split_by_range
+        max_workers: Worker processes (defaults to the CPU count)
+
+    Returns:
+        The merged state; call features() on it for the feature dictionary
+    """
+    shards = list(shards)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        states = list(executor.map(_shard_state, [state_class] * len(shards), shards))
+    return merge_states(states) if states else state_class()
+
+
+def _shard_state(state_class, events) -> _FeatureState:
+    state = state_class()
+    state.update(events)
+    return state
@@ -0,0 +1,323 @@
+"""
+Streaming Feature Sketches
+Bounded-memory, JSON-serializable summaries that the incremental feature
+state (src/features/online.py) updates one batch of events at a time.
+"""
+
+import base64
+import math
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class RunningMoments:
+    """
+    Count, mean, variance (Welford), sum, min and max of a stream of numbers.
+
+    Batches are folded in with Chan's pairwise update, so adding values one
+    at a time or all at once, or merging summaries of disjoint parts, gives
+    the same result up to rounding.
+    """
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0, total: float = 0.0,
+                 minimum: float = math.inf, maximum: float = -math.inf):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.total = total
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def add_many(self, values: np.ndarray):
+        """Add a batch of values (NaN must already be removed)."""
+        if len(values) == 0:
+            return
+        values = np.asarray(values, dtype=float)
+        batch_mean = float(values.mean())
+        self._combine(len(values), batch_mean, float(((values - batch_mean) ** 2).sum()),
+                      float(values.sum()), float(values.min()), float(values.max()))
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        """Fold in another summary; returns self."""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.total, other.minimum, other.maximum)
+        return self
+
+    def _combine(self, count: int, mean: float, m2: float, total: float, minimum: float, maximum: float):
+        combined = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / combined
+        self.m2 += m2 + delta * delta * self.count * count / combined
+        self.count = combined
+        self.total += total
+        self.minimum = min(self.minimum, minimum)
+        self.maximum = max(self.maximum, maximum)
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, as pandas); NaN below two values."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+    def to_dict(self) -> Dict:
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'total': self.total,
+                'minimum': self.minimum if self.count else None,
+                'maximum': self.maximum if self.count else None}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RunningMoments':
+        return cls(data['count'], data['mean'], data['m2'], data['total'],
+                   math.inf if data['minimum'] is None else data['minimum'],
+                   -math.inf if data['maximum'] is None else data['maximum'])
+
+
+class QuantileSketch:
+    """
+    Log-bucketed histogram of non-negative values (DDSketch style).
+
+    Every positive value lands in the bucket ``ceil(log_gamma(value))``, so
+    quantiles are returned within ``relative_accuracy`` of a true value.
+    Zero (and anything negative) is kept in its own bucket. The bucket count
+    grows with log(max / min), not with the number of values: about 3,500
+    buckets span 1 to 1e30 at the default 1% accuracy.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.zero_count = 0
+        self.bins: Dict[int, int] = {}
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.bins.values())
+
+    def add_many(self, values: np.ndarray):
+        """Add a batch of values (NaN must already be removed)."""
+        values = np.asarray(values, dtype=float)
+        positive = values[values > 0]
+        self.zero_count += len(values) - len(positive)
+        keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.bins[key] = self.bins.get(key, 0) + count
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Add another sketch's buckets; returns self. Exact: the result equals one sketch of both inputs."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge quantile sketches with different relative accuracy")
+        self.zero_count += other.zero_count
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Estimate of the q-quantile; NaN when empty."""
+        count = self.count
+        if count == 0:
+            return math.nan
+        rank = q * (count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.bins))
+
+    def count_above(self, value: float) -> int:
+        """Values in buckets strictly above the one holding ``value``."""
+        if value <= 0:
+            return sum(self.bins.values())
+        key = self._key(value)
+        return sum(count for k, count in self.bins.items() if k > key)
+
+    def count_below(self, value: float) -> int:
+        """Values in buckets strictly below the one holding ``value``."""
+        if value <= 0:
+            return 0
+        key = self._key(value)
+        return self.zero_count + sum(count for k, count in self.bins.items() if k < key)
+
+    def gini(self) -> float:
+        """
+        The extractors' Gini formula over bucket midpoints: ``(n + 1 - 2 * sum(cumsum) / total) / n``.
+
+        Returns NaN when there is no positive value.
+        """
+        n = self.count
+        running = cumsum_total = 0.0
+        for key in sorted(self.bins):
+            value, count = self._value(key), self.bins[key]
+            # Cumulative sums inside the bucket: running + value, running + 2 * value, ...
+            cumsum_total += count * running + value * count * (count + 1) / 2
+            running += value * count
+        if running <= 0:
+            return math.nan
+        return (n + 1 - 2 * cumsum_total / running) / n
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        # Midpoint (in relative terms) of (gamma^(key-1), gamma^key]
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def to_dict(self) -> Dict:
+        return {'relative_accuracy': self.relative_accuracy, 'zero_count': self.zero_count,
+                'bins': {str(key): count for key, count in self.bins.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileSketch':
+        sketch = cls(data['relative_accuracy'])
+        sketch.zero_count = data['zero_count']
+        sketch.bins = {int(key): count for key, count in data['bins'].items()}
+        return sketch
+
+
+class CardinalitySketch:
+    """
+    HyperLogLog estimate of the number of distinct strings.
+
+    2 ** precision one-byte registers (4 KB at the default precision of 12)
+    give a standard error of about 1.04 / sqrt(2 ** precision), i.e. 1.6%.
+    Hashing uses pandas' fixed-key hash_array, so registers built in
+    different processes agree.
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 11 <= precision <= 18:
+            raise ValueError(f"precision must be between 11 and 18, got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_many(self, items: Iterable[str]):
+        """Add a batch of strings (missing values must already be removed)."""
+        items = np.asarray(list(items), dtype=object)
+        if len(items) == 0:
+            return
+        hashes = pd.util.hash_array(items)
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = hashes & np.uint64((1 << width) - 1)
+        # Position of the first set bit in the remaining bits; frexp's exponent
+        # is the exact bit length since they fit a float's 53-bit mantissa
+        bit_length = np.frexp(rest.astype(float))[1]
+        rank = (width + 1 - bit_length).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'CardinalitySketch') -> 'CardinalitySketch':
+        """Union with another sketch (register-wise maximum); returns self."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge cardinality sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            return m * math.log(m / zeros)
+        return estimate
+
+    def to_dict(self) -> Dict:
+        return {'precision': self.precision, 'registers': base64.b64encode(self.registers.tobytes()).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CardinalitySketch':
+        sketch = cls(data['precision'])
+        sketch.registers = np.frombuffer(base64.b64decode(data['registers']), dtype=np.uint8).copy()
+        return sketch
+
+
+class TopCounts:
+    """
+    Space-Saving heavy-hitter counts over at most ``capacity`` keys.
+
+    Counts are exact until more than ``capacity`` distinct keys have been
+    seen (``exact`` turns False). After that new keys start from the
+    smallest counter and only the largest counters are kept, so a reported
+    count overestimates the true one by at most the smallest counter.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.exact = True
+
+    def add_counts(self, counts: Dict[str, int]):
+        """
+        Add per-key occurrence counts from a batch.
+
+        The batch is folded in at once instead of evicting key by key: new
+        keys are credited the current smallest counter (0 while exact), as
+        a Space-Saving eviction would, and only the ``capacity`` largest
+        counters are kept, chosen with one partial sort per batch.
+        """
+        floor = self._floor()
+        combined = dict(self.counts)
+        for key, count in counts.items():
+            combined[key] = combined[key] + count if key in combined else count + floor
+        self._keep_largest(combined)
+
+    def _floor(self) -> int:
+        # Upper bound on the count of any key that is not tracked
+        return 0 if self.exact or not self.counts else min(self.counts.values())
+
+    def _keep_largest(self, counts: Dict[str, int]):
+        if len(counts) > self.capacity:
+            keys = list(counts)
+            values = np.fromiter(counts.values(), dtype=np.int64, count=len(keys))
+            largest = np.argpartition(-values, self.capacity - 1)[:self.capacity]
+            counts = {keys[i]: int(values[i]) for i in largest.tolist()}
+            self.exact = False
+        self.counts = counts
+
+    def merge(self, other: 'TopCounts') -> 'TopCounts':
+        """
+        Fold another summary into this one; returns self.
+
+        Mergeable Space-Saving: shared keys sum their counters, a key
+        tracked on one side only is credited the other side's max_error()
+        (0 while exact), and the ``capacity`` largest counters are kept.
+        While the union fits in ``capacity`` the result is exact and the
+        same in any merge order. Past that it is approximate and may depend
+        on the grouping, but every count still lies between the true count
+        and the true count plus max_error(), and no untracked key has a true
+        count above max_error().
+        """
+        own_floor, other_floor = self._floor(), other._floor()
+        combined = {key: count + other.counts.get(key, other_floor) for key, count in self.counts.items()}
+        for key, count in other.counts.items():
+            if key not in combined:
+                combined[key] = count + own_floor
+        self.exact = self.exact and other.exact
+        self._keep_largest(combined)
+        return self
+
+    def max_error(self) -> int:
+        """Largest possible overestimate of a reported count (0 while exact)."""
+        return self._floor()
+
+    def top(self) -> Optional[int]:
+        """Largest count, or None when nothing was added."""
+        return max(self.counts.values()) if self.counts else None
+
+    def distinct_counts(self) -> int:
+        """Number of different count values among the tracked keys."""
+        return len(set(self.counts.values()))
+
+    def to_dict(self) -> Dict:
+        return {'capacity': self.capacity, 'counts': dict(self.counts), 'exact': self.exact}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TopCounts':
+        top = cls(data['capacity'])
+        top.counts = dict(data['counts'])
+        top.exact = data['exact']
+        return top
@@ -8,13 +8,33 @@ import numpy as np
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+from src.features import grouped
+from src.features.amounts import decode_token_amounts
+from src.utils.interner import MISSING_ID, address_ids
+
+# Features added by graph_features=True (TransferGraph.features()), in order
+GRAPH_FEATURES = (
+    'graph_nodes', 'graph_edges', 'reciprocal_edge_ratio', 'wash_trade_pairs', 'wash_trade_ratio',
+    'cycle_3_count', 'scc_count', 'largest_scc_size', 'scc_node_ratio', 'degree_gini',
+    'max_degree_share', 'pagerank_max', 'pagerank_top10_share',
+)
+
 
 class TokenFeatureExtractor:
     """
     Extracts fraud detection features from token transfer data.
     """
     
-    def __init__(self):
+    # Transfer fields read by the extractor
+    SOURCE_FIELDS = ('timeStamp', 'value', 'tokenDecimal', 'from', 'to')
+    
+    def __init__(self, graph_features: bool = False):
+        """
+        Args:
+            graph_features: Also build the token's transfer graph and add its
+                structural features (wash trades, cycles, rings, centrality)
+        """
+        self.graph_features = graph_features
         self.features = {}
     
     def extract_features(self, transfers: List[Dict]) -> Dict[str, float]:
@@ -22,26 +42,65 @@ class TokenFeatureExtractor:
         Extract comprehensive fraud detection features from token transfers.
         
         Args:
-            transfers: List of token transfer dictionaries from Etherscan API
+            transfers: List of token transfer dictionaries from Etherscan API,
+                any iterable yielding them, or a columnar DataFrame such as
+                etherscan_api.get_token_transfer_frame or ColumnarStore.read
+                returns
             
         Returns:
             Dictionary of feature names and values
         """
-        if not transfers:
-            return self._get_empty_features()
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(transfers)
+        if isinstance(transfers, pd.DataFrame):
+            if len(transfers) == 0:
+                return self._get_empty_features()
+            # Shallow copy: the extractors add columns, the caller's frame stays intact
+            df = transfers.copy(deep=False)
+        else:
+            if not isinstance(transfers, (list, tuple)):
+                # Consume iterators lazily, keeping only the fields we read
+                transfers = [{k: r[k] for k in self.SOURCE_FIELDS if k in r} for r in transfers]
+            if not transfers:
+                return self._get_empty_features()
+            # Convert to DataFrame
+            df = pd.DataFrame(transfers)
+        
+        # Count and compare addresses as interned int32 IDs
+        if 'from' in df.columns and 'to' in df.columns:
+            df['from'] = address_ids(df['from'])
+            df['to'] = address_ids(df['to'])
         
         # Extract features
         self._extract_basic_features(df)
         self._extract_value_features(df)
         self._extract_temporal_features(df)
         self._extract_address_features(df)
+        if self.graph_features:
+            self._extract_graph_features(df)
         self._extract_risk_features(df)
         
         return self.features
     
+    def extract_features_from_store(self, store, token_scope: str,
+                                    start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, float]:
+        """
+        Extract features from a token's transfers in a ColumnarStore.
+        
+        Only SOURCE_FIELDS are read from disk, the time range is pushed
+        down to the store's day partitions and addresses arrive interned.
+        
+        Args:
+            store: src.storage.columnar_store.ColumnarStore holding Etherscan transfers
+            token_scope: Store key of the token, see src.api.sync.token_scope
+            start: Earliest unix timestamp to include
+            end: Unix timestamp to stop before (exclusive)
+            
+        Returns:
+            Dictionary of feature names and values
+        """
+        df = store.read('ethereum', token_scope, start=start, end=end, columns=self.SOURCE_FIELDS,
+                        intern_addresses=True)
+        return self.extract_features(df)
+    
     def _extract_basic_features(self, df: pd.DataFrame):
         """Extract basic transfer statistics."""
         self.features['total_transfers'] = len(df)
@@ -51,8 +110,8 @@ class TokenFeatureExtractor:
         # Transfer directions
         if 'from' in df.columns and 'to' in df.columns:
             # Count unique addresses
-            unique_from = df['from'].nunique()
-            unique_to = df['to'].nunique()
+            unique_from = len(_transfers_per_address(df['from']))
+            unique_to = len(_transfers_per_address(df['to']))
             self.features['unique_senders'] = unique_from
             self.features['unique_receivers'] = unique_to
             self.features['address_diversity'] = (unique_from + unique_to) / (2 * self.features['total_transfers'])
@@ -62,8 +121,8 @@ class TokenFeatureExtractor:
         if 'value' not in df.columns:
             return
         
-        # Convert value to numeric
-        values_series = pd.to_numeric(df['value'], errors='coerce')
+        # Exact uint256 decoding, in whole tokens when tokenDecimal is known
+        values_series = decode_token_amounts(df['value'], df.get('tokenDecimal'))
         values = values_series.dropna()
         
         if len(values) == 0:
@@ -134,25 +193,35 @@ class TokenFeatureExtractor:
             return
         
         # Address reuse patterns
-        from_counts = df['from'].value_counts()
-        to_counts = df['to'].value_counts()
+        from_counts = _transfers_per_address(df['from'])
+        to_counts = _transfers_per_address(df['to'])
         
         # Top sender/receiver concentration
-        top_sender_ratio = from_counts.iloc[0] / len(df) if len(from_counts) > 0 else 0
-        top_receiver_ratio = to_counts.iloc[0] / len(df) if len(to_counts) > 0 else 0
+        top_sender_ratio = from_counts.max() / len(df) if len(from_counts) > 0 else 0
+        top_receiver_ratio = to_counts.max() / len(df) if len(to_counts) > 0 else 0
         
         self.features['top_sender_concentration'] = top_sender_ratio
         self.features['top_receiver_concentration'] = top_receiver_ratio
         
         # Address diversity
-        self.features['sender_diversity'] = from_counts.nunique() / len(df)
-        self.features['receiver_diversity'] = to_counts.nunique() / len(df)
+        self.features['sender_diversity'] = len(np.unique(from_counts)) / len(df)
+        self.features['receiver_diversity'] = len(np.unique(to_counts)) / len(df)
         
         # Self-transfers (same address sending to itself)
-        self_transfers = df[df['from'] == df['to']]
-        self.features['self_transfer_ratio'] = len(self_transfers) / len(df)
+        from_ids, to_ids = df['from'].to_numpy(), df['to'].to_numpy()
+        self_transfers = np.count_nonzero((from_ids == to_ids) & (from_ids != MISSING_ID))
+        self.features['self_transfer_ratio'] = self_transfers / len(df)
     
-    def _extract_risk_features(self, df: pd.DataFrame):
+    def _extract_graph_features(self, df: pd.DataFrame):
+        """Extract transfer-graph features."""
+        # Imported here so token features do not load scipy unless graph features are requested
+        from src.features.transfer_graph import TransferGraph
+        
+        graph = TransferGraph()
+        graph.add_transfers(df)
+        self.features.update(graph.features())
+    
+    def _extract_risk_features(self, df: Optional[pd.DataFrame] = None):
         """Extract risk indicators."""
         # Combine multiple risk factors
         risk_score = 0
@@ -181,6 +250,14 @@ class TokenFeatureExtractor:
         if self.features.get('self_transfer_ratio', 0) > 0.2:
             risk_score += 10
         
+        # Value bounced back and forth between address pairs
+        if self.features.get('wash_trade_ratio', 0) > 0.3:
+            risk_score += 20
+        
+        # Addresses cycling tokens around closed rings
+        if self.features.get('scc_node_ratio', 0) > 0.3:
+            risk_score += 15
+        
         self.features['risk_score'] = min(risk_score, 100)
         
         # Risk categories
@@ -205,7 +282,7 @@ class TokenFeatureExtractor:
     
     def _get_empty_features(self) -> Dict[str, float]:
         """Return empty feature set."""
-        return {
+        features = {
             'total_transfers': 0,
             'unique_days': 1,
             'avg_transfers_per_day': 0,
@@ -233,17 +310,192 @@ class TokenFeatureExtractor:
             'risk_score': 0,
             'risk_category': 'LOW'
         }
+        if self.graph_features:
+            features.update(dict.fromkeys(GRAPH_FEATURES, 0))
+        return features
 
 
-def extract_token_features(transfers: List[Dict]) -> Dict[str, float]:
+def extract_token_features(transfers: List[Dict], graph_features: bool = False) -> Dict[str, float]:
     """
     Convenience function to extract token features.
     
     Args:
         transfers: List of transfer dictionaries
+        graph_features: Include transfer-graph features
         
     Returns:
         Dictionary of extracted features
     """
-    extractor = TokenFeatureExtractor()
-    return extractor.extract_features(transfers) 
\ No newline at end of file
+    extractor = TokenFeatureExtractor(graph_features=graph_features)
+    return extractor.extract_features(transfers) 
+
+
+def extract_token_features_batch(transfers, token_column: str = 'contractAddress',
+                                 tokens: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Extract token features for many token contracts at once.
+    
+    Computes the same features as TokenFeatureExtractor from a single
+    transfers table with grouped operations: grouped quantiles for the
+    large/dust ratios, grouped sorted cumsums for the Gini concentration,
+    grouped hour histograms and per-(token, address) counts for the sender
+    and receiver features. Features the per-token path leaves out of its
+    dict are NaN here, which scores the same.
+    
+    Args:
+        transfers: Transfers table with a token column plus the
+            SOURCE_FIELDS columns, or a mapping of token -> transfer list
+        token_column: Name of the token column (Etherscan's contractAddress by default)
+        tokens: Tokens to return, in order; ones without transfers get the
+            empty feature set (defaults to every token, in order of appearance)
+        
+    Returns:
+        DataFrame indexed by token with one column per feature
+    """
+    if not isinstance(transfers, pd.DataFrame):
+        transfers = _long_frame(transfers, token_column)
+    
+    codes, index = pd.factorize(transfers[token_column])
+    count = len(index)
+    n = np.bincount(codes, minlength=count).astype(float)
+    features = pd.DataFrame(index=pd.Index(index, name=token_column))
+    features['total_transfers'] = n.astype(np.int64)
+    
+    ts = None
+    if 'timeStamp' in transfers.columns:
+        ts = pd.to_numeric(transfers['timeStamp'], errors='coerce').to_numpy(dtype=float)
+    has_addresses = 'from' in transfers.columns and 'to' in transfers.columns
+    
+    # Basic features
+    if ts is not None:
+        day_codes, _ = grouped.daily_counts(codes, ts)
+        features['unique_days'] = np.maximum(np.bincount(day_codes, minlength=count), 1)
+    else:
+        features['unique_days'] = 1
+    features['avg_transfers_per_day'] = n / features['unique_days'].to_numpy()
+    
+    if has_addresses:
+        sender_ids = address_ids(transfers['from'])
+        receiver_ids = address_ids(transfers['to'])
+        senders = _address_counts(codes, sender_ids, count)
+        receivers = _address_counts(codes, receiver_ids, count)
+        features['unique_senders'] = senders['count'].to_numpy(dtype=np.int64)
+        features['unique_receivers'] = receivers['count'].to_numpy(dtype=np.int64)
+        features['address_diversity'] = (senders['count'] + receivers['count']).to_numpy() / (2 * n)
+    
+    # Value features over the values that parse as numbers
+    if 'value' in transfers.columns:
+        _add_value_features(features, codes, decode_token_amounts(transfers['value'], transfers.get('tokenDecimal')), count)
+    
+    # Temporal features
+    if ts is not None:
+        sorted_codes, gaps = grouped.consecutive_gaps(codes, ts)
+        gap_stats = grouped.group_stats(pd.Series(gaps), sorted_codes, count, ['mean', 'min'])
+        features['avg_time_between_transfers'] = gap_stats['mean'].to_numpy()
+        features['min_time_between_transfers'] = gap_stats['min'].to_numpy()
+        features['rapid_transfers_ratio'] = grouped.count_where(sorted_codes, gaps < 300, count) / n
+        
+        hours = grouped.hour_of_day(ts)
+        features['night_transfers_ratio'] = grouped.count_where(codes, np.isin(hours, grouped.NIGHT_HOURS), count) / n
+        features['peak_hour_ratio'] = grouped.count_where(codes, np.isin(hours, grouped.PEAK_HOURS), count) / n
+    
+    # Address features
+    if has_addresses:
+        features['top_sender_concentration'] = senders['max'].fillna(0).to_numpy() / n
+        features['top_receiver_concentration'] = receivers['max'].fillna(0).to_numpy() / n
+        # Distinct per-address transfer counts, as value_counts().nunique() gives
+        features['sender_diversity'] = senders['nunique'].fillna(0).to_numpy() / n
+        features['receiver_diversity'] = receivers['nunique'].fillna(0).to_numpy() / n
+        self_transfer = (sender_ids == receiver_ids) & (sender_ids != MISSING_ID)
+        features['self_transfer_ratio'] = grouped.count_where(codes, self_transfer, count) / n
+    
+    _score_token_risk(features)
+    
+    if tokens is not None:
+        empty = TokenFeatureExtractor()._get_empty_features()
+        features = grouped.with_empty_entities(
+            features, tokens, empty, ['total_transfers', 'unique_days', 'risk_score']
+        )
+    return features
+
+
+def _long_frame(histories, token_column: str) -> pd.DataFrame:
+    """Stack {token: transfers} into one long frame of SOURCE_FIELDS columns."""
+    rows = [
+        {token_column: token, **{k: transfer[k] for k in TokenFeatureExtractor.SOURCE_FIELDS if k in transfer}}
+        for token, history in histories.items()
+        for transfer in history
+    ]
+    return pd.DataFrame(rows, columns=[token_column, *TokenFeatureExtractor.SOURCE_FIELDS])
+
+
+def _transfers_per_address(ids: pd.Series) -> np.ndarray:
+    """Transfer count of each distinct interned address (missing addresses skipped)."""
+    ids = ids.to_numpy()
+    return np.unique(ids[ids != MISSING_ID], return_counts=True)[1]
+
+
+def _address_counts(codes: np.ndarray, ids: np.ndarray, count: int) -> pd.DataFrame:
+    """Per token: distinct addresses, the top address's transfer count and distinct count values."""
+    valid = ids != MISSING_ID
+    width = int(ids.max(initial=0)) + 1
+    keys, counts = np.unique(codes[valid].astype(np.int64) * width + ids[valid], return_counts=True)
+    return grouped.group_stats(pd.Series(counts), keys // width, count, ['count', 'max', 'nunique']).fillna({'count': 0})
+
+
+def _add_value_features(features: pd.DataFrame, codes: np.ndarray, values: pd.Series, count: int):
+    """Grouped _extract_value_features."""
+    valid = values.notna().to_numpy()
+    values = values[valid].astype(float)
+    value_codes = codes[valid]
+    stats = grouped.group_stats(values, value_codes, count, ['mean', 'std', 'min', 'max', 'count', 'sum'])
+    mean, std = stats['mean'].to_numpy(), stats['std'].to_numpy()
+    
+    features['avg_transfer_value'] = mean
+    features['value_std'] = std
+    features['min_transfer_value'] = stats['min'].to_numpy()
+    features['max_transfer_value'] = stats['max'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        features['value_volatility'] = np.where(mean > 0, std / mean, np.where(np.isnan(mean), np.nan, 0))
+    
+    # Grouped quantiles for the large/dust thresholds
+    quantiles = values.groupby(value_codes).quantile([0.05, 0.95]).unstack()
+    # Without any parsed value unstack() has no quantile columns at all
+    quantiles = quantiles.reindex(index=range(count), columns=[0.05, 0.95])
+    raw = values.to_numpy()
+    with np.errstate(invalid='ignore'):
+        large = raw > quantiles[0.95].to_numpy()[value_codes]
+        dust = raw < quantiles[0.05].to_numpy()[value_codes]
+        features['large_transfer_ratio'] = grouped.count_where(value_codes, large, count) / stats['count'].to_numpy()
+        features['dust_transfer_ratio'] = grouped.count_where(value_codes, dust, count) / stats['count'].to_numpy()
+    
+    # Gini from each token's ascending cumulative sums
+    order = np.lexsort((raw, value_codes))
+    sorted_codes = value_codes[order]
+    cumsum = pd.Series(raw[order]).groupby(sorted_codes).cumsum()
+    cumsum_stats = grouped.group_stats(cumsum, sorted_codes, count, ['sum', 'last'])
+    k = stats['count'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gini = (k + 1 - 2 * cumsum_stats['sum'].to_numpy() / cumsum_stats['last'].to_numpy()) / k
+    features['value_concentration'] = np.where(stats['sum'].to_numpy() > 0, gini, np.nan)
+
+
+def _score_token_risk(features: pd.DataFrame):
+    """Vectorized _extract_risk_features: missing or NaN features never trip a threshold."""
+    def compare(column, op, threshold):
+        if column not in features.columns:
+            return np.zeros(len(features), dtype=bool)
+        return op(features[column], threshold).to_numpy()
+    
+    risk_score = (
+        25 * compare('rapid_transfers_ratio', np.greater, 0.3)
+        + 20 * compare('night_transfers_ratio', np.greater, 0.6)
+        + 30 * compare('value_concentration', np.greater, 0.8)
+        + 20 * compare('address_diversity', np.less, 0.1)
+        + 15 * compare('large_transfer_ratio', np.greater, 0.5)
+        + 10 * compare('self_transfer_ratio', np.greater, 0.2)
+        + 20 * compare('wash_trade_ratio', np.greater, 0.3)
+        + 15 * compare('scc_node_ratio', np.greater, 0.3)
+    )
+    features['risk_score'] = np.minimum(risk_score, 100)
+    features['risk_category'] = grouped.risk_category(risk_score)
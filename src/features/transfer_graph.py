@@ -0,0 +1,227 @@
+"""
+Transfer Graph Features
+Sparse address-to-address transfer graph of a token, with structural fraud
+features: reciprocal and wash-trade pairs, short cycles, strongly connected
+rings, degree concentration and PageRank centrality.
+"""
+
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from src.features.amounts import decode_token_amounts
+from src.features.token_features import GRAPH_FEATURES
+from src.utils.interner import MISSING_ID, address_ids, get_address_interner
+
+# Edge keys pack (sender ID, receiver ID) into one int64
+_KEY_SHIFT = 32
+_KEY_MASK = (1 << _KEY_SHIFT) - 1
+
+# Reciprocal pairs whose two directions move values within this fraction
+# of each other count as wash trades
+WASH_TOLERANCE = 0.1
+
+TRANSFER_FIELDS = ('blockNumber', 'from', 'to', 'value', 'tokenDecimal')
+
+
+class TransferGraph:
+    """
+    Directed transfer graph aggregated per (sender, receiver) pair.
+
+    Edges are kept as sorted int64 keys of interned address IDs with a
+    transfer count and a summed value each, so add_transfers() with newly
+    arrived blocks only merges the new pairs in. CSR matrices indexed by
+    the graph's own dense node numbering are built lazily for analysis.
+    """
+
+    def __init__(self, hub_degree: int = 1000):
+        """
+        Args:
+            hub_degree: Nodes with more distinct counterparties than this
+                (routers, exchanges) are left out of cycle counting, which
+                would otherwise be quadratic in their degree
+        """
+        self.hub_degree = hub_degree
+        self.keys = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.values = np.empty(0, dtype=float)
+        self.last_block: Optional[int] = None
+        self._built = None
+
+    def add_transfers(self, transfers: Union[List[Dict], pd.DataFrame]) -> int:
+        """
+        Merge transfers into the graph.
+
+        Args:
+            transfers: Etherscan transfer dictionaries or a DataFrame with
+                'from' and 'to' (strings or interned IDs) and optionally
+                'value', 'tokenDecimal' and 'blockNumber'
+
+        Returns:
+            Number of transfers added (ones missing an address are skipped)
+        """
+        if isinstance(transfers, pd.DataFrame):
+            df = transfers
+        else:
+            df = pd.DataFrame([{k: t[k] for k in TRANSFER_FIELDS if k in t} for t in transfers])
+        if len(df) == 0 or 'from' not in df.columns or 'to' not in df.columns:
+            return 0
+
+        senders, receivers = address_ids(df['from']), address_ids(df['to'])
+        if 'value' in df.columns:
+            values = decode_token_amounts(df['value'], df.get('tokenDecimal')).fillna(0).to_numpy()
+        else:
+            values = np.zeros(len(df))
+        valid = (senders != MISSING_ID) & (receivers != MISSING_ID)
+        keys = (senders[valid].astype(np.int64) << _KEY_SHIFT) | receivers[valid]
+
+        merged_keys, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, np.ones(len(keys))]),
+                                  minlength=len(merged_keys)).astype(np.int64)
+        self.values = np.bincount(inverse, weights=np.concatenate([self.values, values[valid]]),
+                                  minlength=len(merged_keys))
+        self.keys = merged_keys
+        if 'blockNumber' in df.columns:
+            blocks = pd.to_numeric(df['blockNumber'], errors='coerce').dropna()
+            if len(blocks):
+                self.last_block = max(self.last_block or 0, int(blocks.max()))
+        self._built = None
+        return int(valid.sum())
+
+    def _build(self) -> Dict:
+        if self._built is None:
+            senders = (self.keys >> _KEY_SHIFT).astype(np.int64)
+            receivers = (self.keys & _KEY_MASK).astype(np.int64)
+            node_ids, inverse = np.unique(np.concatenate([senders, receivers]), return_inverse=True)
+            rows, cols = inverse[:len(senders)], inverse[len(senders):]
+            n = len(node_ids)
+            links = rows != cols
+            # Adjacency without self-loops, weighted by transfer count
+            adjacency = sparse.csr_matrix((self.counts[links], (rows[links], cols[links])), shape=(n, n))
+            self._built = {'node_ids': node_ids, 'links': links, 'adjacency': adjacency}
+        return self._built
+
+    def features(self) -> Dict[str, float]:
+        """
+        Graph-level fraud features.
+
+        Returns:
+            Dictionary of feature names and values (all 0 for an empty graph)
+        """
+        graph = self._build()
+        n = len(graph['node_ids'])
+        features = dict.fromkeys(GRAPH_FEATURES, 0)
+        if n == 0:
+            return features
+
+        links = graph['links']
+        features['graph_nodes'] = n
+        features['graph_edges'] = int(links.sum())
+        features.update(self._reciprocal_features(links))
+
+        adjacency = graph['adjacency']
+        binary = (adjacency > 0).astype(np.int64)
+        degree = np.asarray(binary.sum(axis=0)).ravel() + np.asarray(binary.sum(axis=1)).ravel()
+        features['cycle_3_count'] = self._count_3_cycles(binary, degree)
+
+        component_count, labels = connected_components(adjacency, directed=True, connection='strong')
+        sizes = np.bincount(labels, minlength=component_count)
+        rings = sizes[sizes > 1]
+        features['scc_count'] = len(rings)
+        features['largest_scc_size'] = int(rings.max()) if len(rings) else 1
+        features['scc_node_ratio'] = rings.sum() / n
+
+        if degree.sum() > 0:
+            features['degree_gini'] = _gini(degree)
+            features['max_degree_share'] = degree.max() / degree.sum()
+        ranks = self._pagerank_vector()
+        features['pagerank_max'] = float(ranks.max())
+        features['pagerank_top10_share'] = float(np.sort(ranks)[-10:].sum())
+        return features
+
+    def _reciprocal_features(self, links: np.ndarray) -> Dict[str, float]:
+        keys = self.keys[links]
+        reverse = ((keys & _KEY_MASK) << _KEY_SHIFT) | (keys >> _KEY_SHIFT)
+        position = np.searchsorted(self.keys, reverse)
+        position[position == len(self.keys)] = 0
+        reciprocal = self.keys[position] == reverse
+
+        # Each pair once: the direction with the smaller sender ID
+        pair = reciprocal & ((keys >> _KEY_SHIFT) < (keys & _KEY_MASK))
+        forward, backward = self.values[links][pair], self.values[position[pair]]
+        larger = np.maximum(forward, backward)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            balanced = (larger > 0) & (np.minimum(forward, backward) / larger >= 1 - WASH_TOLERANCE)
+        total_value = self.values.sum()
+        return {
+            'reciprocal_edge_ratio': reciprocal.sum() / len(keys) if len(keys) else 0,
+            'wash_trade_pairs': int(balanced.sum()),
+            'wash_trade_ratio': (forward[balanced].sum() + backward[balanced].sum()) / total_value if total_value > 0 else 0,
+        }
+
+    def _count_3_cycles(self, binary: sparse.csr_matrix, degree: np.ndarray) -> int:
+        # Directed triangles a -> b -> c -> a among non-hub nodes: trace(A^3) / 3
+        keep = sparse.diags((degree <= self.hub_degree).astype(np.int64), dtype=np.int64)
+        core = keep @ binary @ keep
+        two_paths = core @ core
+        return int(two_paths.multiply(core.T).sum()) // 3
+
+    def _pagerank_vector(self, damping: float = 0.85, tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+        adjacency = self._build()['adjacency']
+        n = adjacency.shape[0]
+        out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        transition = sparse.diags(np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)) @ adjacency
+        transition_t = transition.T.tocsr()
+        ranks = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            updated = damping * (transition_t @ ranks) + (damping * ranks[dangling].sum() + 1 - damping) / n
+            done = np.abs(updated - ranks).sum() < tol
+            ranks = updated
+            if done:
+                break
+        return ranks
+
+    def pagerank(self, damping: float = 0.85) -> pd.Series:
+        """Transfer-count-weighted PageRank of every address, highest first."""
+        graph = self._build()
+        if len(graph['node_ids']) == 0:
+            return pd.Series(dtype=float)
+        addresses = get_address_interner().addresses(graph['node_ids'])
+        return pd.Series(self._pagerank_vector(damping), index=addresses).sort_values(ascending=False)
+
+    def rings(self, min_size: int = 2) -> List[List[str]]:
+        """Addresses of each strongly connected component of at least ``min_size`` nodes, largest first."""
+        graph = self._build()
+        if len(graph['node_ids']) == 0:
+            return []
+        _, labels = connected_components(graph['adjacency'], directed=True, connection='strong')
+        addresses = get_address_interner().addresses(graph['node_ids'])
+        sizes = np.bincount(labels)
+        ring_labels = [label for label in np.argsort(-sizes, kind='stable') if sizes[label] >= min_size]
+        return [sorted(addresses[labels == label].tolist()) for label in ring_labels]
+
+
+def extract_graph_features(transfers: Union[List[Dict], pd.DataFrame]) -> Dict[str, float]:
+    """
+    Convenience function to build a token's transfer graph and extract its features.
+
+    Args:
+        transfers: List of token transfer dictionaries or a transfers DataFrame
+
+    Returns:
+        Dictionary of graph feature names and values
+    """
+    graph = TransferGraph()
+    graph.add_transfers(transfers)
+    return graph.features()
+
+
+def _gini(values: np.ndarray) -> float:
+    # Same concentration formula as the token value Gini
+    sorted_values = np.sort(values.astype(float))
+    cumsum = np.cumsum(sorted_values)
+    return (len(sorted_values) + 1 - 2 * np.sum(cumsum) / cumsum[-1]) / len(sorted_values)
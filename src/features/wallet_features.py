@@ -8,38 +8,167 @@ import numpy as np
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+from src.api.helius_constants import LAMPORTS_PER_SOL, NESTED_FIELDS
+from src.features import grouped
+from src.utils.interner import address_ids
+
 
 class WalletFeatureExtractor:
     """
     Extracts fraud detection features from wallet transaction data.
     """
     
+    # Transaction fields read by the extractor
+    SOURCE_FIELDS = ('type', 'timestamp', 'fee')
+    
+    # Features added when a wallet address is given, from the nested transfers
+    COUNTERPARTY_FEATURES = (
+        'native_transfer_count', 'token_transfer_count', 'sol_sent', 'sol_received', 'net_sol_flow',
+        'avg_sol_transfer', 'max_sol_transfer', 'incoming_transfer_ratio', 'unique_counterparties',
+        'counterparty_diversity', 'top_counterparty_share', 'unique_token_mints',
+    )
+    
     def __init__(self):
         self.features = {}
     
-    def extract_features(self, transactions: List[Dict]) -> Dict[str, float]:
+    def extract_features(self, transactions: List[Dict], wallet_address: Optional[str] = None) -> Dict[str, float]:
         """
         Extract comprehensive fraud detection features from wallet transactions.
         
         Args:
-            transactions: List of transaction dictionaries from Helius API
+            transactions: List of transaction dictionaries from Helius API,
+                an iterator such as helius_api.iter_wallet_transactions, or a
+                DataFrame such as ColumnarStore.read returns
+            wallet_address: The wallet the transactions belong to; when given,
+                COUNTERPARTY_FEATURES are added from the nested native and
+                token transfers (DataFrames need the store's 'payload' column)
+            
+        Returns:
+            Dictionary of feature names and values
+        """
+        source = transactions
+        if isinstance(transactions, pd.DataFrame):
+            if len(transactions) == 0:
+                return self._get_empty_features(wallet_address is not None)
+            # Shallow copy: the extractors add columns, the caller's frame stays intact
+            df = transactions.copy(deep=False)
+        else:
+            if not isinstance(transactions, (list, tuple)):
+                # Consume iterators lazily, keeping only the fields we read
+                fields = self.SOURCE_FIELDS + NESTED_FIELDS if wallet_address is not None else self.SOURCE_FIELDS
+                transactions = source = [{k: r[k] for k in fields if k in r} for r in transactions]
+            if not transactions:
+                return self._get_empty_features(wallet_address is not None)
+            columns = _source_arrays(transactions)
+            # Values that need pandas' parsing rules (e.g. numeric strings) go through a DataFrame
+            df = None if columns is not None else pd.DataFrame(transactions)
+        
+        if df is None:
+            self._extract_features_from_arrays(*columns)
+        else:
+            self._extract_basic_features(df)
+            self._extract_temporal_features(df)
+            self._extract_fee_features(df)
+            self._extract_behavioral_features(df)
+            self._extract_risk_features(df)
+        
+        if wallet_address is not None:
+            # pyarrow is only needed for counterparty features
+            from src.api.helius_columns import flatten_transactions
+            
+            self._extract_counterparty_features(flatten_transactions(source), wallet_address)
+        
+        return self.features
+    
+    def extract_features_from_store(self, store, wallet_address: str,
+                                    start: Optional[int] = None, end: Optional[int] = None,
+                                    counterparties: bool = False) -> Dict[str, float]:
+        """
+        Extract features from a wallet's transactions in a ColumnarStore.
+        
+        Only SOURCE_FIELDS are read from disk (plus the JSON payload for
+        counterparty features), and the time range is pushed down to the
+        store's day partitions.
+        
+        Args:
+            store: src.storage.columnar_store.ColumnarStore holding Helius transactions
+            wallet_address: Solana wallet address
+            start: Earliest unix timestamp to include
+            end: Unix timestamp to stop before (exclusive)
+            counterparties: Also add COUNTERPARTY_FEATURES
             
         Returns:
             Dictionary of feature names and values
         """
-        if not transactions:
-            return self._get_empty_features()
+        if counterparties:
+            df = store.read('solana', wallet_address, start=start, end=end,
+                            columns=self.SOURCE_FIELDS + ('payload',))
+            return self.extract_features(df, wallet_address=wallet_address)
+        df = store.read('solana', wallet_address, start=start, end=end, columns=self.SOURCE_FIELDS)
+        return self.extract_features(df)
+    
+    def _extract_features_from_arrays(self, types: Optional[np.ndarray], timestamps: Optional[np.ndarray],
+                                      fees: Optional[np.ndarray]) -> Dict[str, float]:
+        """
+        Same features as the DataFrame path, computed straight from parsed columns.
         
-        # Convert to DataFrame
-        df = pd.DataFrame(transactions)
+        Small histories spend most of their time in pandas overhead, so this
+        path sorts the timestamps once and derives gaps, hours and days from
+        plain arrays.
         
-        # Extract features
-        self._extract_basic_features(df)
-        self._extract_temporal_features(df)
-        self._extract_fee_features(df)
-        self._extract_behavioral_features(df)
-        self._extract_risk_features(df)
+        Args:
+            types: Transaction types, or None if no transaction has one
+            timestamps: Unix timestamps as floats (NaN where missing), or None
+            fees: Fees as floats (NaN where missing), or None
+            
+        Returns:
+            Dictionary of feature names and values
+        """
+        n = len(next(column for column in (types, timestamps, fees) if column is not None))
+        if timestamps is not None:
+            ts = np.sort(timestamps[~np.isnan(timestamps)])
+            days, daily_volume = np.unique(np.floor(ts / grouped.SECONDS_PER_DAY), return_counts=True)
         
+        # Basic features
+        self.features['total_transactions'] = n
+        self.features['unique_days'] = max(len(days), 1) if timestamps is not None else 1
+        self.features['avg_transactions_per_day'] = n / self.features['unique_days']
+        if types is not None:
+            self.features['transfer_ratio'] = np.count_nonzero(types == 'TRANSFER') / n
+            self.features['swap_ratio'] = np.count_nonzero(types == 'SWAP') / n
+        
+        # Temporal features; gaps touching a missing timestamp are NaN and skipped
+        if timestamps is not None:
+            time_diffs = np.diff(ts)
+            self.features['avg_time_between_txns'] = time_diffs.mean() if len(time_diffs) else np.nan
+            self.features['min_time_between_txns'] = time_diffs.min() if len(time_diffs) else np.nan
+            self.features['rapid_transactions_ratio'] = np.count_nonzero(time_diffs < 60) / n
+            
+            hours = grouped.hour_of_day(ts)
+            self.features['night_transactions_ratio'] = np.count_nonzero(np.isin(hours, grouped.NIGHT_HOURS)) / n
+            self.features['peak_hour_ratio'] = np.count_nonzero(np.isin(hours, grouped.PEAK_HOURS)) / n
+        
+        # Fee features over the fees that are present
+        if fees is not None:
+            fees = fees[~np.isnan(fees)]
+            if len(fees) > 0:
+                mean_fee = float(fees.mean())
+                std_fee = float(fees.std(ddof=1)) if len(fees) > 1 else np.nan
+                self.features['avg_fee'] = mean_fee
+                self.features['fee_std'] = std_fee
+                self.features['min_fee'] = float(fees.min())
+                self.features['max_fee'] = float(fees.max())
+                self.features['fee_volatility'] = std_fee / mean_fee if mean_fee > 0 else 0
+                self.features['high_fee_ratio'] = np.count_nonzero(fees > np.quantile(fees, 0.95)) / len(fees)
+        
+        # Behavioral features from transactions per calendar day
+        if timestamps is not None and fees is not None:
+            self.features['daily_volume_std'] = daily_volume.std(ddof=1) if len(daily_volume) > 1 else np.nan
+            self.features['max_daily_transactions'] = daily_volume.max() if len(daily_volume) else np.nan
+            if len(daily_volume) > 1:
+                self.features['volume_volatility'] = np.abs(np.diff(daily_volume)).mean()
+        
+        self._extract_risk_features()
         return self.features
     
     def _extract_basic_features(self, df: pd.DataFrame):
@@ -140,7 +269,7 @@ class WalletFeatureExtractor:
                 volume_changes = daily_volume.diff().abs()
                 self.features['volume_volatility'] = volume_changes.mean()
     
-    def _extract_risk_features(self, df: pd.DataFrame):
+    def _extract_risk_features(self, df: Optional[pd.DataFrame] = None):
         """Extract risk indicators."""
         # Combine multiple risk factors
         risk_score = 0
@@ -187,9 +316,42 @@ class WalletFeatureExtractor:
         except:
             return 1
     
-    def _get_empty_features(self) -> Dict[str, float]:
+    def _extract_counterparty_features(self, tables: Dict[str, pd.DataFrame], wallet_address: str):
+        """Extract counterparty and value features from flattened native and token transfers."""
+        native, tokens = tables['native_transfers'], tables['token_transfers']
+        columns = ['fromUserAccount', 'toUserAccount']
+        transfers = pd.concat([native[columns], tokens[columns]], ignore_index=True)
+        sent = (transfers['fromUserAccount'] == wallet_address).to_numpy()
+        received = (transfers['toUserAccount'] == wallet_address).to_numpy()
+        involved = sent | received
+        is_native = np.arange(len(transfers)) < len(native)
+        
+        # SOL amounts moved by the wallet
+        amounts = native['amount'].to_numpy(dtype=float) / LAMPORTS_PER_SOL
+        native_sent, native_received = sent[is_native], received[is_native]
+        wallet_amounts = amounts[native_sent | native_received]
+        self.features['native_transfer_count'] = np.count_nonzero(involved & is_native)
+        self.features['token_transfer_count'] = np.count_nonzero(involved & ~is_native)
+        self.features['sol_sent'] = amounts[native_sent].sum()
+        self.features['sol_received'] = amounts[native_received].sum()
+        self.features['net_sol_flow'] = self.features['sol_received'] - self.features['sol_sent']
+        self.features['avg_sol_transfer'] = wallet_amounts.mean() if len(wallet_amounts) else 0
+        self.features['max_sol_transfer'] = wallet_amounts.max() if len(wallet_amounts) else 0
+        self.features['incoming_transfer_ratio'] = np.count_nonzero(received) / max(np.count_nonzero(involved), 1)
+        
+        # Counterparties of native and token transfers, self-transfers excluded
+        counterparty = np.where(sent, transfers['toUserAccount'], transfers['fromUserAccount'])
+        ids = address_ids(counterparty[involved & ~(sent & received)])
+        counts = np.bincount(ids[ids >= 0])
+        counts = counts[counts > 0]
+        self.features['unique_counterparties'] = len(counts)
+        self.features['counterparty_diversity'] = len(counts) / max(np.count_nonzero(involved), 1)
+        self.features['top_counterparty_share'] = counts.max() / counts.sum() if len(counts) else 0
+        self.features['unique_token_mints'] = tokens['mint'][involved[~is_native]].nunique()
+    
+    def _get_empty_features(self, counterparties: bool = False) -> Dict[str, float]:
         """Return empty feature set."""
-        return {
+        features = {
             'total_transactions': 0,
             'unique_days': 1,
             'avg_transactions_per_day': 0,
@@ -212,17 +374,193 @@ class WalletFeatureExtractor:
             'risk_score': 0,
             'risk_category': 'LOW'
         }
+        if counterparties:
+            features.update(dict.fromkeys(self.COUNTERPARTY_FEATURES, 0))
+        return features
 
 
-def extract_wallet_features(transactions: List[Dict]) -> Dict[str, float]:
+def extract_wallet_features(transactions: List[Dict], wallet_address: Optional[str] = None) -> Dict[str, float]:
     """
     Convenience function to extract wallet features.
     
     Args:
         transactions: List of transaction dictionaries
+        wallet_address: Wallet address, to add counterparty features
         
     Returns:
         Dictionary of extracted features
     """
     extractor = WalletFeatureExtractor()
-    return extractor.extract_features(transactions)
\ No newline at end of file
+    return extractor.extract_features(transactions, wallet_address=wallet_address)
+
+
+def extract_wallet_features_batch(transactions, wallet_column: str = 'wallet',
+                                  wallets: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Extract wallet features for many wallets at once.
+    
+    Computes the same features as WalletFeatureExtractor with grouped,
+    vectorized operations instead of one DataFrame per wallet. Features the
+    per-wallet path leaves out of its dict (e.g. fee features when no fee
+    parses, volume_volatility for single-day wallets) are NaN here, which
+    scores the same since NaN never passes a risk threshold. A field that
+    is missing from every one of a wallet's transactions is treated as
+    present but empty, so e.g. its ratios are 0 rather than left out.
+    
+    Args:
+        transactions: Long-format DataFrame with a wallet column plus the
+            SOURCE_FIELDS columns, or a mapping of wallet -> transaction list
+        wallet_column: Name of the wallet column
+        wallets: Wallets to return, in order; ones without transactions get
+            the empty feature set (defaults to every wallet, in order of appearance)
+        
+    Returns:
+        DataFrame indexed by wallet with one column per feature
+    """
+    if not isinstance(transactions, pd.DataFrame):
+        transactions = _long_frame(transactions, wallet_column)
+    
+    codes, index = pd.factorize(transactions[wallet_column])
+    count = len(index)
+    n = np.bincount(codes, minlength=count).astype(float)
+    features = pd.DataFrame(index=pd.Index(index, name=wallet_column))
+    features['total_transactions'] = n.astype(np.int64)
+    
+    ts = None
+    if 'timestamp' in transactions.columns:
+        ts = pd.to_numeric(transactions['timestamp'], errors='coerce').to_numpy(dtype=float)
+    
+    # Basic features
+    if ts is not None:
+        day_codes, day_counts = grouped.daily_counts(codes, ts)
+        unique_days = np.bincount(day_codes, minlength=count)
+        features['unique_days'] = np.maximum(unique_days, 1)
+    else:
+        features['unique_days'] = 1
+    features['avg_transactions_per_day'] = n / features['unique_days'].to_numpy()
+    
+    if 'type' in transactions.columns:
+        types = transactions['type'].to_numpy(dtype=object)
+        features['transfer_ratio'] = grouped.count_where(codes, types == 'TRANSFER', count) / n
+        features['swap_ratio'] = grouped.count_where(codes, types == 'SWAP', count) / n
+    
+    # Temporal features: gaps between consecutive transactions of the same wallet
+    if ts is not None:
+        sorted_codes, gaps = grouped.consecutive_gaps(codes, ts)
+        gap_stats = grouped.group_stats(pd.Series(gaps), sorted_codes, count, ['mean', 'min'])
+        features['avg_time_between_txns'] = gap_stats['mean'].to_numpy()
+        features['min_time_between_txns'] = gap_stats['min'].to_numpy()
+        features['rapid_transactions_ratio'] = grouped.count_where(sorted_codes, gaps < 60, count) / n
+        
+        hours = grouped.hour_of_day(ts)
+        features['night_transactions_ratio'] = grouped.count_where(codes, np.isin(hours, grouped.NIGHT_HOURS), count) / n
+        features['peak_hour_ratio'] = grouped.count_where(codes, np.isin(hours, grouped.PEAK_HOURS), count) / n
+    
+    # Fee features over the fees that parse as numbers
+    if 'fee' in transactions.columns:
+        fees = pd.to_numeric(transactions['fee'], errors='coerce')
+        valid = fees.notna().to_numpy()
+        fee_stats = grouped.group_stats(fees[valid], codes[valid], count, ['mean', 'std', 'min', 'max', 'count'])
+        fee_95th = fees[valid].groupby(codes[valid]).quantile(0.95).reindex(range(count)).to_numpy()
+        mean_fee = fee_stats['mean'].to_numpy()
+        features['avg_fee'] = mean_fee
+        features['fee_std'] = fee_stats['std'].to_numpy()
+        features['min_fee'] = fee_stats['min'].to_numpy()
+        features['max_fee'] = fee_stats['max'].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features['fee_volatility'] = np.where(
+                mean_fee > 0, fee_stats['std'].to_numpy() / mean_fee, np.where(np.isnan(mean_fee), np.nan, 0)
+            )
+            high = fees.to_numpy(dtype=float)[valid] > fee_95th[codes[valid]]
+            features['high_fee_ratio'] = grouped.count_where(codes[valid], high, count) / fee_stats['count'].to_numpy()
+    
+    # Behavioral features from transactions per calendar day
+    if ts is not None and 'fee' in transactions.columns:
+        daily_stats = grouped.group_stats(pd.Series(day_counts, dtype=float), day_codes, count, ['std', 'max'])
+        features['daily_volume_std'] = daily_stats['std'].to_numpy()
+        features['max_daily_transactions'] = daily_stats['max'].to_numpy()
+        
+        changes = np.abs(np.diff(day_counts.astype(float)))
+        same_wallet = day_codes[1:] == day_codes[:-1]
+        change_sum = np.bincount(day_codes[1:][same_wallet], weights=changes[same_wallet], minlength=count)
+        change_count = np.bincount(day_codes[1:][same_wallet], minlength=count)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features['volume_volatility'] = np.where(change_count > 0, change_sum / change_count, np.nan)
+    
+    _score_wallet_risk(features)
+    
+    if wallets is not None:
+        empty = WalletFeatureExtractor()._get_empty_features()
+        features = grouped.with_empty_entities(features, wallets, empty,
+                                               ['total_transactions', 'unique_days', 'risk_score'])
+    return features
+
+
+def _source_arrays(transactions: List[Dict]):
+    """
+    Parse SOURCE_FIELDS of transaction dicts into NumPy columns in one pass.
+    
+    A field missing from every transaction gives None, like the column
+    pd.DataFrame would leave out. Returns None when a value is anything other
+    than None or a plain number (type: None or a string), or when no
+    transaction has any of the fields, so the DataFrame path can apply
+    pandas' own conversion rules.
+    """
+    types, timestamps, fees = [], [], []
+    has_type = has_timestamp = has_fee = False
+    for txn in transactions:
+        txn_type = txn.get('type')
+        timestamp = txn.get('timestamp')
+        fee = txn.get('fee')
+        if not (txn_type is None or isinstance(txn_type, str)):
+            return None
+        if not (timestamp is None or _is_plain_int(timestamp)):
+            return None
+        if not (fee is None or type(fee) in (int, float)):
+            return None
+        has_type = has_type or 'type' in txn
+        has_timestamp = has_timestamp or 'timestamp' in txn
+        has_fee = has_fee or 'fee' in txn
+        types.append(txn_type)
+        timestamps.append(np.nan if timestamp is None else timestamp)
+        fees.append(np.nan if fee is None else fee)
+    if transactions and not (has_type or has_timestamp or has_fee):
+        return None
+    return (
+        np.array(types, dtype=object) if has_type else None,
+        np.array(timestamps, dtype=float) if has_timestamp else None,
+        np.array(fees, dtype=float) if has_fee else None,
+    )
+
+
+def _is_plain_int(value) -> bool:
+    # Seconds that pandas converts to datetime64[ns] exactly (bool is excluded)
+    return type(value) is int and abs(value) < 9_000_000_000
+
+
+def _long_frame(histories, wallet_column: str) -> pd.DataFrame:
+    """Stack {wallet: transactions} into one long frame of SOURCE_FIELDS columns."""
+    rows = [
+        {wallet_column: wallet, **{k: txn[k] for k in WalletFeatureExtractor.SOURCE_FIELDS if k in txn}}
+        for wallet, history in histories.items()
+        for txn in history
+    ]
+    return pd.DataFrame(rows, columns=[wallet_column, *WalletFeatureExtractor.SOURCE_FIELDS])
+
+
+def _score_wallet_risk(features: pd.DataFrame):
+    """Vectorized _extract_risk_features: missing or NaN features never trip a threshold."""
+    def above(column, threshold):
+        if column not in features.columns:
+            return np.zeros(len(features), dtype=bool)
+        return (features[column] > threshold).to_numpy()
+    
+    risk_score = (
+        30 * above('rapid_transactions_ratio', 0.2)
+        + 20 * above('night_transactions_ratio', 0.5)
+        + 25 * above('fee_volatility', 2.0)
+        + 15 * above('transfer_ratio', 0.9)
+        + 10 * above('volume_volatility', 10)
+    )
+    features['risk_score'] = np.minimum(risk_score, 100)
+    features['risk_category'] = grouped.risk_category(risk_score)
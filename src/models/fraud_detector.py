@@ -8,6 +8,8 @@ import numpy as np
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 
+from src.features.holder_balances import concentration_features
+
 
 class FraudDetector:
     """
@@ -108,6 +110,10 @@ class FraudDetector:
         indicators = []
         risk_score = 0
         
+        # Holder concentration series (HolderBalances.concentration_series)
+        if token_data.get('concentration_series') is not None:
+            token_data = {**concentration_features(token_data['concentration_series']), **token_data}
+        
         # Large transfer concentration
         large_transfer_ratio = token_data.get('large_transfer_ratio', 0)
         if large_transfer_ratio > 0.8:
@@ -127,6 +133,30 @@ class FraudDetector:
             indicators.append(f"Very high transfer activity: {total_transfers} transfers")
             risk_score += 15
         
+        # Transfer-graph structure (TokenFeatureExtractor(graph_features=True))
+        wash_trade_ratio = token_data.get('wash_trade_ratio', 0)
+        if wash_trade_ratio > 0.3:
+            indicators.append(f"Wash trading between address pairs: {wash_trade_ratio:.2%} of volume")
+            risk_score += 25
+        
+        cycle_count = token_data.get('cycle_3_count', 0)
+        scc_node_ratio = token_data.get('scc_node_ratio', 0)
+        if scc_node_ratio > 0.3:
+            indicators.append(f"Circular transfer rings: {scc_node_ratio:.2%} of addresses, {cycle_count} three-address cycles")
+            risk_score += 20
+        
+        # Supply held by a few addresses
+        top_holder_share = token_data.get('top_holder_share', 0)
+        if top_holder_share > 0.8:
+            indicators.append(f"Top holders control {top_holder_share:.2%} of supply")
+            risk_score += 25
+        
+        # Holders leaving after a peak (dump or rug pull)
+        holder_drawdown = token_data.get('holder_drawdown', 0)
+        if holder_drawdown > 0.5:
+            indicators.append(f"Holder count fell {holder_drawdown:.2%} from its peak")
+            risk_score += 20
+        
         return {
             'risk_score': min(risk_score, 100),
             'indicators': indicators,
@@ -0,0 +1,285 @@
+"""
+Partitioned Columnar Store
+Parquet files of raw wallet transactions and token transfers, partitioned by
+chain, address and day, for re-scoring and EDA without API calls.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.utils.config import CONFIG
+from src.utils.interner import get_address_interner
+
+# chain -> columns kept for each record; everything else about a Helius
+# transaction survives in the JSON ``payload`` column
+SCHEMAS = {
+    'solana': pa.schema([
+        ('signature', pa.string()),
+        ('timestamp', pa.int64()),
+        ('slot', pa.int64()),
+        ('fee', pa.int64()),
+        ('feePayer', pa.string()),
+        ('type', pa.string()),
+        ('source', pa.string()),
+        ('payload', pa.string()),
+    ]),
+    # Etherscan tokentx rows; ``value`` stays a string because uint256 does not fit int64
+    'ethereum': pa.schema([
+        ('blockNumber', pa.int64()),
+        ('timeStamp', pa.int64()),
+        ('hash', pa.string()),
+        ('logIndex', pa.int64()),
+        ('from', pa.string()),
+        ('to', pa.string()),
+        ('value', pa.string()),
+        ('contractAddress', pa.string()),
+        ('tokenName', pa.string()),
+        ('tokenSymbol', pa.string()),
+        ('tokenDecimal', pa.int64()),
+    ]),
+}
+
+# chain -> (timestamp column, columns identifying one record)
+TIME_COLUMNS = {'solana': 'timestamp', 'ethereum': 'timeStamp'}
+KEY_COLUMNS = {'solana': ('signature',), 'ethereum': ('hash', 'logIndex', 'from', 'to', 'value')}
+# Columns holding wallet addresses, which read() can return as interned IDs
+ADDRESS_COLUMNS = {'solana': ('feePayer',), 'ethereum': ('from', 'to')}
+
+PARTITIONING = ds.partitioning(pa.schema([('address', pa.string()), ('day', pa.string())]), flavor='hive')
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class ColumnarStore:
+    """
+    Append-only Parquet dataset laid out as
+    ``<root>/<chain>/address=<address>/day=<YYYY-MM-DD>/part-*.parquet``.
+
+    Each append writes one new file per touched day, so writers never
+    rewrite existing data. compact() later merges a partition's files into
+    one, dropping duplicate records. Reads prune partitions by address and
+    day, and push timestamp filters down to Parquet row-group statistics.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def append(self, chain: str, address: str, records: Union[Iterable[Dict], pd.DataFrame]) -> int:
+        """
+        Write records for one address.
+
+        Args:
+            chain: 'solana' (Helius transactions) or 'ethereum' (Etherscan transfers)
+            address: Wallet address or token scope
+            records: Record dictionaries as returned by the API clients, or a DataFrame
+
+        Returns:
+            Number of records written
+        """
+        table = _to_table(chain, records)
+        if table.num_rows == 0:
+            return 0
+
+        days = _day_strings(table.column(TIME_COLUMNS[chain]))
+        for day in pc.unique(days).to_pylist():
+            part = table.filter(pc.equal(days, day))
+            self._write(self._partition_dir(chain, address, day), part)
+        return table.num_rows
+
+    def read(self,
+             chain: str,
+             address: Optional[str] = None,
+             start: Optional[int] = None,
+             end: Optional[int] = None,
+             columns: Optional[Sequence[str]] = None,
+             where: Optional[ds.Expression] = None,
+             dedupe: bool = True,
+             intern_addresses: bool = False) -> pd.DataFrame:
+        """
+        Load records as a DataFrame in chronological order.
+
+        Appends are not deduplicated on write, so by default records stored
+        more than once (e.g. from overlapping fetches not yet compacted) are
+        dropped here, keeping the first copy.
+
+        Args:
+            chain: 'solana' or 'ethereum'
+            address: Only this address (all addresses when None)
+            start: Earliest unix timestamp to include
+            end: Unix timestamp to stop before (exclusive)
+            columns: Columns to load (all schema columns when None)
+            where: Extra pyarrow dataset expression, e.g. ``ds.field('type') == 'SWAP'``
+            dedupe: Drop repeated records (loads the key columns as well)
+            intern_addresses: Return ADDRESS_COLUMNS as int32 IDs from the
+                process-wide address interner instead of strings
+
+        Returns:
+            DataFrame of the matching records; empty with the requested columns if none match
+        """
+        schema = SCHEMAS[chain]
+        time_column = TIME_COLUMNS[chain]
+        columns = list(columns or schema.names)
+
+        expression = where
+        if address is not None:
+            expression = _and(expression, ds.field('address') == address)
+        if start is not None:
+            expression = _and(expression, ds.field('day') >= _day(start))
+            expression = _and(expression, ds.field(time_column) >= start)
+        if end is not None:
+            expression = _and(expression, ds.field('day') <= _day(end))
+            expression = _and(expression, ds.field(time_column) < end)
+
+        dataset = self._dataset(chain)
+        if dataset is None:
+            return pd.DataFrame({column: pd.Series(dtype=object) for column in columns})
+
+        # Sort and dedupe on columns that were not necessarily requested
+        keys = list(KEY_COLUMNS[chain]) if dedupe else []
+        load = list(dict.fromkeys(columns + [time_column] + keys))
+        table = dataset.to_table(columns=load, filter=expression).sort_by(time_column)
+        frame = table.to_pandas()
+        if dedupe:
+            frame = frame.drop_duplicates(subset=keys, keep='first', ignore_index=True)
+        frame = frame[columns]
+        if intern_addresses:
+            interner = get_address_interner()
+            for column in ADDRESS_COLUMNS[chain]:
+                if column in frame.columns:
+                    frame[column] = interner.intern(frame[column])
+        return frame
+
+    def compact(self, chain: str, address: Optional[str] = None) -> int:
+        """
+        Merge every multi-file partition into a single deduplicated, time-sorted file.
+
+        Run it while nothing else writes the same partitions: readers may
+        briefly see a partition's records twice while the old files are removed.
+
+        Returns:
+            Number of partitions rewritten
+        """
+        rewritten = 0
+        for directory in self._partition_dirs(chain, address):
+            files = sorted(name for name in os.listdir(directory) if name.endswith('.parquet'))
+            if len(files) < 2:
+                continue
+            frame = pa.concat_tables(pq.read_table(os.path.join(directory, name)) for name in files).to_pandas()
+            frame = frame.drop_duplicates(subset=list(KEY_COLUMNS[chain]), keep='first')
+            frame = frame.sort_values(TIME_COLUMNS[chain], kind='stable')
+            table = pa.Table.from_pandas(frame, schema=SCHEMAS[chain], preserve_index=False)
+            self._write(directory, table)
+            for name in files:
+                os.remove(os.path.join(directory, name))
+            rewritten += 1
+        return rewritten
+
+    def addresses(self, chain: str) -> List[str]:
+        """Addresses with stored records for a chain."""
+        chain_dir = os.path.join(self.root, chain)
+        if not os.path.isdir(chain_dir):
+            return []
+        prefix = 'address='
+        return sorted(
+            unquote(name[len(prefix):]) for name in os.listdir(chain_dir) if name.startswith(prefix)
+        )
+
+    def _dataset(self, chain: str) -> Optional[ds.Dataset]:
+        chain_dir = os.path.join(self.root, chain)
+        if not os.path.isdir(chain_dir):
+            return None
+        schema = pa.unify_schemas([SCHEMAS[chain], PARTITIONING.schema])
+        return ds.dataset(chain_dir, format='parquet', schema=schema, partitioning=PARTITIONING)
+
+    def _partition_dir(self, chain: str, address: str, day: str) -> str:
+        return os.path.join(self.root, chain, f"address={quote(address, safe='')}", f"day={day}")
+
+    def _partition_dirs(self, chain: str, address: Optional[str]) -> List[str]:
+        addresses = [address] if address is not None else self.addresses(chain)
+        directories = []
+        for name in addresses:
+            address_dir = os.path.join(self.root, chain, f"address={quote(name, safe='')}")
+            if os.path.isdir(address_dir):
+                directories.extend(
+                    os.path.join(address_dir, day) for day in sorted(os.listdir(address_dir)) if day.startswith('day=')
+                )
+        return directories
+
+    def _write(self, directory: str, table: pa.Table):
+        # Written under a temporary name and renamed, so readers never see a partial file
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+        temporary = os.path.join(directory, f".{name}.tmp")
+        pq.write_table(table, temporary, compression='zstd')
+        os.replace(temporary, os.path.join(directory, name))
+
+
+def get_columnar_store() -> ColumnarStore:
+    """Return the process-wide store at COLUMNAR_STORE_PATH."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ColumnarStore(CONFIG['COLUMNAR_STORE_PATH'])
+    return _store
+
+
+def _to_table(chain: str, records: Union[Iterable[Dict], pd.DataFrame]) -> pa.Table:
+    """Project records onto the chain's schema, coercing Etherscan's numeric strings."""
+    schema = SCHEMAS[chain]
+    if isinstance(records, pd.DataFrame):
+        rows = records.to_dict('records')
+    else:
+        rows = list(records)
+
+    arrays = []
+    for field in schema:
+        if field.name == 'payload':
+            values = [json.dumps(row, separators=(',', ':')) for row in rows]
+        elif pa.types.is_integer(field.type):
+            values = [_to_int(row.get(field.name)) for row in rows]
+        else:
+            values = [None if row.get(field.name) is None else str(row.get(field.name)) for row in rows]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _to_int(value) -> Optional[int]:
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        # NaN from a DataFrame, or a malformed field
+        return None
+
+
+def _day_strings(timestamps: pa.ChunkedArray) -> pa.Array:
+    # Records without a timestamp land in the epoch partition
+    seconds = pc.fill_null(timestamps, 0)
+    return pc.strftime(pc.cast(seconds, pa.timestamp('s', tz='UTC')), format='%Y-%m-%d')
+
+
+def _day(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+def _and(left: Optional[ds.Expression], right: Optional[ds.Expression]) -> Optional[ds.Expression]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return left & right
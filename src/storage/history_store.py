@@ -0,0 +1,142 @@
+"""
+Fetched History Store
+SQLite store of raw wallet transactions, token transfers and tweets, with a
+high-water mark per analyzed address so re-analysis only fetches the delta.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.utils.config import CONFIG
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class HistoryStore:
+    """
+    Append-only per-address history with watermarks.
+
+    Records are kept in chronological (oldest-first) insertion order and
+    deduplicated by a caller-supplied key, so re-fetching an overlapping
+    range is harmless. A watermark records where the last fetch stopped:
+    a Helius signature or tweet id cursor, or an Etherscan block and log
+    index.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS watermarks (
+                chain TEXT NOT NULL,
+                address TEXT NOT NULL,
+                cursor TEXT,
+                block INTEGER,
+                log_index INTEGER,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (chain, address)
+            );
+            CREATE TABLE IF NOT EXISTS records (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                chain TEXT NOT NULL,
+                address TEXT NOT NULL,
+                record_key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                UNIQUE (chain, address, record_key)
+            );
+            CREATE INDEX IF NOT EXISTS records_by_address ON records (chain, address, seq);
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def get_watermark(self, chain: str, address: str) -> Optional[Dict]:
+        """Return {'cursor', 'block', 'log_index', 'updated_at'} or None if never synced."""
+        row = self._connection().execute(
+            'SELECT cursor, block, log_index, updated_at FROM watermarks WHERE chain = ? AND address = ?',
+            (chain, address),
+        ).fetchone()
+        if row is None:
+            return None
+        return {'cursor': row[0], 'block': row[1], 'log_index': row[2], 'updated_at': row[3]}
+
+    def append(self,
+               chain: str,
+               address: str,
+               records: Iterable[Dict],
+               key: Callable[[Dict], str],
+               cursor: Optional[str] = None,
+               block: Optional[int] = None,
+               log_index: Optional[int] = None) -> int:
+        """
+        Append records (oldest first) and advance the watermark atomically.
+
+        Args:
+            chain: 'solana', 'ethereum' or 'twitter'
+            address: Wallet address, token scope or search keyword
+            records: New records in chronological order
+            key: Function returning a record's unique key
+            cursor: New Helius signature or tweet id watermark
+            block: New Etherscan block watermark
+            log_index: New Etherscan log index watermark
+
+        Returns:
+            Number of records actually inserted (duplicates are skipped)
+        """
+        connection = self._connection()
+        with connection:
+            before = connection.total_changes
+            connection.executemany(
+                'INSERT OR IGNORE INTO records (chain, address, record_key, payload) VALUES (?, ?, ?, ?)',
+                ((chain, address, key(record), json.dumps(record, separators=(',', ':'))) for record in records),
+            )
+            inserted = connection.total_changes - before
+            connection.execute(
+                'INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?, ?, ?)',
+                (chain, address, cursor, block, log_index, time.time()),
+            )
+        return inserted
+
+    def load(self, chain: str, address: str, newest_first: bool = False) -> List[Dict]:
+        """Return the stored history for an address."""
+        order = 'DESC' if newest_first else 'ASC'
+        rows = self._connection().execute(
+            f'SELECT payload FROM records WHERE chain = ? AND address = ? ORDER BY seq {order}',
+            (chain, address),
+        )
+        return [json.loads(payload) for (payload,) in rows]
+
+    def count(self, chain: str, address: str) -> int:
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM records WHERE chain = ? AND address = ?', (chain, address)
+        ).fetchone()[0]
+
+    def reset(self, chain: str, address: str):
+        """Forget an address's history and watermark so the next sync starts over."""
+        connection = self._connection()
+        with connection:
+            connection.execute('DELETE FROM records WHERE chain = ? AND address = ?', (chain, address))
+            connection.execute('DELETE FROM watermarks WHERE chain = ? AND address = ?', (chain, address))
+
+
+def get_history_store() -> HistoryStore:
+    """Return the process-wide store at HISTORY_STORE_PATH."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HistoryStore(CONFIG['HISTORY_STORE_PATH'])
+    return _store
@@ -1,10 +1,113 @@
 import os
-from dotenv import load_dotenv
+import threading
+from collections.abc import MutableMapping
 
-load_dotenv()
 
-CONFIG = {
-    'HELIUS_API_KEY': os.getenv('HELIUS_API_KEY'),
-    "ETHERSCAN_API_KEY": os.getenv("ETHERSCAN_API_KEY"),
-    "TWITTER_BEARER_TOKEN": os.getenv("TWITTER_BEARER_TOKEN"),
-}
\ No newline at end of file
+def _parse_rates(value):
+    # "helius=50,etherscan=5" -> {'helius': 50.0, 'etherscan': 5.0}
+    rates = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+# Upstream API roots; each can be pointed elsewhere (e.g. the replay server in src/api/replay.py)
+DEFAULT_BASE_URLS = {
+    "HELIUS_BASE_URL": "https://api.helius.xyz/v0",
+    "ETHERSCAN_BASE_URL": "https://api.etherscan.io/api",
+    "GECKOTERMINAL_BASE_URL": "https://api.geckoterminal.com/api/v2",
+    "RUGDOC_BASE_URL": "https://rugdoc.io/api",
+    "TWITTER_BASE_URL": "https://api.twitter.com/2",
+}
+
+
+def _load_settings():
+    # Imported here so processes that never touch configuration skip python-dotenv
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return {
+        'HELIUS_API_KEY': os.getenv('HELIUS_API_KEY'),
+        "ETHERSCAN_API_KEY": os.getenv("ETHERSCAN_API_KEY"),
+        "TWITTER_BEARER_TOKEN": os.getenv("TWITTER_BEARER_TOKEN"),
+        # Shared HTTP transport (src/api/http_client.py)
+        "HTTP_POOL_CONNECTIONS": int(os.getenv("HTTP_POOL_CONNECTIONS", "10")),
+        "HTTP_POOL_MAXSIZE": int(os.getenv("HTTP_POOL_MAXSIZE", "20")),
+        "HTTP_ASYNC_MAX_CONNECTIONS": int(os.getenv("HTTP_ASYNC_MAX_CONNECTIONS", "100")),
+        "HTTP_ASYNC_CONCURRENCY": int(os.getenv("HTTP_ASYNC_CONCURRENCY", "50")),
+        "HTTP_CONNECT_TIMEOUT": float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+        "HTTP_READ_TIMEOUT": float(os.getenv("HTTP_READ_TIMEOUT", "30")),
+        "HTTP_MAX_RETRIES": int(os.getenv("HTTP_MAX_RETRIES", "3")),
+        "HTTP_BACKOFF_FACTOR": float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5")),
+        # Persistent response cache (src/api/response_cache.py)
+        "API_CACHE_ENABLED": os.getenv("API_CACHE_ENABLED", "1") == "1",
+        "API_CACHE_PATH": os.getenv("API_CACHE_PATH", "data/cache/api_cache.sqlite"),
+        "API_CACHE_MAX_BYTES": int(os.getenv("API_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+        # Provider rate limits (src/api/rate_limiter.py)
+        "RATE_LIMIT_ENABLED": os.getenv("RATE_LIMIT_ENABLED", "1") == "1",
+        "RATE_LIMIT_SHARED_PATH": os.getenv("RATE_LIMIT_SHARED_PATH"),
+        "API_RATE_LIMITS": _parse_rates(os.getenv("API_RATE_LIMITS")),
+        # Fail fast on providers that keep failing (src/api/circuit_breaker.py)
+        "CIRCUIT_BREAKER_ENABLED": os.getenv("CIRCUIT_BREAKER_ENABLED", "1") == "1",
+        "CIRCUIT_FAILURE_THRESHOLD": int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+        "CIRCUIT_RESET_SECONDS": float(os.getenv("CIRCUIT_RESET_SECONDS", "30")),
+        # Fetched histories and sync watermarks (src/storage/history_store.py)
+        "HISTORY_STORE_PATH": os.getenv("HISTORY_STORE_PATH", "data/history.sqlite"),
+        # Partitioned Parquet copy of fetched records (src/storage/columnar_store.py)
+        "COLUMNAR_STORE_PATH": os.getenv("COLUMNAR_STORE_PATH", "data/columnar"),
+        # Record every API response into this fixture archive (src/api/replay.py)
+        "API_RECORD_PATH": os.getenv("API_RECORD_PATH"),
+        **{key: os.getenv(key, url) for key, url in DEFAULT_BASE_URLS.items()},
+    }
+
+
+class LazyConfig(MutableMapping):
+    """
+    Settings mapping that reads .env and the environment on first access.
+
+    Importing this module costs nothing; the first lookup loads every
+    setting at once. Assignments (e.g. from tests) override loaded values,
+    and reload() re-reads the environment.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._settings = None
+        self._lock = threading.Lock()
+
+    def _resolved(self):
+        settings = self._settings
+        if settings is None:
+            with self._lock:
+                if self._settings is None:
+                    self._settings = self._loader()
+                settings = self._settings
+        return settings
+
+    def reload(self):
+        """Discard loaded settings so the next lookup reads the environment again."""
+        with self._lock:
+            self._settings = None
+
+    def __getitem__(self, key):
+        return self._resolved()[key]
+
+    def __setitem__(self, key, value):
+        self._resolved()[key] = value
+
+    def __delitem__(self, key):
+        del self._resolved()[key]
+
+    def __iter__(self):
+        return iter(self._resolved())
+
+    def __len__(self):
+        return len(self._resolved())
+
+    def __repr__(self):
+        # Never echo values: the mapping holds API keys
+        return f"LazyConfig(loaded={self._settings is not None})"
+
+
+CONFIG = LazyConfig(_load_settings)
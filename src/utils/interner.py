@@ -0,0 +1,123 @@
+"""
+Address Interning
+Process-wide dictionary encoding of wallet and token addresses as compact
+int32 IDs, so address columns can be grouped, counted and joined as integers.
+"""
+
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# ID returned for missing addresses
+MISSING_ID = -1
+MAX_ADDRESSES = np.iinfo(np.int32).max
+
+_interner = None
+_interner_lock = threading.Lock()
+
+
+def normalize_address(address) -> str:
+    """
+    Canonical form of an address.
+
+    EVM hex addresses are case-insensitive (EIP-55 only adds a checksum), so
+    they are lower-cased; Solana's base58 addresses are case-sensitive and
+    kept as they are.
+    """
+    address = str(address).strip()
+    if address[:2] in ('0x', '0X'):
+        return address.lower()
+    return address
+
+
+class AddressInterner:
+    """
+    Append-only mapping between normalized addresses and int32 IDs.
+
+    IDs are dense (0, 1, 2, ...) in order of first sight and never change,
+    so arrays interned at different times can be compared and bincounted
+    together. They are only meaningful inside this process: persist
+    addresses, not IDs.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        # ID -> address, over-allocated so lookups stay vectorized as it grows
+        self._table = np.empty(1024, dtype=object)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def intern(self, addresses) -> np.ndarray:
+        """
+        IDs of an array-like of addresses, assigning new IDs as needed.
+
+        Only the distinct values of the input go through Python; the rest
+        is a pandas hash factorization.
+
+        Returns:
+            int32 array of IDs, MISSING_ID where the address is None/NaN/empty
+        """
+        codes, uniques = pd.factorize(pd.Series(addresses, dtype=object))
+        if len(uniques) == 0:
+            return np.full(len(codes), MISSING_ID, dtype=np.int32)
+
+        normalized = [normalize_address(address) for address in uniques]
+        unique_ids = np.empty(len(normalized), dtype=np.int32)
+        with self._lock:
+            ids = self._ids
+            for position, address in enumerate(normalized):
+                if not address:
+                    unique_ids[position] = MISSING_ID
+                    continue
+                address_id = ids.get(address)
+                if address_id is None:
+                    address_id = self._append(address)
+                unique_ids[position] = address_id
+        return np.where(codes >= 0, unique_ids[np.maximum(codes, 0)], MISSING_ID).astype(np.int32)
+
+    def _append(self, address: str) -> int:
+        address_id = len(self._ids)
+        if address_id >= MAX_ADDRESSES:
+            raise Exception(f"Address interner error: more than {MAX_ADDRESSES} addresses")
+        if address_id == len(self._table):
+            table = np.empty(2 * len(self._table), dtype=object)
+            table[:address_id] = self._table
+            self._table = table
+        self._table[address_id] = address
+        self._ids[address] = address_id
+        return address_id
+
+    def get_id(self, address) -> Optional[int]:
+        """ID of an address if it has been interned, without assigning one."""
+        return self._ids.get(normalize_address(address))
+
+    def addresses(self, ids) -> np.ndarray:
+        """Normalized addresses of an array of IDs (None for MISSING_ID)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        return np.where(ids >= 0, self._table[np.maximum(ids, 0)], None)
+
+
+def get_address_interner() -> AddressInterner:
+    """Return the process-wide interner shared by the extractors, graph features and stores."""
+    global _interner
+    if _interner is None:
+        with _interner_lock:
+            if _interner is None:
+                _interner = AddressInterner()
+    return _interner
+
+
+def address_ids(column) -> np.ndarray:
+    """
+    int32 IDs for an address column that may already be interned.
+
+    Integer columns (e.g. from ColumnarStore.read(..., intern_addresses=True))
+    are taken as IDs; anything else goes through the process-wide interner.
+    """
+    if isinstance(column, (pd.Series, np.ndarray)) and column.dtype.kind in 'iu':
+        return np.asarray(column, dtype=np.int32)
+    return get_address_interner().intern(column)
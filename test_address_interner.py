@@ -0,0 +1,44 @@
+"""
+Tests for the process-wide address interner.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.features.token_features import extract_token_features
+from src.storage.columnar_store import ColumnarStore
+from src.utils.interner import MISSING_ID, AddressInterner, get_address_interner
+
+
+def test_intern_normalizes_hex_addresses_only():
+    interner = AddressInterner()
+
+    ids = interner.intern(['0xAbC1', '0xabc1', None, 'So1anaWallet', 'so1anawallet', np.nan, '', '0xabc1'])
+
+    assert ids.dtype == np.int32
+    assert ids.tolist() == [0, 0, MISSING_ID, 1, 2, MISSING_ID, MISSING_ID, 0]
+    assert interner.addresses([2, MISSING_ID, 0]).tolist() == ['so1anawallet', None, '0xabc1']
+    assert interner.get_id('0XABC1') == 0 and interner.get_id('0xdead') is None
+
+    # IDs are stable as the table grows
+    many = interner.intern([f"0x{i:040x}" for i in range(3000)])
+    assert len(interner) == 3003 and interner.intern(['0xABC1'])[0] == 0
+    assert (interner.addresses(many) == [f"0x{i:040x}" for i in range(3000)]).all()
+
+
+def test_store_reads_interned_addresses_for_the_extractor(tmp_path):
+    transfers = [
+        {'blockNumber': str(100 + i), 'logIndex': '0', 'hash': f"0x{i:064x}", 'timeStamp': str(1_700_000_000 + 97 * i),
+         'from': f"0x{i % 13:040X}", 'to': f"0x{i % 4:040x}", 'value': str(10 ** 18 + i), 'tokenDecimal': '18'}
+        for i in range(500)
+    ]
+    store = ColumnarStore(str(tmp_path))
+    store.append('ethereum', '0xtoken', transfers)
+
+    frame = store.read('ethereum', '0xtoken', columns=['from', 'to'], intern_addresses=True)
+    assert frame['from'].dtype == np.int32
+    assert get_address_interner().addresses(frame['to'][:2]).tolist() == [f"0x{0:040x}", f"0x{1:040x}"]
+
+    from_store = pd.Series(extract_token_features(store.read('ethereum', '0xtoken', intern_addresses=True)))
+    assert from_store.equals(pd.Series(extract_token_features(transfers)))
+    assert from_store['unique_senders'] == 13
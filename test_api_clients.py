@@ -0,0 +1,375 @@
+"""
+Offline tests for the src/api clients.
+The shared transport is swapped for an in-memory fake, so no API keys or network are needed.
+"""
+
+import asyncio
+import io
+import json
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from src.api import async_http_client, coingecko_api, etherscan_api, helius_api, http_client, response_cache, sync, twitter_api
+from src.features.token_features import extract_token_features
+from src.features.wallet_features import extract_wallet_features
+from src.storage.history_store import HistoryStore
+
+
+def _json_response(payload, status=200):
+    return http_client.ApiResponse(status, json.dumps(payload))
+
+
+class FakeHelius:
+    """Serves a synthetic wallet history newest-first, honouring limit/before/until."""
+
+    def __init__(self, total=250):
+        self.history = [
+            {'signature': f"sig{i}", 'timestamp': 1_700_000_000 - i * 30, 'fee': 5000 + i, 'type': 'TRANSFER'}
+            for i in range(total)
+        ]
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.calls.append(dict(params))
+        signatures = [txn['signature'] for txn in self.history]
+        start = signatures.index(params['before']) + 1 if params.get('before') else 0
+        stop = signatures.index(params['until']) if params.get('until') else len(signatures)
+        return _json_response(self.history[start:min(stop, start + int(params['limit']))])
+
+
+def test_helius_iterator_follows_cursor(monkeypatch):
+    fake = FakeHelius(total=250)
+    monkeypatch.setattr(http_client, 'get', fake.get)
+
+    transactions = list(helius_api.iter_wallet_transactions('wallet'))
+
+    assert [t['signature'] for t in transactions] == [t['signature'] for t in fake.history]
+    assert [c.get('before') for c in fake.calls] == [None, 'sig99', 'sig199', 'sig249']
+
+
+def test_helius_iterator_stop_conditions(monkeypatch):
+    fake = FakeHelius(total=250)
+    monkeypatch.setattr(http_client, 'get', fake.get)
+
+    assert len(list(helius_api.iter_wallet_transactions('wallet', max_count=130))) == 130
+    assert fake.calls[-1]['limit'] == 30
+
+    until = list(helius_api.iter_wallet_transactions('wallet', until='sig120'))
+    assert until[-1]['signature'] == 'sig119'
+
+    cutoff = fake.history[42]['timestamp']
+    recent = list(helius_api.iter_wallet_transactions('wallet', since_timestamp=cutoff))
+    assert len(recent) == 43
+
+
+def test_large_limit_is_paginated(monkeypatch):
+    fake = FakeHelius(total=600)
+    monkeypatch.setattr(http_client, 'get', fake.get)
+
+    assert len(helius_api.get_wallet_transactions('wallet', limit=500)) == 500
+    assert len(fake.calls) == 5
+
+
+def test_async_large_limit_matches_sync(monkeypatch):
+    fake = FakeHelius(total=600)
+    monkeypatch.setattr(http_client, 'get', fake.get)
+
+    async def fake_async_get(url, params=None, headers=None, **kwargs):
+        return fake.get(url, params=params, headers=headers, **kwargs)
+
+    monkeypatch.setattr(async_http_client, 'get', fake_async_get)
+
+    for limit in (10, 250, 500, 700):
+        sync_result = helius_api.get_wallet_transactions('wallet', limit=limit)
+        async_result = asyncio.run(helius_api.get_wallet_transactions_async('wallet', limit=limit))
+        assert async_result == sync_result
+    assert [c.get('before') for c in fake.calls[-7:]] == [None, 'sig99', 'sig199', 'sig299', 'sig399', 'sig499', 'sig599']
+
+
+def test_features_consume_iterator(monkeypatch):
+    fake = FakeHelius(total=150)
+    monkeypatch.setattr(http_client, 'get', fake.get)
+
+    streamed = extract_wallet_features(helius_api.iter_wallet_transactions('wallet'))
+    eager = extract_wallet_features(list(fake.history))
+
+    # Series.equals treats NaN == NaN
+    assert pd.Series(streamed).equals(pd.Series(eager))
+
+
+class FakeEtherscan:
+    """Serves tokentx results for a block range, truncated at MAX_RESULTS like the real API."""
+
+    def __init__(self, total=5000):
+        self.history = [
+            {'blockNumber': str(1000 + i // 7), 'transactionIndex': str(i % 7), 'logIndex': str(i % 7),
+             'hash': f"0x{i:064x}", 'from': f"0x{i % 13:040x}", 'to': f"0x{i % 17:040x}",
+             'value': str(10 ** 18 + i), 'timeStamp': str(1_700_000_000 + i * 12)}
+            for i in range(total)
+        ]
+        self.calls = 0
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.calls += 1
+        low, high = int(params['startblock']), int(params['endblock'])
+        rows = [t for t in self.history if low <= int(t['blockNumber']) <= high][:etherscan_api.MAX_RESULTS]
+        if not rows:
+            return _json_response({'status': '0', 'message': 'No transactions found', 'result': []})
+        return _json_response({'status': '1', 'message': 'OK', 'result': rows})
+
+
+def test_etherscan_sharding_returns_complete_history(monkeypatch):
+    fake = FakeEtherscan(total=5000)
+    monkeypatch.setattr(http_client, 'get', fake.get)
+    monkeypatch.setattr(etherscan_api, 'MAX_RESULTS', 500)
+
+    transfers = etherscan_api.get_all_token_transfers('0xtoken', max_workers=4)
+
+    assert [t['hash'] for t in transfers] == [t['hash'] for t in fake.history]
+    assert fake.calls > 10
+
+
+def test_etherscan_sharding_raises_on_api_error(monkeypatch):
+    monkeypatch.setattr(http_client, 'get', lambda *a, **k: _json_response(
+        {'status': '0', 'message': 'NOTOK', 'result': 'Max rate limit reached'}))
+    try:
+        etherscan_api.get_all_token_transfers('0xtoken')
+    except Exception as e:
+        assert 'Max rate limit reached' in str(e)
+    else:
+        raise AssertionError('expected an Etherscan error')
+
+
+def test_wallet_sync_fetches_only_new_transactions(tmp_path, monkeypatch):
+    fake = FakeHelius(total=150)
+    monkeypatch.setattr(http_client, 'get', fake.get)
+    store = HistoryStore(str(tmp_path / 'history.sqlite'))
+
+    first = sync.sync_wallet_transactions('wallet', store=store)
+    assert len(first) == 150 and len(fake.calls) == 3
+
+    # Five new transactions land at the head of the history
+    fake.history = [
+        {'signature': f"new{i}", 'timestamp': 1_800_000_000 - i, 'fee': 5000, 'type': 'SWAP'} for i in range(5)
+    ] + fake.history
+    calls_before = len(fake.calls)
+
+    merged = sync.sync_wallet_transactions('wallet', store=store)
+    assert [t['signature'] for t in merged[:6]] == ['new0', 'new1', 'new2', 'new3', 'new4', 'sig0']
+    assert len(merged) == 155
+    # One page with the delta, one empty page confirming the watermark was reached
+    assert len(fake.calls) == calls_before + 2
+    assert store.get_watermark('solana', 'wallet')['cursor'] == 'new0'
+
+
+def test_token_sync_appends_delta_once(tmp_path, monkeypatch):
+    fake = FakeEtherscan(total=700)
+    monkeypatch.setattr(http_client, 'get', fake.get)
+    store = HistoryStore(str(tmp_path / 'history.sqlite'))
+
+    first = sync.sync_token_transfers('0xToken', store=store)
+    assert len(first) == 700
+
+    fake.history.extend(FakeEtherscan(total=710).history[700:])
+    merged = sync.sync_token_transfers('0xToken', store=store)
+
+    assert [t['hash'] for t in merged] == [t['hash'] for t in fake.history]
+    assert store.get_watermark('ethereum', '0xtoken')['block'] == int(fake.history[-1]['blockNumber'])
+
+
+class _StreamedResponse:
+    """Stands in for a requests.Response opened with stream=True."""
+
+    def __init__(self, body):
+        self.status_code = 200
+        self.raw = io.BytesIO(body)
+
+
+def test_streamed_transfer_frame_matches_list_path(monkeypatch):
+    fake = FakeEtherscan(total=3000)
+    for i, transfer in enumerate(fake.history):
+        transfer['value'] = str((i * 7919) % 100000)
+    body = json.dumps({'status': '1', 'message': 'OK', 'result': fake.history}).encode()
+
+    @contextmanager
+    def fake_stream(url, params=None, headers=None, **kwargs):
+        yield _StreamedResponse(body)
+
+    monkeypatch.setattr(http_client, 'stream', fake_stream)
+    frame = etherscan_api.get_token_transfer_frame('0xtoken', chunk_size=256)
+
+    assert len(frame) == 3000
+    assert frame['timeStamp'].dtype == float and frame['from'].dtype == object
+    # Repeated addresses share one string object within a chunk; the table is reset per chunk
+    assert frame['from'][0] is frame['from'][13]
+    assert frame['from'][0] == frame['from'][260] and frame['from'][0] is not frame['from'][260]
+    streamed = extract_token_features(frame)
+    eager = extract_token_features(fake.history)
+    assert pd.Series(streamed).equals(pd.Series(eager))
+
+
+class FakeGeckoTerminal:
+    """Answers /tokens/multi requests for a fixed set of known tokens; one address fails the whole batch."""
+
+    def __init__(self, known, failing=()):
+        self.known = set(known)
+        self.failing = set(failing)
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        addresses = url.rsplit('/', 1)[-1].split(',')
+        self.calls.append(addresses)
+        if self.failing & set(addresses):
+            return http_client.ApiResponse(503, 'unavailable')
+        data = [
+            {'id': f"solana_{a}", 'type': 'token', 'attributes': {'address': a, 'symbol': a.upper()}}
+            for a in reversed(addresses) if a in self.known
+        ]
+        return _json_response({'data': data})
+
+
+def test_gecko_multi_token_batches_and_caches(tmp_path, monkeypatch):
+    addresses = [f"mint{i}" for i in range(65)]
+    fake = FakeGeckoTerminal(known=addresses[:-1])
+    monkeypatch.setattr(http_client, 'get', fake.get)
+    response_cache.set_cache(response_cache.ResponseCache(str(tmp_path / 'cache.sqlite')))
+    try:
+        results = coingecko_api.get_tokens_data_solana(addresses + ['mint3'])
+
+        assert sorted(len(call) for call in fake.calls) == [5, 30, 30]
+        assert [r.get('data', {}).get('attributes', {}).get('address') for r in results[:64]] == addresses[:64]
+        assert results[64] == {'error': 'Token not found on GeckoTerminal'}
+        assert results[65] == results[3]
+
+        # Found tokens are now cached under their single-token keys, and misses negatively
+        fake.calls.clear()
+        again = coingecko_api.get_tokens_data_solana(addresses[:10] + ['mint64', 'mint99'])
+        assert fake.calls == [['mint99']]
+        assert again[:11] == results[:10] + [results[64]]
+    finally:
+        response_cache.set_cache(None)
+
+
+def test_gecko_async_multi_token_keeps_cache_off_the_event_loop(tmp_path, monkeypatch):
+    addresses = [f"mint{i}" for i in range(40)]
+    fake = FakeGeckoTerminal(known=addresses[:-1])
+
+    async def fake_async_get(url, params=None, headers=None, **kwargs):
+        return fake.get(url)
+
+    cache = response_cache.ResponseCache(str(tmp_path / 'cache.sqlite'))
+    loop_threads, cache_threads = [], []
+
+    def record_thread(method):
+        def wrapper(*args):
+            cache_threads.append(threading.get_ident())
+            return method(*args)
+        return wrapper
+
+    for name in ('lookup', 'store'):
+        monkeypatch.setattr(cache, name, record_thread(getattr(cache, name)))
+    monkeypatch.setattr(async_http_client, 'get', fake_async_get)
+    response_cache.set_cache(cache)
+
+    async def lookup_twice():
+        loop_threads.append(threading.get_ident())
+        first = await coingecko_api.get_tokens_data_solana_async(addresses)
+        return first, await coingecko_api.get_tokens_data_solana_async(addresses)
+
+    try:
+        first, second = asyncio.run(lookup_twice())
+        assert cache_threads and loop_threads[0] not in cache_threads
+        # The second pass and the sync path are served from the cache
+        assert len(fake.calls) == 2
+        assert first == second == coingecko_api.get_tokens_data_solana(addresses)
+    finally:
+        response_cache.set_cache(None)
+    assert first[-1] == {'error': 'Token not found on GeckoTerminal'}
+
+
+def test_gecko_multi_token_errors_are_per_batch(monkeypatch):
+    addresses = [f"mint{i}" for i in range(40)]
+    fake = FakeGeckoTerminal(known=addresses, failing={'mint35'})
+    monkeypatch.setattr(http_client, 'get', fake.get)
+    monkeypatch.setattr(response_cache, 'get_cache', lambda: None)
+
+    results = coingecko_api.get_tokens_data_solana(addresses)
+
+    assert all('data' in r for r in results[:30])
+    assert all(r['error'].startswith('GeckoTerminal error: 503') for r in results[30:])
+
+
+class FakeTwitter:
+    """Serves a synthetic recent-search result newest-first, honouring since_id and next_token."""
+
+    def __init__(self, total=250):
+        self.tweets = [{'id': str(1000 + i), 'text': f"tweet {i}"} for i in reversed(range(total))]
+        self.calls = []
+
+    def post(self, count):
+        newest = int(self.tweets[0]['id'])
+        self.tweets[:0] = [{'id': str(newest + i), 'text': 'new'} for i in range(count, 0, -1)]
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.calls.append(dict(params))
+        matching = [t for t in self.tweets if not params.get('since_id') or int(t['id']) > int(params['since_id'])]
+        start = int(params.get('next_token') or 0)
+        stop = start + params['max_results']
+        meta = {'result_count': len(matching[start:stop])}
+        if stop < len(matching):
+            meta['next_token'] = str(stop)
+        return _json_response({'data': matching[start:stop], 'meta': meta} if matching[start:stop] else {'meta': meta})
+
+
+def test_twitter_iterator_follows_next_token(monkeypatch):
+    fake = FakeTwitter(total=250)
+    monkeypatch.setattr(http_client, 'get', fake.get)
+
+    tweets = list(twitter_api.iter_tweets('bonk'))
+    assert [t['id'] for t in tweets] == [t['id'] for t in fake.tweets]
+    assert [c.get('next_token') for c in fake.calls] == [None, '100', '200']
+
+    assert len(list(twitter_api.iter_tweets('bonk', max_count=105))) == 105
+    assert fake.calls[-1]['max_results'] == 10
+
+
+def test_keyword_sync_fetches_only_new_tweets(tmp_path, monkeypatch):
+    fake = FakeTwitter(total=150)
+    monkeypatch.setattr(http_client, 'get', fake.get)
+    store = HistoryStore(str(tmp_path / 'history.sqlite'))
+
+    first = sync.sync_keyword_tweets('bonk', store=store, initial_limit=120)
+    assert len(first) == 120 and first[0]['id'] == fake.tweets[0]['id']
+
+    fake.post(3)
+    fake.calls.clear()
+    merged = sync.sync_keyword_tweets('bonk', store=store)
+
+    assert fake.calls == [{'query': 'bonk', 'max_results': 100, 'since_id': first[0]['id']}]
+    assert [t['id'] for t in merged] == [t['id'] for t in fake.tweets[:123]]
+    assert store.get_watermark('twitter', 'bonk')['cursor'] == fake.tweets[0]['id']
+
+
+def test_client_imports_stay_light():
+    """Importing the clients loads no configuration and none of pandas, aiohttp or python-dotenv."""
+    probe = (
+        "import sys\n"
+        "from src.api import coingecko_api, etherscan_api, helius_api, rugdoc_api, sync, twitter_api\n"
+        "from src.utils.config import CONFIG\n"
+        "print(repr(CONFIG), sorted({'pandas', 'aiohttp', 'dotenv', 'ijson'} & set(sys.modules)))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'LazyConfig(loaded=False) []'
+
+    # The feature extractors share Helius constants without pulling in the HTTP client stack
+    probe = (
+        "import sys\n"
+        "import src.features.wallet_features\n"
+        "print(sorted({'src.api.http_client', 'src.api.helius_api', 'requests'} & set(sys.modules)))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
@@ -0,0 +1,154 @@
+"""
+Tests that the vectorized feature paths agree with the per-entity extractors.
+"""
+
+import random
+
+import numpy as np
+import pandas as pd
+
+from src.features.token_features import extract_token_features, extract_token_features_batch
+from src.features.wallet_features import (
+    WalletFeatureExtractor, _source_arrays, extract_wallet_features, extract_wallet_features_batch,
+)
+
+
+def _assert_same_features(expected, actual):
+    """Per-entity dict vs a batch row: equal values, NaN for features the dict leaves out."""
+    for name, value in expected.items():
+        if isinstance(value, str):
+            assert actual[name] == value, name
+        elif pd.isna(value):
+            assert pd.isna(actual[name]), name
+        else:
+            assert np.isclose(float(actual[name]), float(value), rtol=1e-9, atol=0), (name, value, actual[name])
+    for name in actual.index.difference(list(expected)):
+        assert pd.isna(actual[name]), name
+
+
+def _wallet_histories(count=120, seed=7):
+    rng = random.Random(seed)
+    histories = {}
+    for w in range(count):
+        start = 1_700_000_000 + rng.randint(0, 10 ** 6)
+        history = []
+        for i in range(rng.choice([1, 2, 3, 8, 40, 150])):
+            history.append({
+                'signature': f"{w}-{i}",
+                'timestamp': start + rng.choice([5, 30, 100, 4000, 90000]) * i,
+                'fee': rng.choice([5000, 5000, 7000, 10 ** 6, 'n/a']),
+                'type': rng.choice(['TRANSFER', 'SWAP', 'NFT_SALE']),
+            })
+        if w % 40 == 0:
+            for txn in history:
+                txn['fee'] = None
+        histories[f"wallet{w}"] = history
+    return histories
+
+
+def test_wallet_batch_matches_per_wallet_path():
+    histories = _wallet_histories()
+    batch = extract_wallet_features_batch(histories)
+
+    assert list(batch.index) == list(histories)
+    for wallet, history in histories.items():
+        _assert_same_features(extract_wallet_features(history), batch.loc[wallet])
+
+
+def test_wallet_batch_accepts_long_frame_and_fills_empty_wallets():
+    histories = _wallet_histories(count=10)
+    frame = pd.DataFrame([{'owner': w, **txn} for w, history in histories.items() for txn in history])
+
+    batch = extract_wallet_features_batch(frame, wallet_column='owner', wallets=['nobody', 'wallet3'])
+
+    assert list(batch.index) == ['nobody', 'wallet3']
+    assert batch.loc['nobody'].to_dict() == extract_wallet_features([])
+    _assert_same_features(extract_wallet_features(histories['wallet3']), batch.loc['wallet3'])
+
+
+def test_wallet_array_path_matches_dataframe_path():
+    histories = _wallet_histories(count=60, seed=3)
+    for wallet, history in histories.items():
+        for txn in history[::7]:
+            txn['timestamp'] = None
+        if wallet.endswith('5'):
+            for txn in history:
+                txn.pop('type')
+        history = [txn for txn in history if txn['fee'] != 'n/a']
+        assert _source_arrays(history) is not None
+
+        fast = WalletFeatureExtractor().extract_features(history)
+        slow = WalletFeatureExtractor().extract_features(pd.DataFrame(history))
+        assert list(fast) == list(slow)
+        _assert_same_features(slow, pd.Series(fast))
+
+
+def test_wallet_array_path_leaves_strings_to_pandas():
+    history = [{'timestamp': 1_700_000_000 + 90 * i, 'fee': str(5000 + i), 'type': 'SWAP'} for i in range(20)]
+    assert _source_arrays(history) is None
+
+    features = extract_wallet_features(history)
+    assert features['avg_fee'] == 5009.5
+    assert pd.Series(features).equals(pd.Series(WalletFeatureExtractor().extract_features(pd.DataFrame(history))))
+
+
+
+def test_wallet_features_without_source_fields():
+    history = [{'signature': 'a'}, {'signature': 'b', 'description': 'no type, time or fee'}]
+    assert _source_arrays(history) is None
+
+    features = extract_wallet_features(history)
+    assert features['total_transactions'] == 2
+    assert pd.Series(features).equals(pd.Series(WalletFeatureExtractor().extract_features(pd.DataFrame(history))))
+    assert extract_wallet_features(iter(history))['total_transactions'] == 2
+
+
+def _token_histories(count=80, seed=11):
+    rng = random.Random(seed)
+    histories = {}
+    for t in range(count):
+        start = 1_700_000_000 + rng.randint(0, 10 ** 6)
+        addresses = [f"0x{rng.randint(0, 40):040x}" for _ in range(rng.choice([1, 3, 12]))]
+        history = []
+        for i in range(rng.choice([1, 2, 5, 30, 200])):
+            history.append({
+                'timeStamp': str(start + rng.choice([5, 100, 400, 4000, 90000]) * i),
+                'value': str(rng.choice([0, 1, 10 ** 6, rng.randint(1, 10 ** 9), 'bad'])),
+                'from': rng.choice(addresses),
+                'to': rng.choice(addresses),
+            })
+        histories[f"0xtoken{t}"] = history
+    return histories
+
+
+def test_token_batch_matches_per_token_path():
+    histories = _token_histories()
+    batch = extract_token_features_batch(histories)
+
+    assert list(batch.index) == list(histories)
+    for token, history in histories.items():
+        _assert_same_features(extract_token_features(history), batch.loc[token])
+
+
+def test_token_batch_without_values_matches_per_token_path():
+    histories = _token_histories(count=10)
+    no_values = {token: [{k: v for k, v in t.items() if k != 'value'} for t in history]
+                 for token, history in histories.items()}
+    nan_values = pd.concat([pd.DataFrame(history).assign(contractAddress=token)
+                            for token, history in histories.items()], ignore_index=True)
+    nan_values['value'] = np.nan
+
+    for batch in (extract_token_features_batch(no_values), extract_token_features_batch(nan_values)):
+        for token, history in no_values.items():
+            _assert_same_features(extract_token_features(history), batch.loc[token])
+
+
+def test_token_batch_accepts_long_frame_and_fills_empty_tokens():
+    histories = _token_histories(count=10)
+    frame = pd.DataFrame([{'contractAddress': t, **transfer} for t, history in histories.items() for transfer in history])
+
+    batch = extract_token_features_batch(frame, tokens=['0xnone', '0xtoken4'])
+
+    assert list(batch.index) == ['0xnone', '0xtoken4']
+    assert batch.loc['0xnone'].to_dict() == extract_token_features([])
+    _assert_same_features(extract_token_features(histories['0xtoken4']), batch.loc['0xtoken4'])
@@ -0,0 +1,108 @@
+"""
+Tests for flattening Helius enhanced transactions into child tables.
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api.helius_columns import flatten_transactions
+from src.features.wallet_features import WalletFeatureExtractor, extract_wallet_features
+from src.storage.columnar_store import ColumnarStore
+
+WALLET = 'Wa11etAddress1111111111111111111111111111111'
+
+
+def _transactions():
+    return [
+        {'signature': 'sig0', 'timestamp': 1_700_000_000, 'slot': 10, 'fee': 5000, 'feePayer': WALLET,
+         'type': 'TRANSFER', 'source': 'SYSTEM_PROGRAM', 'description': 'ignored',
+         'nativeTransfers': [
+             {'fromUserAccount': WALLET, 'toUserAccount': 'PeerA', 'amount': 2_000_000_000},
+             {'fromUserAccount': 'PeerB', 'toUserAccount': WALLET, 'amount': 500_000_000},
+         ],
+         'tokenTransfers': [
+             {'fromUserAccount': WALLET, 'toUserAccount': 'PeerA', 'fromTokenAccount': 'TokA', 'toTokenAccount': 'TokB',
+              'tokenAmount': 12.5, 'mint': 'MintX', 'tokenStandard': 'Fungible'},
+         ],
+         'accountData': [
+             {'account': WALLET, 'nativeBalanceChange': -2_000_005_000, 'tokenBalanceChanges': [
+                 {'userAccount': WALLET, 'tokenAccount': 'TokA', 'mint': 'MintX',
+                  'rawTokenAmount': {'tokenAmount': '-12500000', 'decimals': 6}}]},
+             {'account': 'PeerA', 'nativeBalanceChange': 2_000_000_000, 'tokenBalanceChanges': []},
+         ]},
+        # No nested arrays at all
+        {'signature': 'sig1', 'timestamp': 1_700_000_030, 'fee': 5000, 'feePayer': WALLET, 'type': 'SWAP'},
+        {'signature': 'sig2', 'timestamp': 1_700_000_090, 'fee': 7000, 'feePayer': 'PeerA', 'type': 'TRANSFER',
+         'nativeTransfers': [{'fromUserAccount': 'PeerA', 'toUserAccount': WALLET, 'amount': 1_000_000_000}],
+         'tokenTransfers': [],
+         'accountData': [{'account': 'PeerA', 'nativeBalanceChange': -1_000_007_000, 'tokenBalanceChanges': [
+             {'userAccount': 'PeerA', 'tokenAccount': 'TokC', 'mint': 'MintY',
+              'rawTokenAmount': {'tokenAmount': '18446744073709551615', 'decimals': 0}}]}]},
+    ]
+
+
+def test_flatten_builds_typed_child_tables(tmp_path):
+    tables = flatten_transactions(_transactions())
+
+    assert {name: len(table) for name, table in tables.items()} == {
+        'transactions': 3, 'native_transfers': 3, 'token_transfers': 1,
+        'balance_changes': 3, 'token_balance_changes': 2,
+    }
+    native = tables['native_transfers']
+    assert native['transaction'].tolist() == [0, 0, 2]
+    assert native['signature'].tolist() == ['sig0', 'sig0', 'sig2']
+    assert native['amount'].dtype == np.int64 and native['amount'].sum() == 3_500_000_000
+    assert tables['token_transfers']['tokenAmount'].tolist() == [12.5]
+    changes = tables['token_balance_changes']
+    assert changes['transaction'].tolist() == [0, 2]
+    # u64 raw amounts stay exact strings
+    assert changes['rawTokenAmount'].tolist() == ['-12500000', '18446744073709551615']
+    assert changes['decimals'].tolist() == [6, 0]
+
+    # The store's JSON payloads flatten to the same tables
+    store = ColumnarStore(str(tmp_path))
+    store.append('solana', WALLET, _transactions())
+    stored = flatten_transactions(store.read('solana', WALLET, columns=['payload']))
+    for name, table in tables.items():
+        pd.testing.assert_frame_equal(stored[name], table)
+
+    assert all(len(table) == 0 for table in flatten_transactions([]).values())
+    with pytest.raises(Exception, match="Helius flatten error"):
+        flatten_transactions(pd.DataFrame({'type': ['TRANSFER']}))
+
+
+def test_wallet_counterparty_features(tmp_path):
+    features = extract_wallet_features(_transactions(), wallet_address=WALLET)
+
+    assert features['total_transactions'] == 3
+    assert features['native_transfer_count'] == 3 and features['token_transfer_count'] == 1
+    assert features['sol_sent'] == pytest.approx(2.0) and features['sol_received'] == pytest.approx(1.5)
+    assert features['net_sol_flow'] == pytest.approx(-0.5)
+    assert features['max_sol_transfer'] == pytest.approx(2.0)
+    assert features['incoming_transfer_ratio'] == pytest.approx(2 / 4)
+    assert features['unique_counterparties'] == 2 and features['top_counterparty_share'] == pytest.approx(3 / 4)
+    assert features['unique_token_mints'] == 1
+
+    # Base features are unchanged, and iterators keep the nested fields
+    plain = extract_wallet_features(_transactions())
+    assert {k: features[k] for k in plain} == plain
+    assert extract_wallet_features(iter(_transactions()), wallet_address=WALLET) == features
+
+    store = ColumnarStore(str(tmp_path))
+    store.append('solana', WALLET, _transactions())
+    stored = WalletFeatureExtractor().extract_features_from_store(store, WALLET, counterparties=True)
+    assert stored['unique_counterparties'] == 2 and stored['sol_sent'] == pytest.approx(2.0)
+    assert extract_wallet_features([], wallet_address=WALLET)['unique_counterparties'] == 0
+
+
+def test_wallet_features_import_does_not_load_pyarrow():
+    # The flattener is only needed once counterparty features are requested
+    # (pandas may load core pyarrow by itself, so check the modules we pull in)
+    code = ("import sys; import src.features.wallet_features; import src.models.fraud_detector; "
+            "assert not {'src.api.helius_columns', 'pyarrow.json'} & set(sys.modules)")
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,127 @@
+"""
+Tests for holder balance reconstruction and point-in-time concentration.
+"""
+
+import numpy as np
+import pytest
+
+from src.features.holder_balances import HolderBalances, concentration_features, extract_concentration_series
+from src.models.fraud_detector import FraudDetector
+
+MINT = '0x0000000000000000000000000000000000000000'
+
+
+def _transfer(block, log_index, sender, receiver, amount):
+    return {'blockNumber': str(block), 'logIndex': str(log_index), 'from': sender, 'to': receiver,
+            'value': str(amount), 'tokenDecimal': '18'}
+
+
+def _random_history(count=3000, seed=7):
+    rng = np.random.default_rng(seed)
+    addresses = [f"0xHolder{i:03d}" for i in range(60)]
+    supply = 10 ** 27
+    transfers = [_transfer(1, 0, MINT, addresses[0], supply)]
+    balances = {addresses[0]: supply}
+    for i in range(count):
+        funded = [a for a, b in balances.items() if b > 0]
+        sender = funded[rng.integers(len(funded))]
+        receiver = addresses[rng.integers(len(addresses))]
+        # Regularly empty a whole balance, the case float residue would break
+        amount = balances[sender] if rng.random() < 0.2 else int(balances[sender] * rng.random())
+        transfers.append(_transfer(2 + i // 4, i % 4, sender, receiver, amount))
+        balances[sender] -= amount
+        balances[receiver] = balances.get(receiver, 0) + amount
+    return transfers
+
+
+def _expected(transfers, block, top_n=10):
+    balances = {}
+    for t in transfers:
+        if int(t['blockNumber']) > block:
+            break
+        if t['from'] != MINT:
+            balances[t['from'].lower()] = balances.get(t['from'].lower(), 0) - int(t['value'])
+        balances[t['to'].lower()] = balances.get(t['to'].lower(), 0) + int(t['value'])
+    held = np.sort([b / 10 ** 18 for b in balances.values() if b > 0])
+    return len(held), held.sum(), (held ** 2).sum() / held.sum() ** 2, held[-top_n:].sum() / held.sum()
+
+
+def test_point_in_time_concentration_matches_a_full_replay():
+    transfers = _random_history()
+    balances = HolderBalances(checkpoint_interval=250)
+    # Incremental batches, shuffled within each batch
+    for start in range(0, len(transfers), 401):
+        batch = transfers[start:start + 401]
+        balances.add_transfers([batch[i] for i in np.random.default_rng(start).permutation(len(batch))])
+
+    for block in (1, 2, 137, 400, balances.last_block):
+        holders, supply, hhi, top_share = _expected(transfers, block)
+        result = balances.concentration_at(block)
+        assert result['holder_count'] == holders
+        assert result['supply'] == pytest.approx(supply)
+        assert result['hhi'] == pytest.approx(hhi)
+        assert result['top_holder_share'] == pytest.approx(top_share)
+    assert len(balances.balances_at(137)) == _expected(transfers, 137)[0]
+    assert balances.concentration_at(0)['holder_count'] == 0
+
+    with pytest.raises(Exception, match="Holder balance error"):
+        balances.add_transfers([_transfer(5, 0, '0xholder001', '0xholder002', 1)])
+
+
+def test_replayed_boundary_block_is_not_applied_twice():
+    transfers = _random_history(count=1000)
+    for i, t in enumerate(transfers):
+        t['hash'] = f"0xtx{i // 2}"
+    reference = HolderBalances()
+    reference.add_transfers(transfers)
+
+    # Each fetch starts at the last block already seen, as an incremental sync from startblock=last_block does
+    balances = HolderBalances()
+    start = 0
+    while start + 150 < len(transfers):
+        balances.add_transfers(transfers[start:start + 150])
+        last = transfers[start + 149]['blockNumber']
+        start += 150
+        while transfers[start - 1]['blockNumber'] == last:
+            start -= 1
+    balances.add_transfers(transfers[start:])
+    balances.add_transfers(transfers[-3:])
+
+    assert balances.change_count == reference.change_count
+    assert balances.concentration_at(balances.last_block) == pytest.approx(reference.concentration_at(reference.last_block))
+    assert balances.balances_at(100).to_dict() == pytest.approx(reference.balances_at(100).to_dict())
+
+    # Without logIndex a repeated block cannot be matched, so it is refused
+    with pytest.raises(Exception, match="Holder balance error"):
+        balances.add_transfers([{k: v for k, v in transfers[-1].items() if k != 'logIndex'}])
+
+
+def test_checkpoints_stay_within_the_change_log():
+    # Every transfer creates a new holder, so a snapshot per interval would grow quadratically
+    transfers = [_transfer(1, 0, MINT, '0xWhale', 10 ** 30)]
+    transfers += [_transfer(2 + i // 10, i % 10, '0xWhale', f"0xHolder{i}", 10 ** 18) for i in range(5000)]
+    balances = HolderBalances(checkpoint_interval=50)
+    balances.add_transfers(transfers)
+
+    stored = sum(len(ids) for ids, _ in balances._checkpoints[:-1])
+    assert stored <= balances.change_count
+    assert len(balances.balances_at(300)) == _expected(transfers, 300)[0]
+    assert balances.concentration_at(400)['top_holder_share'] == pytest.approx(_expected(transfers, 400)[3])
+
+
+def test_concentration_series_feeds_the_detector():
+    transfers = [_transfer(1, 0, MINT, '0xDev', 10 ** 24)]
+    # Tokens spread to 50 holders, then they all sell back to the developer
+    transfers += [_transfer(2 + i, 0, '0xDev', f"0xBuyer{i}", 10 ** 22) for i in range(50)]
+    transfers += [_transfer(100 + i, 0, f"0xBuyer{i}", '0xDev', 10 ** 22) for i in range(50)]
+
+    series = extract_concentration_series(transfers, points=20)
+    summary = concentration_features(series)
+
+    assert list(series.columns) == ['block', 'holder_count', 'supply', 'hhi', 'top_holder_share']
+    assert summary['holder_count'] == 1 and summary['top_holder_share'] == pytest.approx(1.0)
+    assert summary['holder_drawdown'] > 0.9 and summary['hhi_increase'] > 0.5
+
+    analysis = FraudDetector()._analyze_token_behavior({'concentration_series': series})
+    assert any('Top holders control' in indicator for indicator in analysis['indicators'])
+    assert any('Holder count fell' in indicator for indicator in analysis['indicators'])
@@ -0,0 +1,252 @@
+"""
+Tests for the shared HTTP transport used by src/api.
+Runs against a throwaway local HTTP server, so no API keys are needed.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.api import async_http_client, circuit_breaker, http_client, response_cache
+from src.utils.config import CONFIG
+
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    """Fails the first request per path with 503, then answers 200 ('down' paths always 503, 'missing' 404)."""
+    protocol_version = 'HTTP/1.1'
+    seen = {}
+
+    def do_GET(self):
+        if 'slow' in self.path:
+            time.sleep(0.2)
+        count = self.seen.get(self.path, 0)
+        self.seen[self.path] = count + 1
+        status = 503 if count == 0 and 'flaky' in self.path else 200
+        if 'down' in self.path:
+            status = 503
+        elif 'missing' in self.path:
+            status = 404
+        body = json.dumps({'path': self.path, 'attempt': count + 1}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 503:
+            self.send_header('Retry-After', '0')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_retries_transient_errors():
+    """A 503 with Retry-After is retried and the 200 is returned."""
+    server, base_url = _start_server()
+    try:
+        response = http_client.get(f"{base_url}/flaky")
+        assert response.status_code == 200
+        assert response.json()['attempt'] == 2
+    finally:
+        server.shutdown()
+
+
+def test_returns_final_error_when_retries_exhausted():
+    """After the retry budget is spent the last response is returned, not raised."""
+    server, base_url = _start_server()
+    original = CONFIG['HTTP_MAX_RETRIES']
+    CONFIG['HTTP_MAX_RETRIES'] = 0
+    try:
+        response = http_client.get(f"{base_url}/flaky-once")
+        assert response.status_code == 503
+    finally:
+        CONFIG['HTTP_MAX_RETRIES'] = original
+        server.shutdown()
+
+
+def test_session_is_shared():
+    """Every caller gets the same pooled session."""
+    assert http_client.get_session() is http_client.get_session()
+
+
+def test_parse_retry_after():
+    assert http_client.parse_retry_after('3') == 3.0
+    assert http_client.parse_retry_after(None) is None
+    assert http_client.parse_retry_after('not a date') is None
+
+
+def test_async_get_and_bounded_gather():
+    """Async requests share one session, retry like the sync path and keep input order."""
+    server, base_url = _start_server()
+    try:
+        paths = [f"/async/{i}" for i in range(20)] + ["/async-flaky"]
+        coros = (async_http_client.get(f"{base_url}{path}") for path in paths)
+        responses = async_http_client.run(async_http_client.gather_bounded(coros, limit=5))
+        assert [r.status_code for r in responses] == [200] * len(paths)
+        assert [r.json()['path'] for r in responses] == paths
+        assert responses[-1].json()['attempt'] == 2
+    finally:
+        server.shutdown()
+
+
+def test_response_cache_serves_hits_and_revalidates_stale(tmp_path, monkeypatch):
+    """Fresh hits skip the network; stale hits are served and refreshed in the background."""
+    server, base_url = _start_server()
+    response_cache.set_cache(response_cache.ResponseCache(str(tmp_path / 'cache.sqlite')))
+    monkeypatch.setitem(response_cache.PROVIDER_TTLS, 'local', (60, 60))
+    try:
+        url = f"{base_url}/cached"
+        first = http_client.get(url, params={'q': 1, 'api-key': 'secret'}, provider='local')
+        second = http_client.get(url, params={'api-key': 'other', 'q': 1}, provider='local')
+        assert first.json() == second.json()
+        assert _FlakyHandler.seen['/cached?q=1&api-key=secret'] == 1
+
+        # Expire the entry but keep it inside the stale window
+        cache = response_cache.get_cache()
+        key = response_cache.make_key('local', url, {'q': 1})
+        cache._connection().execute('UPDATE responses SET expires_at = 0 WHERE key = ?', (key,))
+        stale = http_client.get(url, params={'q': 1}, provider='local')
+        assert stale.json()['attempt'] == 1
+        for _ in range(50):
+            if not cache.lookup(key).is_stale:
+                break
+            time.sleep(0.05)
+        assert cache.lookup(key).text != stale.text
+        assert 'secret' not in key
+    finally:
+        response_cache.set_cache(None)
+        server.shutdown()
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    cache = response_cache.ResponseCache(str(tmp_path / 'cache.sqlite'), max_bytes=4000)
+    for i in range(10):
+        cache.store(f"k{i}", 'local', 'url', 200, json.dumps({'id': i, 'blob': os.urandom(600).hex()}), ttl=60)
+        cache.lookup('k0')
+    assert cache.lookup('k0') is not None
+    assert cache.lookup('k1') is None
+    assert cache.stats()['bytes'] <= 4000
+
+    # The running byte total follows replacements, expiry and eviction without rescanning
+    cache.store('k9', 'local', 'url', 200, 'short', ttl=60)
+    cache.store('gone', 'local', 'url', 200, 'x' * 100, ttl=-1)
+    assert cache.lookup('gone') is None
+    assert cache._bytes == cache.stats()['bytes']
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    """Threads and asyncio tasks asking for the same URL at once share one upstream call."""
+    server, base_url = _start_server()
+    try:
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(http_client.get(f"{base_url}/slow-threads").json()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(results) == 8 and all(r == results[0] for r in results)
+        assert _FlakyHandler.seen['/slow-threads'] == 1
+
+        coros = [async_http_client.get(f"{base_url}/slow-async") for _ in range(8)]
+        responses = async_http_client.run(async_http_client.gather_bounded(coros))
+        assert {r.json()['attempt'] for r in responses} == {1}
+        assert _FlakyHandler.seen['/slow-async'] == 1
+    finally:
+        server.shutdown()
+
+
+def test_circuit_breaker_opens_and_probes():
+    breaker = circuit_breaker.CircuitBreaker('local', failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.OPEN
+    with pytest.raises(circuit_breaker.CircuitOpenError):
+        breaker.before_request()
+
+    time.sleep(0.06)
+    breaker.before_request()  # the single half-open probe
+    with pytest.raises(circuit_breaker.CircuitOpenError):
+        breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.OPEN and breaker.reset_timeout == 0.1
+
+    time.sleep(0.11)
+    breaker.before_request()
+    breaker.record_status(404)
+    assert breaker.state == circuit_breaker.CLOSED and breaker.reset_timeout == 0.05
+
+
+def test_cancelled_probe_does_not_reopen_circuit(monkeypatch):
+    """Only transport errors count against a provider; a cancelled or crashed probe frees the slot."""
+    circuit_breaker.reset_breakers()
+    breaker = circuit_breaker.get_breaker('local-probe')
+    breaker.reset_timeout = breaker.base_reset_timeout = 0.01
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    time.sleep(0.02)
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(async_http_client, '_send_with_retries', hang)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(async_http_client._send('http://local', None, None, None, 'local-probe'), 0.05))
+    assert breaker.state == circuit_breaker.HALF_OPEN and breaker.reset_timeout == 0.01
+
+    def crash(*args, **kwargs):
+        raise ValueError("bug in the caller")
+
+    monkeypatch.setattr(http_client, '_send_with_retries', crash)
+    with pytest.raises(ValueError):
+        http_client._send('http://local', None, None, None, 'local-probe')
+    assert breaker.state == circuit_breaker.HALF_OPEN
+
+    def refused(*args, **kwargs):
+        raise requests.ConnectionError("refused")
+
+    monkeypatch.setattr(http_client, '_send_with_retries', refused)
+    with pytest.raises(requests.ConnectionError):
+        http_client._send('http://local', None, None, None, 'local-probe')
+    assert breaker.state == circuit_breaker.OPEN and breaker.reset_timeout == 0.02
+    circuit_breaker.reset_breakers()
+
+
+def test_open_circuit_fails_fast_and_negative_cache(tmp_path, monkeypatch):
+    """A provider that keeps failing is skipped without network calls; 404s are cached briefly."""
+    server, base_url = _start_server()
+    monkeypatch.setitem(CONFIG, 'HTTP_MAX_RETRIES', 0)
+    monkeypatch.setitem(CONFIG, 'CIRCUIT_FAILURE_THRESHOLD', 2)
+    monkeypatch.setitem(response_cache.PROVIDER_TTLS, 'local', (60, 60))
+    circuit_breaker.reset_breakers()
+    response_cache.set_cache(response_cache.ResponseCache(str(tmp_path / 'cache.sqlite')))
+    try:
+        for _ in range(2):
+            assert http_client.get(f"{base_url}/down", provider='local-down').status_code == 503
+        with pytest.raises(circuit_breaker.CircuitOpenError):
+            http_client.get(f"{base_url}/down", provider='local-down')
+        assert _FlakyHandler.seen['/down'] == 2
+        assert not circuit_breaker.is_available('local-down')
+
+        for _ in range(3):
+            assert http_client.get(f"{base_url}/missing", provider='local').status_code == 404
+        assert _FlakyHandler.seen['/missing'] == 1
+        assert circuit_breaker.is_available('local')
+    finally:
+        response_cache.set_cache(None)
+        circuit_breaker.reset_breakers()
+        server.shutdown()
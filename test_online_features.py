@@ -0,0 +1,241 @@
+"""
+Tests for the incremental feature state and its sketches.
+"""
+
+import json
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.online import (
+    TokenFeatureState, WalletFeatureState, _FeatureState, build_state_sharded, merge_states, split_by_range,
+)
+from src.features.sketches import CardinalitySketch, QuantileSketch, RunningMoments, TopCounts
+from src.features.token_features import extract_token_features
+from src.features.wallet_features import extract_wallet_features
+
+
+def _wallet_history(count, seed=2):
+    rng = random.Random(seed)
+    timestamp = 1_700_000_000
+    history = []
+    for _ in range(count):
+        timestamp += rng.choice([5, 30, 100, 4000, 90000])
+        history.append({
+            'timestamp': timestamp if rng.random() > 0.05 else None,
+            'fee': rng.choice([5000, 5000, 7000, 10 ** 6, None]),
+            'type': rng.choice(['TRANSFER', 'SWAP', 'NFT_SALE']),
+        })
+    return history
+
+
+def _token_history(count, addresses, seed=4):
+    rng = random.Random(seed)
+    timestamp = 1_700_000_000
+    history = []
+    for _ in range(count):
+        timestamp += rng.choice([5, 100, 400, 4000, 90000])
+        history.append({
+            'timeStamp': str(timestamp),
+            'value': str(rng.choice([0, 10 ** 18, rng.randint(1, 10 ** 24)])),
+            'from': f"0x{rng.randrange(addresses):040x}",
+            'to': f"0x{rng.randrange(addresses):040x}",
+        })
+    return history
+
+
+def _roundtrip(state):
+    return type(state).from_dict(json.loads(json.dumps(state.to_dict())))
+
+
+def _assert_close(expected, actual, rtol=1e-9):
+    assert list(actual) == list(expected)
+    for name, value in expected.items():
+        if isinstance(value, str) or pd.isna(value):
+            assert actual[name] == value or (pd.isna(value) and pd.isna(actual[name])), name
+        else:
+            assert np.isclose(float(actual[name]), float(value), rtol=rtol, atol=0), (name, value, actual[name])
+
+
+def test_wallet_state_matches_extractor_across_updates():
+    history = _wallet_history(400)
+    state = WalletFeatureState()
+    for start in range(0, len(history), 37):
+        state.update(history[start:start + 37])
+        state = _roundtrip(state)
+
+    _assert_close(extract_wallet_features(history), state.features())
+    assert WalletFeatureState().features() == extract_wallet_features([])
+
+
+def test_token_state_is_exact_except_sketched_features():
+    history = _token_history(500, addresses=40)
+    state = TokenFeatureState()
+    for start in range(0, len(history), 60):
+        state.update(history[start:start + 60])
+    state = _roundtrip(state)
+
+    expected = extract_token_features(history)
+    features = state.features()
+    sketched = {'large_transfer_ratio', 'dust_transfer_ratio', 'value_concentration'}
+    _assert_close({k: v for k, v in expected.items() if k not in sketched},
+                  {k: v for k, v in features.items() if k not in sketched})
+    assert abs(features['large_transfer_ratio'] - expected['large_transfer_ratio']) <= 0.02
+    assert abs(features['value_concentration'] - expected['value_concentration']) <= 0.01
+
+
+def test_token_state_estimates_many_addresses():
+    history = _token_history(6000, addresses=3000)
+    state = TokenFeatureState()
+    state.update(history)
+
+    expected = extract_token_features(history)
+    features = state.features()
+    assert not state.top_senders.exact
+    assert abs(features['unique_senders'] - expected['unique_senders']) / expected['unique_senders'] < 0.05
+    assert abs(features['unique_receivers'] - expected['unique_receivers']) / expected['unique_receivers'] < 0.05
+
+
+def test_merged_shards_match_single_pass_in_any_grouping():
+    history = _token_history(900, addresses=60)
+    single = TokenFeatureState()
+    single.update(history)
+
+    def shard_states():
+        states = []
+        for start in range(0, len(history), 200):
+            state = TokenFeatureState()
+            state.update(history[start:start + 200])
+            states.append(state)
+        return states
+
+    left = merge_states(shard_states())
+    states = shard_states()
+    right = states[0].merge(merge_states(states[1:]))
+    _assert_close(single.features(), left.features())
+    _assert_close(single.features(), right.features())
+
+    wallet_history = _wallet_history(300)
+    wallet = WalletFeatureState()
+    wallet.update(wallet_history)
+    halves = [WalletFeatureState(), WalletFeatureState()]
+    halves[0].update(wallet_history[:140])
+    halves[1].update(wallet_history[140:])
+    _assert_close(wallet.features(), halves[1].merge(halves[0]).features())
+
+
+def test_sketched_features_stay_within_tolerance_past_capacity():
+    history = _token_history(20_000, addresses=3000)
+    expected = extract_token_features(history)
+    single = TokenFeatureState()
+    for start in range(0, len(history), 1000):
+        single.update(history[start:start + 1000])
+    shards = []
+    for start in range(0, len(history), 2500):
+        shard = TokenFeatureState()
+        shard.update(history[start:start + 2500])
+        shards.append(shard)
+    tree = merge_states([shards[0].merge(shards[1]), shards[2].merge(shards[3]),
+                         merge_states(shards[4:6]), merge_states(shards[6:])])
+
+    n = len(history)
+    for state in (single, tree):
+        features = state.features()
+        assert not state.top_senders.exact
+        for direction in ('sender', 'receiver'):
+            top = state.top_senders if direction == 'sender' else state.top_receivers
+            true_top = expected[f'top_{direction}_concentration']
+            assert true_top <= features[f'top_{direction}_concentration'] <= true_top + top.max_error() / n
+            assert abs(features[f'{direction}_diversity'] - expected[f'{direction}_diversity']) <= 0.001
+            unique = expected[f'unique_{direction}s']
+            assert abs(features[f'unique_{direction}s'] - unique) / unique < 0.05
+        assert abs(features['large_transfer_ratio'] - expected['large_transfer_ratio']) <= 0.02
+        assert abs(features['value_concentration'] - expected['value_concentration']) <= 0.01
+        assert features['total_transfers'] == n
+        assert features['avg_transfer_value'] == pytest.approx(expected['avg_transfer_value'])
+
+
+def test_build_state_sharded_in_process_pool():
+    frame = pd.DataFrame(_token_history(1200, addresses=50))
+    frame['blockNumber'] = np.arange(len(frame)) // 4
+
+    merged = build_state_sharded(TokenFeatureState, split_by_range(frame, 'blockNumber', 4), max_workers=2)
+    single = TokenFeatureState()
+    single.update(frame)
+    _assert_close(single.features(), merged.features())
+
+
+def test_sketches():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(10, 3, 50_000)
+
+    moments = RunningMoments()
+    for chunk in np.array_split(values, 7):
+        moments.add_many(chunk)
+    assert np.isclose(moments.mean, values.mean()) and np.isclose(moments.std, values.std(ddof=1))
+
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.add_many(values)
+    for q in (0.05, 0.5, 0.95):
+        assert abs(sketch.quantile(q) / np.quantile(values, q) - 1) <= 0.011
+
+    distinct = CardinalitySketch()
+    distinct.add_many(f"addr{i % 20_000}" for i in range(60_000))
+    assert abs(distinct.estimate() / 20_000 - 1) < 0.05
+
+
+def test_top_counts_keeps_heavy_hitters_over_many_keys():
+    rng = np.random.default_rng(4)
+    stream = np.concatenate([rng.integers(0, 200_000, 100_000), np.repeat([7, 11, 13], [5000, 3000, 2000])])
+    rng.shuffle(stream)
+    true = pd.Series(stream).value_counts()
+
+    top = TopCounts(capacity=64)
+    for chunk in np.array_split(stream, 40):
+        keys, counts = np.unique(chunk, return_counts=True)
+        top.add_counts(dict(zip(map(str, keys.tolist()), counts.tolist())))
+
+    assert not top.exact and len(top.counts) == 64
+    # Space-Saving never underestimates, and the heavy hitters survive evictions
+    assert all(top.counts[str(key)] >= true[key] for key in (7, 11, 13))
+    assert top.top() >= 5000 and top.top() <= 5000 + min(top.counts.values())
+
+
+def test_merged_top_counts_stay_within_error_bound():
+    rng = np.random.default_rng(5)
+    parts = []
+    for seed in range(8):
+        part = np.concatenate([rng.zipf(1.3, 20_000) % 5000, np.full(300 * (seed + 1), 9999)])
+        parts.append(pd.Series(part.astype(str)).value_counts().to_dict())
+    true = pd.Series(dict(pd.DataFrame(parts).fillna(0).sum()))
+
+    def summary(counts):
+        top = TopCounts(capacity=50)
+        top.add_counts(counts)
+        return top
+
+    left = summary(parts[0])
+    for part in parts[1:]:
+        left.merge(summary(part))
+    pairs = [summary(a).merge(summary(b)) for a, b in zip(parts[::2], parts[1::2])]
+    tree = pairs[0].merge(pairs[1]).merge(pairs[2].merge(pairs[3]))
+
+    for merged in (left, tree):
+        bound = merged.max_error()
+        assert not merged.exact and len(merged.counts) == 50
+        assert all(true[key] <= count <= true[key] + bound for key, count in merged.counts.items())
+        assert true.drop(list(merged.counts)).max() <= bound
+        assert '9999' in merged.counts
+
+    # Within capacity, merging is exact in any grouping
+    small = [{'a': 3, 'b': 1}, {'b': 2, 'c': 5}, {'a': 1, 'd': 4}]
+    one = summary(small[0]).merge(summary(small[1])).merge(summary(small[2]))
+    other = summary(small[0]).merge(summary(small[1]).merge(summary(small[2])))
+    assert one.exact and one.counts == other.counts == {'a': 4, 'b': 3, 'c': 5, 'd': 4}
+
+
+def test_feature_state_base_is_abstract():
+    with pytest.raises(TypeError):
+        _FeatureState()
@@ -0,0 +1,65 @@
+"""
+Tests for the per-provider adaptive rate limiter.
+"""
+
+import asyncio
+import threading
+import time
+
+from src.api import rate_limiter
+
+
+def _timed(fn):
+    start = time.monotonic()
+    fn()
+    return time.monotonic() - start
+
+
+def test_bucket_paces_threads():
+    """Ten threads against a 20 req/s bucket with burst 2 need about 0.4s."""
+    bucket = rate_limiter.TokenBucket(rate=20, burst=2)
+
+    def _run():
+        threads = [threading.Thread(target=bucket.acquire) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert 0.35 <= _timed(_run) < 1.0
+
+
+def test_bucket_paces_async_tasks():
+    bucket = rate_limiter.TokenBucket(rate=20, burst=2)
+
+    async def _run():
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(10)))
+
+    assert 0.35 <= _timed(lambda: asyncio.run(_run())) < 1.0
+
+
+def test_throttling_halves_rate_and_honours_retry_after():
+    bucket = rate_limiter.TokenBucket(rate=100, burst=1)
+    bucket.on_throttled(retry_after=0.3)
+    assert bucket.rate == 50
+    assert _timed(bucket.acquire) >= 0.25
+
+    for _ in range(20):
+        bucket.on_success()
+    assert bucket.rate == 100
+
+
+def test_shared_bucket_spans_instances(tmp_path):
+    """Two buckets on the same file (as two processes would have) share one budget."""
+    path = str(tmp_path / 'limits.sqlite')
+    first = rate_limiter.SharedTokenBucket('helius', path, rate=20, burst=2)
+    second = rate_limiter.SharedTokenBucket('helius', path, rate=20, burst=2)
+
+    def _run():
+        for _ in range(5):
+            first.acquire()
+            second.acquire()
+
+    assert _timed(_run) >= 0.35
+    first.on_throttled()
+    assert second.rate == 10
@@ -0,0 +1,80 @@
+"""
+Tests for the record/replay stand-in in src/api/replay.py.
+A throwaway local server plays the upstream provider, so nothing leaves the machine.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.api import helius_api, replay
+from src.api.replay import ReplayServer
+from src.utils.config import CONFIG
+
+WALLET = "4F3qMHdHHuDzxkeX282WQmZRcsjv6ATUThLKDbDHaubj"
+
+
+class _UpstreamHelius(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps([
+            {'signature': f"sig{i}", 'timestamp': 1_700_000_000 - i, 'fee': 5000, 'type': 'TRANSFER'}
+            for i in range(3)
+        ]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _record_fixture(tmp_path, monkeypatch):
+    """Record one Helius call against the fake upstream and return (archive, response)."""
+    upstream = ThreadingHTTPServer(('127.0.0.1', 0), _UpstreamHelius)
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+    archive = str(tmp_path / 'api.jsonl.gz')
+    monkeypatch.setitem(CONFIG, 'API_CACHE_ENABLED', False)
+    monkeypatch.setitem(CONFIG, 'API_RECORD_PATH', archive)
+    monkeypatch.setattr(replay, '_recorder', None)
+    monkeypatch.setitem(CONFIG, 'HELIUS_BASE_URL', f"http://127.0.0.1:{upstream.server_address[1]}/v0")
+    monkeypatch.setitem(CONFIG, 'HELIUS_API_KEY', 'secret-key')
+    try:
+        recorded = helius_api.get_wallet_transactions(WALLET, limit=3)
+    finally:
+        upstream.shutdown()
+        replay._recorder.close()
+    monkeypatch.setitem(CONFIG, 'API_RECORD_PATH', None)
+    return archive, recorded
+
+
+def test_record_then_replay(tmp_path, monkeypatch):
+    archive, recorded = _record_fixture(tmp_path, monkeypatch)
+    assert 'secret-key' not in open(archive, 'rb').read().decode('latin-1')
+
+    with ReplayServer(archive, latency_ms=100) as server:
+        monkeypatch.setitem(CONFIG, 'HELIUS_BASE_URL', server.base_urls()['HELIUS_BASE_URL'])
+        start = time.monotonic()
+        replayed = helius_api.get_wallet_transactions(WALLET, limit=3)
+        assert time.monotonic() - start >= 0.1
+
+    assert replayed == recorded
+    assert server.stats == {'served': 1, 'missing': 0, 'injected_errors': 0}
+
+
+def test_replay_injects_errors(tmp_path, monkeypatch):
+    archive, _ = _record_fixture(tmp_path, monkeypatch)
+    monkeypatch.setitem(CONFIG, 'HTTP_MAX_RETRIES', 0)
+
+    with ReplayServer(archive, error_rate=1.0, error_status=500, seed=7) as server:
+        monkeypatch.setitem(CONFIG, 'HELIUS_BASE_URL', server.base_urls()['HELIUS_BASE_URL'])
+        try:
+            helius_api.get_wallet_transactions(WALLET, limit=3)
+        except Exception as e:
+            assert 'Helius API error: 500' in str(e)
+        else:
+            raise AssertionError('expected an injected failure')
@@ -0,0 +1,57 @@
+"""
+Tests for exact uint256 transfer value decoding.
+"""
+
+import random
+from fractions import Fraction
+
+import numpy as np
+import pandas as pd
+
+from src.features.amounts import decode_token_amounts, decode_uint256
+from src.features.token_features import extract_token_features
+
+
+def test_limbs_are_exact_for_any_uint256():
+    rng = random.Random(1)
+    values = [str(rng.randrange(10 ** rng.randint(1, 78))) for _ in range(5000)]
+    values += [str(2 ** 256 - 1), '0', '000123']
+
+    limbs, valid = decode_uint256(values)
+
+    assert valid.all()
+    for row, value in zip(limbs, values):
+        assert sum(int(limb) * 10 ** (18 * (4 - i)) for i, limb in enumerate(row)) == int(value)
+
+
+def test_amounts_scale_by_token_decimals_and_fall_back_for_other_input():
+    values = pd.Series([str(10 ** 30 + 1), '1500000', '1e21', '-5', '', None, 7, 'x'])
+    decimals = ['18', 6, 18, 0, 18, 18, None, 18]
+
+    amounts = decode_token_amounts(values, decimals)
+
+    assert amounts[0] == float(Fraction(10 ** 30 + 1, 10 ** 18))
+    assert amounts[1] == 1.5
+    assert amounts[2] == 1000.0
+    assert amounts[3] == -5.0
+    assert amounts[4:6].isna().all() and np.isnan(amounts[7])
+    assert amounts[6] == 7.0
+
+
+def test_value_features_of_18_decimal_token_do_not_overflow():
+    # Each raw wei amount fits an int64, their sum does not
+    raw = [10 ** 16 * (i + 1) + i for i in range(200)]
+    transfers = [
+        {'timeStamp': str(1_700_000_000 + 60 * i), 'value': str(value), 'tokenDecimal': '18',
+         'from': f"0x{i % 9:040x}", 'to': f"0x{i % 5:040x}"}
+        for i, value in enumerate(raw)
+    ]
+
+    features = extract_token_features(transfers)
+
+    tokens = sorted(Fraction(value, 10 ** 18) for value in raw)
+    cumsum = np.cumsum([float(t) for t in tokens])
+    expected_gini = (len(tokens) + 1 - 2 * cumsum.sum() / cumsum[-1]) / len(tokens)
+    assert np.isclose(features['avg_transfer_value'], float(sum(tokens) / len(tokens)), rtol=1e-12)
+    assert features['max_transfer_value'] == float(tokens[-1])
+    assert np.isclose(features['value_concentration'], expected_gini, rtol=1e-12)
@@ -0,0 +1,97 @@
+"""
+Tests for the sparse transfer graph and its fraud features.
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from src.features.token_features import extract_token_features
+from src.features.transfer_graph import GRAPH_FEATURES, TransferGraph, extract_graph_features
+from src.models.fraud_detector import FraudDetector
+
+
+def _transfer(block, sender, receiver, amount):
+    return {'blockNumber': str(block), 'timeStamp': str(1_700_000_000 + 600 * block), 'from': sender,
+            'to': receiver, 'value': str(amount * 10 ** 18), 'tokenDecimal': '18'}
+
+
+def _wash_ring_transfers():
+    ring = [f"0xRing{i}" for i in range(4)]
+    transfers = []
+    for block in range(40):
+        # A -> B -> C -> A cycles, plus a pair bouncing the same amount back and forth
+        transfers.append(_transfer(block, ring[block % 3], ring[(block + 1) % 3], 100))
+        transfers.append(_transfer(block, ring[3], ring[0], 500))
+        transfers.append(_transfer(block, ring[0], ring[3], 500))
+    return transfers
+
+
+def test_graph_features_on_a_wash_ring():
+    ring = _wash_ring_transfers()
+    holders = [_transfer(b, '0xMinter', f"0xHolder{b}", 1) for b in range(40)]
+
+    features = extract_graph_features(ring + holders)
+
+    assert list(features) == list(GRAPH_FEATURES)
+    assert features['graph_nodes'] == 4 + 1 + 40
+    assert features['graph_edges'] == 3 + 2 + 40
+    assert features['wash_trade_pairs'] == 1
+    assert features['wash_trade_ratio'] == pytest.approx(40 * 1000 / (40 * 100 + 40 * 1000 + 40))
+    assert features['cycle_3_count'] == 1
+    assert features['scc_count'] == 1 and features['largest_scc_size'] == 4
+    assert features['scc_node_ratio'] == pytest.approx(4 / 45)
+    assert features['max_degree_share'] == pytest.approx(40 / (2 * 45))
+
+    graph = TransferGraph()
+    graph.add_transfers(ring + holders)
+    assert graph.rings() == [['0xring0', '0xring1', '0xring2', '0xring3']]
+    ranks = graph.pagerank()
+    assert ranks.sum() == pytest.approx(1.0) and ranks.index[0] == '0xring0'
+
+    # Hubs are skipped when counting cycles
+    graph.hub_degree = 3
+    assert graph.features()['cycle_3_count'] == 0
+
+
+def test_incremental_updates_match_a_full_build():
+    transfers = _wash_ring_transfers() + [_transfer(b, f"0xA{b % 7}", f"0xA{b % 5}", b) for b in range(200)]
+
+    incremental = TransferGraph()
+    for start in range(0, len(transfers), 37):
+        incremental.add_transfers(transfers[start:start + 37])
+    full = TransferGraph()
+    full.add_transfers(transfers)
+
+    assert np.array_equal(incremental.keys, full.keys)
+    assert np.array_equal(incremental.counts, full.counts)
+    assert np.allclose(incremental.values, full.values)
+    assert incremental.last_block == 199
+    assert incremental.features() == pytest.approx(full.features())
+    assert TransferGraph().features() == dict.fromkeys(GRAPH_FEATURES, 0)
+
+
+def test_graph_features_reach_token_risk_and_detector():
+    transfers = _wash_ring_transfers()
+
+    plain = extract_token_features(transfers)
+    features = extract_token_features(transfers, graph_features=True)
+
+    assert 'wash_trade_ratio' not in plain
+    assert features['wash_trade_ratio'] > 0.3 and features['scc_node_ratio'] == 1.0
+    assert features['risk_score'] == plain['risk_score'] + 35
+    assert extract_token_features([], graph_features=True)['cycle_3_count'] == 0
+
+    analysis = FraudDetector()._analyze_token_behavior(features)
+    assert any('Wash trading' in indicator for indicator in analysis['indicators'])
+    assert any('Circular transfer rings' in indicator for indicator in analysis['indicators'])
+
+
+def test_token_features_import_does_not_load_scipy():
+    # Graph features are optional; only building a TransferGraph needs scipy
+    code = ("import sys; import src.features.token_features; import src.models.fraud_detector; "
+            "assert 'scipy' not in sys.modules")
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))